@@ -0,0 +1,140 @@
+"""
+Run pdf_extractor or pandas_table over many PDFs with a pool of warm workers.
+
+Input is a directory (every *.pdf in it) or a manifest file listing one PDF
+path per line (relative paths are relative to the manifest, # starts a
+comment). Each worker process imports the extraction code once and then
+takes one document after the other, writing <output dir>/<pdf name><ext>.
+The extraction modules (PyMuPDF, NumPy, pdfplumber for that engine,
+XlsxWriter for .xlsx) are only imported inside the workers, so the parent
+stays light.
+
+    python batch_extract.py pdfs/ -o out/ --workers 4
+    python batch_extract.py harrison.txt --script pandas_table --engine pymupdf --format jsonl
+    python batch_extract.py pdfs/ -o out/ --format parquet --bullets out/bullets
+
+With --bullets, pdf_extractor also writes every document's bullets to one
+Parquet dataset partitioned by document, which pyarrow.dataset (or any
+Parquet reader that understands hive partitions) can filter without opening
+the other documents' files.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from profiling import add_logging_arguments, configure_logging
+
+SCRIPTS = ("pdf_extractor", "pandas_table")
+FORMATS = ("xlsx", "csv", "jsonl", "parquet")
+
+log = logging.getLogger("batch_extract")
+
+
+def list_documents(source):
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source) if name.lower().endswith(".pdf")
+        )
+    base = os.path.dirname(os.path.abspath(source))
+    documents = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                documents.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return documents
+
+
+def process_document(script, pdf_path, output_path, engine, cache_dir, bullets_dir=None, columns=False):
+    """Extract one PDF to output_path; returns (pdf_path, pages, rows, seconds)."""
+    import fitz  # PyMuPDF
+
+    from sinks import open_sink
+
+    start = time.perf_counter()
+    if script == "pdf_extractor":
+        import pdf_extractor
+        from span_cache import SpanCache
+
+        cache = SpanCache(cache_dir) if cache_dir else None
+        with fitz.open(pdf_path) as doc:
+            pages = doc.page_count
+        if bullets_dir:
+            with open_sink(output_path, pdf_extractor.OUTPUT_COLUMNS) as sink, \
+                    pdf_extractor.open_bullet_sink(bullets_dir, pdf_path) as bullet_sink:
+                pdf_extractor.extract_to_sink(pdf_path, sink, cache=cache, bullet_sink=bullet_sink)
+        else:
+            with open_sink(output_path, pdf_extractor.OUTPUT_COLUMNS) as sink:
+                sink.write_many(pdf_extractor.extract_sections(pdf_path, cache=cache))
+    else:
+        import pandas_table
+        from page_index import load_page_index
+
+        index = load_page_index(pdf_path)
+        pages = sum(1 for start_page, end_page in index.sections().values()
+                    for page in range(start_page, end_page) if page in index.pages)
+        with open_sink(output_path, pandas_table.QUESTION_COLUMNS) as sink:
+            for _, questions in pandas_table.extract_questions(pdf_path, engine=engine, columns=columns):
+                sink.write_many({"Questions": question} for question in questions)
+    return pdf_path, pages, sink.row_count, time.perf_counter() - start
+
+
+def _init_worker(verbosity):
+    # Forked workers inherit the parent's handlers, spawned ones have none
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger().setLevel(verbosity)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="directory of PDFs or a manifest file with one PDF path per line")
+    parser.add_argument("-o", "--output-dir", default="batch_output")
+    parser.add_argument("--script", choices=SCRIPTS, default="pdf_extractor", help="which extraction to run (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="xlsx", help="output format (default: %(default)s)")
+    parser.add_argument("--engine", choices=("pdfplumber", "pymupdf"), default="pdfplumber", help="pandas_table text backend")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes, one document each at a time")
+    parser.add_argument("--cache-dir", help="span cache directory for pdf_extractor (default: no cache)")
+    parser.add_argument("--columns", action="store_true", help="pandas_table: read two-column pages column by column")
+    parser.add_argument("--bullets", metavar="DIR", help="pdf_extractor: also write a Parquet dataset of bullets, partitioned by document")
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    # Worker chatter stays at WARNING unless -v, the per-document lines below are the progress output
+    configure_logging(args.verbose, args.quiet)
+
+    documents = list_documents(args.source)
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = []
+    for pdf_path in documents:
+        name = os.path.splitext(os.path.basename(pdf_path))[0]
+        jobs.append((
+            args.script, pdf_path, os.path.join(args.output_dir, f"{name}.{args.format}"), args.engine, args.cache_dir, args.bullets, args.columns,
+        ))
+    log.info("📚 %d documents, %d workers", len(jobs), args.workers)
+
+    start = time.perf_counter()
+    total_pages = total_rows = failed = 0
+    worker_level = logging.DEBUG if args.verbose else logging.WARNING
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(worker_level,)) as pool:
+        futures = {pool.submit(process_document, *job): job[1] for job in jobs}
+        for future in as_completed(futures):
+            try:
+                pdf_path, pages, rows, seconds = future.result()
+            except Exception as exc:  # one broken PDF shouldn't stop the batch
+                failed += 1
+                log.warning("❌ %s: %s", futures[future], exc)
+                continue
+            total_pages += pages
+            total_rows += rows
+            log.info("📄 %s: %d pages, %d rows, %.2fs, %.1f pages/s", os.path.basename(pdf_path), pages, rows, seconds, pages / seconds)
+
+    elapsed = time.perf_counter() - start
+    log.info(
+        "✅ %d documents (%d failed), %d pages, %d rows in %.2fs: %.1f pages/s, %.2f documents/s",
+        len(jobs) - failed, failed, total_pages, total_rows, elapsed, total_pages / elapsed, (len(jobs) - failed) / elapsed,
+    )
+
+
+if __name__ == "__main__":
+    main()
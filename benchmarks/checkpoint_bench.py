@@ -0,0 +1,157 @@
+"""
+What periodic checkpoints (checkpoint.py) cost, and what --resume saves.
+
+Builds a synthetic DDx PDF and a synthetic Harrison PDF. For pdf_extractor
+(tables on, no span cache) and pandas_table's question/answer pass
+(pymupdf engine) it times a run without checkpoints and with a checkpoint
+every --every pages, best of --repeat interleaved runs, and prints the
+overhead, the time spent in the checkpoint stage itself (hashing the PDF
+and appending the chunks), the checkpoints written and the checkpoint
+file's size at the end of the run.
+
+Then a run with the default interval is made to die after --crash-at of
+its pages (a MemoryGuard that raises, as --max-rss would), and is resumed:
+it prints the resumed run's time against a full run's and whether the
+output is identical to the uninterrupted one.
+
+    python -m benchmarks.checkpoint_bench [--pages 2000] [--harrison-scale 0.5] [--every 200 50 10]
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx, build_harrison  # noqa: E402
+from checkpoint import DEFAULT_EVERY, Checkpoint  # noqa: E402
+from ddx_tables import TABLE_COLUMNS  # noqa: E402
+from memory import MemoryGuard  # noqa: E402
+from page_index import load_page_index  # noqa: E402
+import pandas_table  # noqa: E402
+import pdf_extractor  # noqa: E402
+from profiling import StageProfiler  # noqa: E402
+from sinks import ListSink  # noqa: E402
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashAt(MemoryGuard):
+    """Dies once the given page is done."""
+
+    def __init__(self, page_num):
+        super().__init__()
+        self.crash_page = page_num
+
+    def page_done(self, page_num):
+        if page_num == self.crash_page:
+            raise Crash(page_num)
+
+
+def checkpoint_bytes(output):
+    return sum(os.path.getsize(path) for path in glob.glob(f"{output}.checkpoint*"))
+
+
+def clear(output):
+    for path in glob.glob(f"{output}.checkpoint*"):
+        os.remove(path)
+
+
+def run_ddx(pdf_path, output, every, resume=False, memory=None):
+    rows, tables, profile = ListSink(pdf_extractor.OUTPUT_COLUMNS), ListSink(TABLE_COLUMNS), StageProfiler()
+    checkpoint = Checkpoint(f"{output}.checkpoint", every) if every is not None else None
+    pdf_extractor.extract_to_sink(
+        pdf_path, rows, table_sink=tables, profile=profile, probe=True, checkpoint=checkpoint, resume=resume,
+        **({"memory": memory} if memory else {}),
+    )
+    return rows.rows + tables.rows, profile
+
+
+def run_harrison(pdf_path, output, every, resume=False, memory=None):
+    index = load_page_index(pdf_path)
+    profile = StageProfiler()
+    sections = pandas_table.iter_qa_sections(
+        pdf_path, index.parts, 1, profile, index.question_pages(), "pymupdf", memory or MemoryGuard(),
+        checkpoint=(output, every, resume) if every is not None else None,
+    )
+    return list(sections), profile
+
+
+def crash_page(pdf_path, fraction, script):
+    """A page that is actually read, about fraction of the way through the run."""
+    if script == "pdf_extractor":
+        import fitz
+
+        with fitz.open(pdf_path) as doc:
+            return int(doc.page_count * fraction)
+    pages = sorted(load_page_index(pdf_path).question_pages())
+    return pages[int(len(pages) * fraction)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000, help="DDx pages (default: %(default)s)")
+    parser.add_argument("--harrison-scale", type=float, default=0.5)
+    parser.add_argument("--every", type=int, nargs="+", default=[200, DEFAULT_EVERY, 10], help="checkpoint intervals to time")
+    parser.add_argument("--crash-at", type=float, default=0.8, help="fraction of the pages done before the crash (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        books = {
+            "pdf_extractor": (run_ddx, os.path.join(workdir, "ddx.pdf")),
+            "pandas_table": (run_harrison, os.path.join(workdir, "harrison.pdf")),
+        }
+        build_ddx(books["pdf_extractor"][1], args.pages)
+        build_harrison(books["pandas_table"][1], args.harrison_scale)
+        output = os.path.join(workdir, "out.csv")
+
+        print(f"{'script':<14} {'every':>6} {'seconds':>8} {'overhead':>9} {'in checkpoint':>14} {'saved':>6} {'KB':>8}")
+        for script, (run, pdf_path) in books.items():
+            # Warm up (the Harrison page index is built and cached on first use)
+            run(pdf_path, output, None)
+            # Interleaved, so every interval sees the same machine load
+            timings = {every: [] for every in [None] + args.every}
+            profiles, sizes = {}, {}
+            for _ in range(args.repeat):
+                for every in timings:
+                    start = time.perf_counter()
+                    _, profiles[every] = run(pdf_path, output, every)
+                    timings[every].append(time.perf_counter() - start)
+                    sizes[every] = checkpoint_bytes(output)
+                    clear(output)
+            baseline = min(timings[None])
+            for every, seconds in timings.items():
+                best = min(seconds)
+                print(
+                    f"{script:<14} {every or 'off':>6} {best:>8.2f} {(best / baseline - 1) * 100:>8.1f}%"
+                    f" {profiles[every].stages['checkpoint']:>13.3f}s {profiles[every].counters['checkpoints']:>6} {sizes[every] / 1024:>8.1f}"
+                )
+
+        print(f"\n{'script':<14} {'crash page':>10} {'full s':>7} {'resumed s':>10}  output")
+        for script, (run, pdf_path) in books.items():
+            start = time.perf_counter()
+            expected, _ = run(pdf_path, output, None)
+            full_seconds = time.perf_counter() - start
+            page_num = crash_page(pdf_path, args.crash_at, script)
+            try:
+                run(pdf_path, output, DEFAULT_EVERY, memory=CrashAt(page_num))
+            except Crash:
+                pass
+            start = time.perf_counter()
+            resumed, _ = run(pdf_path, output, DEFAULT_EVERY, resume=True)
+            resumed_seconds = time.perf_counter() - start
+            clear(output)
+            print(
+                f"{script:<14} {page_num + 1:>10} {full_seconds:>7.2f} {resumed_seconds:>10.2f}"
+                f"  {'identical' if resumed == expected else 'DIFFERS'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Per-page block classification cost: nested span dicts (previous code) vs.
+columnar PageSpans with vectorized font predicates.
+
+Pages are extracted and packed once up front (the span cache format), so the
+timing covers what a warm run does per page: packed tuples -> dicts -> legacy
+classifier, vs. packed tuples -> PageSpans -> classify_spans(). Pages
+holding a 7.5pt table block are reported separately, since that is where
+the old per-line rescan of every span in the block was quadratic.
+
+    python -m benchmarks.classify_bench "DDx Tabelle.pdf" [--rounds 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pdf_extractor as pe  # noqa: E402
+from page_spans import PageSpans  # noqa: E402
+from span_cache import pack_blocks, unpack_blocks  # noqa: E402
+
+
+# Previous implementation, kept as the baseline
+def legacy_classify_block(block):
+    text_lines = []
+    max_font_size = 0
+
+    for line in block.get("lines", []):
+        line_text = " ".join([span["text"] for span in line["spans"]]).strip()
+        text_lines.append(line_text)
+        max_font_size = max(max_font_size, *(span["size"] for span in line["spans"]))
+
+    keep = [not pe.is_running_header_line(line) for line in text_lines]
+    candidate_lines = [line for line, kept in zip(text_lines, keep) if kept]
+    full_text = "\n".join(candidate_lines).strip()
+    if not full_text:
+        return None
+
+    spans = block["lines"][0]["spans"] if block.get("lines") and block["lines"][0].get("spans") else []
+    has_7_5_size = [
+        any(
+            abs(span.get("size", 0) - 7.5) < 0.2 and span.get("text", "").strip() in line
+            for l in block.get("lines", [])
+            for span in l.get("spans", [])
+        )
+        for line in text_lines
+    ]
+
+    return {
+        "text_lines": text_lines,
+        "keep": keep,
+        "full_text": full_text,
+        "max_font_size": max_font_size,
+        "is_chapter": pe.is_possible_chapter(full_text, max_font_size) and full_text not in pe.KNOWN_SECTIONS + pe.SUBSUB_HEADINGS,
+        "is_noise": pe.is_noise_block(text_lines),
+        "is_header": not all(keep),
+        "is_section": pe.is_section(full_text),
+        "is_subsub": pe.is_subsub(text_lines, spans),
+        "has_7_5_size": has_7_5_size,
+    }
+
+
+def legacy_classify_blocks(blocks):
+    records = []
+    for block_index, block in enumerate(blocks):
+        record = legacy_classify_block(block)
+        if record is not None:
+            record["block_index"] = block_index
+            records.append(record)
+    return records
+
+
+def legacy_classify(packed_page):
+    return legacy_classify_blocks(unpack_blocks(*packed_page))
+
+
+def columnar_classify(packed_page):
+    # The legacy classifier has neither a header/footer model nor a layout profile
+    return pe.classify_spans(PageSpans(*packed_page), header_footer=None, layout=pe.DEFAULT_LAYOUT)
+
+
+def time_pages(func, pages, rounds):
+    """Best-of-rounds seconds per page."""
+    best = [float("inf")] * len(pages)
+    for _ in range(rounds):
+        for index, page in enumerate(pages):
+            start = time.perf_counter()
+            func(page)
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    doc = fitz.open(args.pdf)
+    dict_pages = [doc.load_page(page_num).get_text("dict")["blocks"] for page_num in range(doc.page_count)]
+    packed_pages = [pack_blocks(blocks) for blocks in dict_pages]
+
+    for blocks, packed in zip(dict_pages, packed_pages):
+        # Header-only blocks are kept as stubs for the stitch pass's counters; the old code dropped them
+        records = [record for record in columnar_classify(packed) if record["full_text"]]
+        legacy_records = legacy_classify_blocks(blocks)
+        # Later records carry more keys (chapter_size, line_bbox); only the legacy ones are compared
+        assert len(legacy_records) == len(records) and all(
+            legacy_record == {key: record[key] for key in legacy_record} for legacy_record, record in zip(legacy_records, records)
+        ), "classification differs"
+
+    table_pages = {index for index, packed in enumerate(packed_pages) if PageSpans(*packed).table_block_mask().any()}
+    legacy = time_pages(legacy_classify, packed_pages, args.rounds)
+    columnar = time_pages(columnar_classify, packed_pages, args.rounds)
+
+    print(f"{len(dict_pages)} pages, {len(table_pages)} with 7.5pt table blocks, identical records")
+    print(f"{'pages':>12} {'legacy ms/page':>15} {'columnar ms/page':>17} {'speedup':>8}")
+    groups = [
+        ("all", range(len(dict_pages))),
+        ("table", sorted(table_pages)),
+        ("other", [i for i in range(len(dict_pages)) if i not in table_pages]),
+    ]
+    for label, indexes in groups:
+        if not indexes:
+            continue
+        before = sum(legacy[i] for i in indexes) / len(indexes) * 1000
+        after = sum(columnar[i] for i in indexes) / len(indexes) * 1000
+        print(f"{label:>12} {before:>15.3f} {after:>17.3f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
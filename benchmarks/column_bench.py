@@ -0,0 +1,99 @@
+"""
+Line-by-line vs column-by-column page text on two-column Harrison pages.
+
+Builds a synthetic Harrison PDF (two columns whose lines often share a
+baseline) and runs pandas_table's question extraction with both engines,
+each reading pages line by line across the page (the default) and column
+by column (--columns). For every mode it prints pages/s, the questions
+found, and against the PDF's own lines (left column top to bottom, then the
+right one, then lines crossing the middle):
+
+- interleaved: output lines glued together from a left and a right column
+  line,
+- pages in order: pages whose lines come out exactly in reading order.
+
+    python -m benchmarks.column_bench [--scale 0.25] [--pdf harrison.pdf]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas_table  # noqa: E402
+from benchmarks.synthetic_pdfs import build_harrison  # noqa: E402
+from page_index import load_page_index  # noqa: E402
+from page_text import ENGINES, open_text_source  # noqa: E402
+
+HEADER = 50
+
+
+def reading_order(page):
+    """The page's text lines below the header: left column, right column, then full-width lines."""
+    middle = page.rect.width / 2
+    columns = ([], [], [])
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", ()):
+            x0, top, x1, _ = line["bbox"]
+            text = " ".join(" ".join(span["text"] for span in line["spans"]).split())
+            if top < HEADER or not text:
+                continue
+            column = 2 if x0 < middle < x1 else int(x0 >= middle)
+            columns[column].append((top, text))
+    return [[text for _, text in sorted(column)] for column in columns]
+
+
+def interleaved(line, left, right):
+    """True if line is a left column line and a right column line joined by a space."""
+    words = line.split(" ")
+    return any(" ".join(words[:cut]) in left and " ".join(words[cut:]) in right for cut in range(1, len(words)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", help="two-column PDF to use instead of a synthetic Harrison")
+    parser.add_argument("--scale", type=float, default=0.25, help="synthetic Harrison page scale, 1.0 is 475 pages (default: %(default)s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(workdir, "harrison.pdf")
+            build_harrison(pdf_path, args.scale)
+        index = load_page_index(pdf_path)
+        sections, pages = index.sections(), index.question_pages()
+        page_numbers = sorted(page for start, end in sections.values() for page in range(start, end) if page in pages)
+
+        with fitz.open(pdf_path) as doc:
+            truth = {page_num: reading_order(doc.load_page(page_num)) for page_num in page_numbers}
+
+        print(f"{len(page_numbers)} question pages")
+        print(f"{'mode':<22} {'pages/s':>8} {'questions':>10} {'interleaved':>12} {'pages in order':>15}")
+        for engine in ENGINES:
+            for columns in (False, True):
+                start = time.perf_counter()
+                questions = pandas_table.extract_sections(pdf_path, sections, page_offset=0, pages=pages, engine=engine, columns=columns)
+                elapsed = time.perf_counter() - start
+
+                glued = in_order = 0
+                with open_text_source(pdf_path, engine, columns) as source:
+                    for page_num in page_numbers:
+                        left, right, full = truth[page_num]
+                        lines = [" ".join(line.split()) for line in source.page_lines(page_num, header=HEADER, footer=0)]
+                        left_set, right_set = set(left), set(right)
+                        glued += sum(interleaved(line, left_set, right_set) for line in lines)
+                        in_order += lines == left + right + full
+                mode = f"{engine}{' --columns' if columns else ''}"
+                print(
+                    f"{mode:<22} {len(page_numbers) / elapsed:>8.1f} {sum(map(len, questions.values())):>10}"
+                    f" {glued:>12} {in_order:>8}/{len(page_numbers)}"
+                )
+
+
+if __name__ == "__main__":
+    main()
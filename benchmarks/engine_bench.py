@@ -0,0 +1,69 @@
+"""
+pdfplumber vs. PyMuPDF text backend for pandas_table's question extraction.
+
+Extracts the same sections (the page_index answer ranges, or --sections
+printed page ranges) with both engines, prints throughput side by side and
+diffs the extracted questions section by section.
+
+    python -m benchmarks.engine_bench "Harrison Self Assessment, 17th.pdf" [--context 20]
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas_table  # noqa: E402
+from page_index import load_page_index  # noqa: E402
+from page_text import ENGINES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--sections", metavar="JSON", help="printed page ranges instead of the discovered ones")
+    parser.add_argument("--page-offset", type=int, default=10)
+    parser.add_argument("--context", type=int, default=20, help="diff lines shown per differing section")
+    args = parser.parse_args()
+
+    if args.sections:
+        with open(args.sections, encoding="utf-8") as f:
+            sections = json.load(f)
+        page_offset, pages = args.page_offset, None
+        page_count = sum(end - start for start, end in sections.values())
+    else:
+        index = load_page_index(args.pdf)
+        sections, page_offset, pages = index.sections(), 0, index.question_pages()
+        page_count = sum(1 for start, end in sections.values() for page in range(start, end) if page in pages)
+
+    results = {}
+    print(f"{'engine':>11} {'pages':>6} {'questions':>10} {'seconds':>8} {'pages/s':>8}")
+    for engine in ENGINES:
+        start = time.perf_counter()
+        questions = pandas_table.extract_sections(args.pdf, sections, page_offset=page_offset, pages=pages, engine=engine)
+        elapsed = time.perf_counter() - start
+        results[engine] = questions
+        total = sum(len(section) for section in questions.values())
+        print(f"{engine:>11} {page_count:>6} {total:>10} {elapsed:>8.2f} {page_count / elapsed:>8.1f}")
+
+    reference, candidate = results["pdfplumber"], results["pymupdf"]
+    differing = 0
+    for roman_number in reference:
+        before = [question + "\n" for question in reference[roman_number]]
+        after = [question + "\n" for question in candidate.get(roman_number, [])]
+        if before == after:
+            continue
+        differing += 1
+        diff = list(difflib.unified_diff(before, after, f"pdfplumber {roman_number}", f"pymupdf {roman_number}"))
+        sys.stdout.writelines(diff[:args.context])
+        if len(diff) > args.context:
+            print(f"... {len(diff) - args.context} more diff lines")
+    print(f"{len(reference) - differing} of {len(reference)} sections identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Golden-output check for both scripts on small synthetic PDFs.
+
+Builds the fixtures described in benchmarks/golden/fixtures.json, extracts
+them with pdf_extractor (DDx rows) and pandas_table (Harrison questions per
+section at the page ranges page_index discovers, or the --qa table) and
+diffs the rows against benchmarks/golden/*.jsonl. Any changed, missing or extra row fails
+the check, so performance work can't quietly change the output. --update
+rewrites the golden files after an intended change.
+
+    python -m benchmarks.golden [--workers 2] [--engine pymupdf] [--update]
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+import tempfile
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas_table  # noqa: E402
+import pdf_extractor  # noqa: E402
+from benchmarks.synthetic_pdfs import build_ddx, build_harrison  # noqa: E402
+from page_index import load_page_index  # noqa: E402
+from page_text import ENGINES  # noqa: E402
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+FIXTURES = {
+    "ddx": {"pages": 60, "seed": 0},
+    "harrison": {"scale": 0.05, "seed": 0},
+    # Questions running over a page break repeat "<qid>." instead of "(Continued)"
+    "harrison_repeated_headers": {"scale": 0.1, "seed": 0, "repeated_headers": True},
+    # Explanations longer than a page: some answer pages hold no question id
+    "harrison_qa_long_answers": {"scale": 0.1, "seed": 0, "long_every": 8},
+}
+
+
+def ddx_rows(workdir, workers, engine, name="ddx"):
+    path = os.path.join(workdir, f"{name}.pdf")
+    build_ddx(path, **FIXTURES[name])
+    return pdf_extractor.extract_rows(path, workers)
+
+
+def harrison_rows(workdir, workers, engine, name="harrison"):
+    path = os.path.join(workdir, f"{name}.pdf")
+    build_harrison(path, **FIXTURES[name])
+    index = load_page_index(path)
+    sections = pandas_table.iter_sections(
+        path, index.sections(), workers, page_offset=0, pages=index.question_pages(), engine=engine
+    )
+    return [
+        {"Section": roman_number, "Questions": question}
+        for roman_number, questions in sections
+        for question in questions
+    ]
+
+
+def harrison_qa_rows(workdir, workers, engine, name):
+    path = os.path.join(workdir, f"{name}.pdf")
+    build_harrison(path, **FIXTURES[name])
+    index = load_page_index(path)
+    sections = pandas_table.iter_qa_sections(path, index.parts, workers, pages=index.question_pages(), engine=engine)
+    # One line per question rather than per option, so each explanation is stored once
+    questions = {}
+    for _, _, rows in sections:
+        for row in rows:
+            question = questions.setdefault((row["Section"], row["Question ID"]), {
+                "Section": row["Section"], "Question ID": row["Question ID"], "Question": row["Question"],
+                "Options": [], "Explanation": row["Explanation"],
+            })
+            question["Options"].append([row["Option"], row.get("Option Text"), row["Correct"]])
+    return list(questions.values())
+
+
+EXTRACTORS = {
+    "ddx": ddx_rows, "harrison": harrison_rows, "harrison_repeated_headers": harrison_rows,
+    "harrison_qa_long_answers": harrison_qa_rows,
+}
+
+
+def dump_rows(rows):
+    return [json.dumps(row, ensure_ascii=False) + "\n" for row in rows]
+
+
+def library_versions():
+    return {"pymupdf": fitz.VersionBind, "pdfplumber": pdfplumber.__version__}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="pdfplumber", help="pandas_table text backend")
+    parser.add_argument("--update", action="store_true", help="rewrite the golden files instead of checking them")
+    parser.add_argument("--context", type=int, default=40, help="diff lines shown per fixture")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, extract in EXTRACTORS.items():
+            lines = dump_rows(extract(workdir, args.workers, args.engine, name))
+            golden_path = os.path.join(GOLDEN_DIR, f"{name}.jsonl")
+
+            if args.update:
+                os.makedirs(GOLDEN_DIR, exist_ok=True)
+                with open(golden_path, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                print(f"{name}: wrote {len(lines)} rows to {golden_path}")
+                continue
+
+            with open(golden_path, encoding="utf-8") as f:
+                golden = f.readlines()
+            if lines == golden:
+                print(f"{name}: {len(lines)} rows, identical")
+                continue
+
+            failed = True
+            diff = list(difflib.unified_diff(golden, lines, f"golden/{name}.jsonl", "extracted"))
+            print(f"{name}: output differs ({len(golden)} golden rows, {len(lines)} extracted)")
+            sys.stdout.writelines(diff[:args.context])
+            if len(diff) > args.context:
+                print(f"... {len(diff) - args.context} more diff lines")
+
+    meta_path = os.path.join(GOLDEN_DIR, "fixtures.json")
+    if args.update:
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"fixtures": FIXTURES, "versions": library_versions()}, f, indent=1)
+    elif failed:
+        with open(meta_path, encoding="utf-8") as f:
+            recorded = json.load(f)["versions"]
+        if recorded != library_versions():
+            print(f"note: golden files were made with {recorded}, this run uses {library_versions()}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Writing a book's images once per xref (page_images.ImageStore) vs once per placement.
+
+Builds a synthetic DDx PDF with the same logo on every chapter page, a
+figure below the text of every --figure-every pages and a full-page plate
+after every --plates-every pages. Then writes its images:
+
+- per placement: every image a page draws is extracted and written again,
+  the way a page-by-page dump does it,
+- per xref: every placement goes through ImageStore, which writes each
+  image once, with 1 and with --workers processes.
+
+For each mode it prints the files and MB written, seconds and placements
+per second; the deduplicated files must be byte-identical to the per
+placement ones of the same image.
+
+    python -m benchmarks.image_bench [--pages 400] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx  # noqa: E402
+from page_images import ImageStore, image_bytes, image_placements  # noqa: E402
+
+
+def all_placements(pdf_path):
+    with fitz.open(pdf_path) as doc:
+        return [(page_num, placement) for page_num in range(doc.page_count) for placement in image_placements(doc.load_page(page_num))]
+
+
+def per_placement(pdf_path, placements, directory):
+    os.makedirs(directory)
+    written = {}
+    with fitz.open(pdf_path) as doc:
+        for number, (page_num, (xref, name, _)) in enumerate(placements):
+            data = image_bytes(doc, xref, name)
+            with open(os.path.join(directory, f"p{page_num + 1}-{number}-{name}"), "wb") as f:
+                f.write(data)
+            written[xref] = data
+    return written
+
+
+def per_xref(pdf_path, placements, directory, workers):
+    with ImageStore(directory, pdf_path, workers) as store:
+        for _, (xref, name, _) in placements:
+            store.add(xref, name)
+    return store
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400, help="chapter pages (default: %(default)s)")
+    parser.add_argument("--figure-every", type=int, default=5, help="a figure below the text of every n pages (default: %(default)s)")
+    parser.add_argument("--plates-every", type=int, default=10, help="a full-page plate after every n pages (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = os.path.join(workdir, "ddx.pdf")
+        build_ddx(pdf_path, args.pages, image_every=args.figure_every, plates_every=args.plates_every, logo=True)
+        start = time.perf_counter()
+        placements = all_placements(pdf_path)
+        placement_seconds = time.perf_counter() - start
+        print(f"{len(placements)} image placements found in {placement_seconds:.2f}s")
+
+        print(f"{'mode':<22} {'files':>6} {'MB':>7} {'seconds':>8} {'placements/s':>13}  files")
+        directory = os.path.join(workdir, "per_placement")
+        start = time.perf_counter()
+        expected = per_placement(pdf_path, placements, directory)
+        seconds = time.perf_counter() - start
+        print(
+            f"{'per placement':<22} {len(os.listdir(directory)):>6} {directory_bytes(directory) / 1e6:>7.2f}"
+            f" {seconds:>8.2f} {len(placements) / seconds:>13.0f}"
+        )
+        for workers in sorted({1, args.workers}):
+            directory = os.path.join(workdir, f"per_xref_{workers}")
+            start = time.perf_counter()
+            store = per_xref(pdf_path, placements, directory, workers)
+            seconds = time.perf_counter() - start
+            report = store.report()
+            same = all(
+                open(os.path.join(store.directory, ref.split("/", 1)[1]), "rb").read() == expected[xref]
+                for xref, ref in store.refs.items()
+            )
+            mode = f"per xref, {workers} worker{'s' if workers > 1 else ''}"
+            print(
+                f"{mode:<22} {report['files_written']:>6} {directory_bytes(directory) / 1e6:>7.2f}"
+                f" {seconds:>8.2f} {len(placements) / seconds:>13.0f}"
+                f"  {'identical' if same else 'DIFFER'}, {report['dedup_ratio']}x dedup"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Incremental re-extraction after a revision that changes a few pages.
+
+Builds a synthetic DDx PDF and a revision of it: one bullet added to
+--edits random pages, and one chapter title renamed (which changes the
+Chapter column up to the next chapter). Both are extracted with
+pdf_extractor.extract_incremental(). The revision run must give exactly the
+rows of a full run, and the report shows how many pages were reused.
+
+    python -m benchmarks.incremental_bench [--pages 2000] [--edits 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pdf_extractor  # noqa: E402
+from benchmarks.synthetic_pdfs import BOLD, REGULAR, build_ddx  # noqa: E402
+from sinks import ListSink  # noqa: E402
+
+
+def make_revision(base_path, revision_path, edits, seed=0):
+    rnd = random.Random(seed)
+    doc = fitz.open(base_path)
+    edited = sorted(rnd.sample(range(doc.page_count), min(edits, doc.page_count)))
+    for page_num in edited:
+        page = doc.load_page(page_num)
+        writer = fitz.TextWriter(page.rect)
+        writer.append((40, 545), "• Nachtrag zur Differentialdiagnose", font=REGULAR, fontsize=8)
+        writer.write_text(page)
+
+    # Rename the chapter in the middle of the document
+    chapter_page = doc.load_page((doc.page_count // 2) // 4 * 4)
+    title = next(
+        span for block in chapter_page.get_text("dict")["blocks"] for line in block.get("lines", [])
+        for span in line["spans"] if span["size"] >= 12
+    )
+    chapter_page.add_redact_annot(fitz.Rect(title["bbox"]))
+    chapter_page.apply_redactions()
+    writer = fitz.TextWriter(chapter_page.rect)
+    writer.append(title["origin"], "Umbenanntes Kapitel", font=BOLD, fontsize=title["size"])
+    writer.write_text(chapter_page)
+    doc.save(revision_path)
+    return edited + [chapter_page.number]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--edits", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        base = os.path.join(workdir, "base.pdf")
+        revision = os.path.join(workdir, "revision.pdf")
+        manifest = os.path.join(workdir, "out.jsonl.pages")
+        build_ddx(base, args.pages)
+        edited = make_revision(base, revision, args.edits)
+
+        full_sink = ListSink(pdf_extractor.OUTPUT_COLUMNS)
+        _, full_seconds = timed(pdf_extractor.extract_to_sink, revision, full_sink)
+        _, first_seconds = timed(pdf_extractor.extract_incremental, base, ListSink(), manifest)
+        sink = ListSink(pdf_extractor.OUTPUT_COLUMNS)
+        report, seconds = timed(pdf_extractor.extract_incremental, revision, sink, manifest)
+        assert sink.rows == full_sink.rows, "incremental run differs from a full run"
+
+    print(f"edited pages: {edited}")
+    print(f"full run of the revision:     {full_seconds:.2f}s")
+    print(f"first run (builds manifest):  {first_seconds:.2f}s")
+    print(f"incremental run:              {seconds:.2f}s ({full_seconds / seconds:.1f}x faster), identical rows")
+    print(
+        f"{report['pages']} pages: {report['reused']} reused, {report['restitched']} re-stitched, "
+        f"{report['reextracted']} re-extracted; {report['rows_reused']} of {report['rows']} rows reused"
+    )
+
+
+if __name__ == "__main__":
+    main()
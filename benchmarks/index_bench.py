@@ -0,0 +1,133 @@
+"""
+Keyword search and near-duplicate detection: pandas substring scans vs text_index.
+
+Builds --books synthetic DDx PDFs, the first one twice under another name (a
+second printing of the same book), extracts them and writes each book's
+workbook. Then compares:
+
+- search: loading every workbook into pandas and scanning SectionContent
+  with str.contains(), as downstream users do, and the same scan on frames
+  already in memory, against loading the index file once and
+  TextIndex.search(). Both must find the same sections; the index also
+  folds umlauts, so the pandas scan is given the exact spelling,
+- duplicates: exact Jaccard similarity of the word shingles of every pair of
+  documents against TextIndex.near_duplicates(), with the recall of the
+  MinHash pairs measured against the exact ones.
+
+    python -m benchmarks.index_bench [--books 4] [--pages 250]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx  # noqa: E402
+import pdf_extractor  # noqa: E402
+from sinks import open_sink  # noqa: E402
+from text_index import DUPLICATE_THRESHOLD, SHINGLE_WORDS, TextIndex, tokenize  # noqa: E402
+
+QUERIES = ["Übelkeit", "Tuberkulose Endokarditis", "Herzinsuffizienz Anämie Sarkoidose", "Wichtige Hinweise Lymphom"]
+
+
+def pandas_search(frames, query):
+    found = []
+    for book, frame in frames.items():
+        text = frame["Chapter"] + "\n" + frame["SectionContent"]
+        mask = text.str.contains(query.split()[0], regex=False)
+        for word in query.split()[1:]:
+            mask &= text.str.contains(word, regex=False)
+        found += [(book, str(row_number + 1)) for row_number in frame.index[mask]]
+    return found
+
+
+def load_frames(paths):
+    import pandas as pd
+
+    return {book: pd.read_excel(path) for book, path in paths.items()}
+
+
+def exact_duplicates(index, threshold):
+    shingle_sets = []
+    for doc_id, doc in enumerate(index.docs):
+        tokens = tokenize(doc[4])
+        shingle_sets.append((doc_id, {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}))
+    shingle_sets = [(doc_id, shingles) for doc_id, shingles in shingle_sets if index.signatures[doc_id]]
+    pairs = set()
+    for i, (first, a) in enumerate(shingle_sets):
+        for second, b in shingle_sets[i + 1:]:
+            if len(a & b) >= threshold * len(a | b):
+                pairs.add((first, second))
+    return pairs
+
+
+def milliseconds(function, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=4, help="synthetic DDx books, one of them printed twice (default: %(default)s)")
+    parser.add_argument("--pages", type=int, default=250, help="pages per book (default: %(default)s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workbooks, index = {}, TextIndex()
+        for number in range(args.books + 1):
+            book = f"ddx{number:02d}"
+            pdf_path = os.path.join(workdir, f"{book}.pdf")
+            build_ddx(pdf_path, args.pages, seed=max(number - 1, 0))
+            rows = pdf_extractor.extract_rows(pdf_path)
+            workbooks[book] = os.path.join(workdir, f"{book}.xlsx")
+            with open_sink(workbooks[book], pdf_extractor.OUTPUT_COLUMNS) as sink:
+                sink.write_many(rows)
+            index.add_sections(book, rows)
+        index_path = os.path.join(workdir, "corpus.index")
+
+        start = time.perf_counter()
+        index.save(index_path)
+        save_seconds = time.perf_counter() - start
+        load_ms, index = milliseconds(TextIndex.load, index_path, repeat=3)
+        print(
+            f"{len(workbooks)} books x {args.pages} pages, {len(index)} sections, {len(index.postings)} tokens;"
+            f" index {os.path.getsize(index_path) / 1e6:.1f} MB, saved in {save_seconds:.2f}s, loaded in {load_ms:.0f} ms"
+        )
+
+        read_ms, frames = milliseconds(load_frames, workbooks, repeat=1)
+        print(f"pandas read_excel of all workbooks: {read_ms:.0f} ms")
+        print(f"{'query':<38} {'hits':>5} {'read+scan ms':>13} {'scan ms':>8} {'index ms':>9}")
+        for query in QUERIES:
+            scan_ms, found = milliseconds(pandas_search, frames, query)
+            search_ms, hits = milliseconds(index.search, query)
+            same = sorted(found) == sorted((hit.book, hit.key) for hit in hits)
+            print(
+                f"{query:<38} {len(hits):>5} {read_ms + scan_ms:>13.1f} {scan_ms:>8.2f} {search_ms:>9.3f}"
+                f"{'' if same else '  RESULTS DIFFER'}"
+            )
+
+        start = time.perf_counter()
+        exact = exact_duplicates(index, DUPLICATE_THRESHOLD)
+        exact_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        pairs = index.near_duplicates()
+        minhash_seconds = time.perf_counter() - start
+        positions = {tuple(doc[:3]): doc_id for doc_id, doc in enumerate(index.docs)}
+        found = {tuple(sorted((positions[tuple(a[:3])], positions[tuple(b[:3])]))) for _, a, b in pairs}
+        recall = len(found & exact) / len(exact) if exact else 1.0
+        print(
+            f"near-duplicates at {DUPLICATE_THRESHOLD}: exact all-pairs {len(exact)} pairs in {exact_seconds:.2f}s,"
+            f" MinHash/LSH {len(found)} pairs in {minhash_seconds:.3f}s, recall {recall:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
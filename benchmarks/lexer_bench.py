@@ -0,0 +1,228 @@
+"""
+Lines per second of the question/option parser: compiled single-pass lexer
+vs. the previous per-line regex battery.
+
+The input is the text of the bundled questions.xlsx, wrapped into page lines
+with option blocks, "(Continued)" headers, copyright footers and running
+section titles mixed in, repeated to get a stable measurement.
+
+    python -m benchmarks.lexer_bench [--repeat 200] [--rounds 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import textwrap
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas_table  # noqa: E402
+from question_lexer import lex_lines  # noqa: E402
+
+FOOTER = "Copyright © 2008 by The McGraw-Hill Companies, Inc. Click here for terms of use."
+
+
+def build_pages(questions, repeat):
+    pages = []
+    lines = []
+    for r in range(repeat):
+        roman = pandas_table.roman_numerals[r % len(pandas_table.roman_numerals)]
+        for number, question in enumerate(questions, start=1):
+            qid = f"{roman}-{number + (r // 12) * 1000}"
+            body = question.split(". ", 1)[-1] if re.match(r"^[IVX]+-\d+\.", question) else question
+            wrapped = textwrap.wrap(f"{qid}. {body}", 58)
+            if number % 5 == 0 and len(wrapped) > 2:
+                # Question split over a page break with a "(Continued)" header
+                lines.extend(wrapped[:2])
+                lines.extend([FOOTER, "CLINICAL MEDICINE"])
+                pages.append(lines)
+                lines = [f"{qid}. (Continued)"] + wrapped[2:]
+            else:
+                lines.extend(wrapped)
+            words = body.split()
+            for k, letter in enumerate("ABCDE"):
+                option = " ".join(words[k * 3:k * 3 + 6]) or "None of the above"
+                lines.extend(textwrap.wrap(f"{letter}. {option}", 40))
+            if len(lines) > 90:
+                pages.append(lines)
+                lines = []
+    if lines:
+        pages.append(lines)
+    return pages
+
+
+# Previous implementation, kept verbatim (minus the PDF loop) as the baseline
+def legacy_extract_options(lines, start_idx):
+    options = {}
+    current_option = None
+    idx = start_idx
+
+    while idx < len(lines):
+        line = lines[idx].strip()
+
+        # Stop if a new question begins
+        if re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', line):
+            break
+
+        # Skip footer or copyright/junk
+        if re.search(r'Copyright|Click here for terms|McGra|Hill|^\d+[\s\-]', line, re.IGNORECASE):
+            idx += 1
+            continue
+
+        # Skip junk lines (e.g., CLINICAL MEDICINE)
+        if line.isupper() and len(line.split()) <= 4:
+            idx += 1
+            continue
+
+        # Start of new option
+        match = re.match(r'^([A-Ha-h])\. +(.+)', line)
+        if match:
+            current_option = match.group(1).upper()
+            options[current_option] = match.group(2).strip()
+        elif current_option:
+            # Merge hyphenated word across lines
+            if options[current_option].endswith('-') and line and line[0].islower():
+                options[current_option] = options[current_option][:-1] + line.strip()
+            else:
+                options[current_option] += ' ' + line.strip()
+
+        idx += 1
+
+    return options, idx
+
+
+def legacy_clean_question_text(text):
+    print("\n--- Raw Collected Text ---")
+    print(text)
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        if re.search(r'CLINICAL MEDICINE|Hill Companies', line, re.IGNORECASE):
+            print(f"❌ Skipping footer line: {line}")
+            continue
+        cleaned_lines.append(line.strip())
+    text = '. '.join(cleaned_lines)
+    text = re.sub(r'Copyright ©.*?Click here for terms of use\.?', '', text, flags=re.IGNORECASE)
+    print("\n--- After Footer Removal ---")
+    print(text)
+    text = re.sub(r'\(\s*continued\s*\)', '', text, flags=re.IGNORECASE)
+    print("\n--- After Continued Removal ---")
+    print(text)
+    text = text.replace('-\n', '').replace('\n', ' ')
+    text = re.sub(r'(\w)-\s+(\w)', r'\1\2', text)
+    print("\n--- After Hyphen Fix ---")
+    print(text)
+    return text.strip()
+
+
+def legacy_save(questions, question_number, current_question_lines):
+    full_text = ' '.join(current_question_lines)
+    words = full_text.split()
+    if len(words) > 4:
+        first_part = ' '.join(words[:4])
+        rest_part = ' '.join(words[4:])
+        question_label_pattern = re.escape(question_number) + r'\.\s*'
+        rest_part = re.sub(question_label_pattern, '', rest_part)
+        full_text = f"{first_part} {rest_part}"
+    else:
+        full_text = ' '.join(words)
+    cleaned = legacy_clean_question_text(full_text)
+    print(f"📝 Cleaning question text: {cleaned}")
+    if question_number in questions:
+        questions[question_number] += ' ' + cleaned
+    else:
+        questions[question_number] = cleaned
+
+
+def legacy_parse(pages):
+    questions = {}
+    question_number = None
+    current_question_lines = []
+    for all_lines in pages:
+        i = 0
+        while i < len(all_lines):
+            line = all_lines[i].strip()
+            if re.match(r'^[A-Ha-h]\.', line.strip()):
+                options_dict, new_idx = legacy_extract_options(all_lines, i)
+                print(f"📌 Collected options block: {options_dict}")
+                i = new_idx
+                continue
+            match = re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-(\d+)\.', line)
+            continued_match = re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-(\d+)\. \(Continued\)', line, re.IGNORECASE)
+            if continued_match:
+                cont_qnum = f"{continued_match.group(1)}-{continued_match.group(2)}"
+                if question_number == cont_qnum:
+                    cleaned_line = re.sub(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\. \(Continued\)', '', line, flags=re.IGNORECASE).strip()
+                    current_question_lines.append(cleaned_line)
+                i += 1
+                continue
+            if match:
+                new_qnum = f"{match.group(1)}-{match.group(2)}"
+                if new_qnum == question_number:
+                    cleaned_line = re.sub(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', '', line).strip()
+                    current_question_lines.append(cleaned_line)
+                    i += 1
+                    continue
+                if question_number and current_question_lines:
+                    legacy_save(questions, question_number, current_question_lines)
+                question_number = new_qnum
+                current_question_lines = [line]
+            elif question_number:
+                dup_header_inside = re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', line)
+                if dup_header_inside:
+                    line = re.sub(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', '', line).strip()
+                current_question_lines.append(line)
+            i += 1
+    if question_number and current_question_lines:
+        legacy_save(questions, question_number, current_question_lines)
+    return [questions[q] for q in sorted(questions, key=pandas_table.question_sort_key)]
+
+
+def lexer_parse(pages):
+    collector = pandas_table.QuestionCollector()
+    for all_lines in pages:
+        collector.feed_tokens(lex_lines(all_lines))
+    return collector.finish()
+
+
+def best_of(func, pages, rounds):
+    best = None
+    result = None
+    for _ in range(rounds):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(pages)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--xlsx", default=os.path.join(ROOT, "questions.xlsx"))
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    questions = [q for q in pd.read_excel(args.xlsx)["Questions"].fillna("") if q]
+    pages = build_pages(questions, args.repeat)
+    line_count = sum(len(lines) for lines in pages)
+
+    legacy_time, legacy_result = best_of(legacy_parse, pages, args.rounds)
+    lexer_time, lexer_result = best_of(lexer_parse, pages, args.rounds)
+
+    print(f"{line_count} lines on {len(pages)} pages, {len(lexer_result)} questions")
+    print(f"{'parser':>8} {'seconds':>9} {'lines/s':>11}")
+    print(f"{'legacy':>8} {legacy_time:>9.3f} {line_count / legacy_time:>11.0f}")
+    print(f"{'lexer':>8} {lexer_time:>9.3f} {line_count / lexer_time:>11.0f}")
+    print(f"speedup {legacy_time / lexer_time:.2f}x, identical output: {legacy_result == lexer_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Resident memory across a long document, normal vs --low-memory.
+
+Builds a synthetic DDx PDF with a raster figure on every --image-every-th
+page and a synthetic Harrison PDF, then runs each configuration in a fresh
+process (so one run's heap doesn't carry into the next) and samples RSS
+after every page with memory.MemoryGuard:
+
+- pdf_extractor, default and low-memory (text-only get_text, cache release,
+  capped pages in flight), without the span cache,
+- pandas_table with pdfplumber, pages kept open as the script used to do,
+  and closed after reading (now always), default and low-memory,
+- pandas_table with pymupdf, low-memory.
+
+For each run it prints RSS after the first page, at 10%, 50% and 100% of
+the pages, the peak and the growth from 10% to the end per 1000 pages; a
+flat run grows by a few MB at most.
+
+    python -m benchmarks.memory_bench [--pages 3000] [--image-every 1] [--harrison-scale 0.25]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx, build_harrison  # noqa: E402
+from memory import MemoryGuard  # noqa: E402
+
+# An infinite limit turns sampling on without ever stopping the run
+SAMPLE_ONLY = float("inf")
+
+
+def _keep_pages_open():
+    """pdfplumber page_text() as it was before pages were closed after reading."""
+    import page_text
+
+    def page_text_kept(self, page_index, header=page_text.HEADER_HEIGHT, footer=page_text.FOOTER_HEIGHT):
+        page = self.pdf.pages[page_index]
+        return page.within_bbox((0, header, page.width, page.height - footer)).extract_text() or ''
+
+    page_text.PdfplumberSource.page_text = page_text_kept
+
+
+def run_ddx(pdf_path, low_memory, output):
+    import pdf_extractor
+    from sinks import open_sink
+
+    memory = MemoryGuard(low_memory, SAMPLE_ONLY)
+    with open_sink(output, pdf_extractor.OUTPUT_COLUMNS) as sink:
+        pdf_extractor.extract_to_sink(pdf_path, sink, memory=memory)
+    return memory
+
+
+def run_harrison(pdf_path, low_memory, engine, keep_pages):
+    import pandas_table
+    from page_index import load_page_index
+
+    if keep_pages:
+        _keep_pages_open()
+    memory = MemoryGuard(low_memory, SAMPLE_ONLY)
+    index = load_page_index(pdf_path)
+    # Every page of the answer parts, not just the indexed ones, so the run is as long as the document allows
+    sections = pandas_table.iter_sections(pdf_path, index.sections(), page_offset=0, engine=engine, memory=memory)
+    for _ in sections:
+        pass
+    return memory
+
+
+def summarize(page_rss):
+    samples = [page_rss[page_num] for page_num in sorted(page_rss)]
+    count = len(samples)
+    tenth = samples[max(0, count // 10 - 1)]
+    return {
+        "pages": count,
+        "first": samples[0],
+        "10%": tenth,
+        "50%": samples[count // 2 - 1],
+        "100%": samples[-1],
+        "peak": max(samples),
+        "growth_per_1000": (samples[-1] - tenth) / max(count - count // 10, 1) * 1000,
+    }
+
+
+def child(args):
+    start = time.perf_counter()
+    if args.run == "ddx":
+        memory = run_ddx(args.pdf, args.low_memory, args.output)
+    else:
+        memory = run_harrison(args.pdf, args.low_memory, args.engine, args.keep_pages)
+    result = summarize(memory.page_rss)
+    result["seconds"] = time.perf_counter() - start
+    print(json.dumps(result))
+
+
+def measure(*arguments):
+    command = [sys.executable, "-m", "benchmarks.memory_bench", "--run", *arguments]
+    completed = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=3000, help="DDx page count (default: %(default)s)")
+    parser.add_argument("--image-every", type=int, default=1, help="a figure on every n-th DDx page (default: %(default)s)")
+    parser.add_argument("--harrison-scale", type=float, default=0.25, help="Harrison page scale, 1.0 is 475 pages (default: %(default)s)")
+    parser.add_argument("--run", choices=["ddx", "harrison"], help=argparse.SUPPRESS)
+    parser.add_argument("--pdf", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--engine", default="pdfplumber", help=argparse.SUPPRESS)
+    parser.add_argument("--low-memory", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--keep-pages", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        ddx = os.path.join(workdir, "ddx.pdf")
+        harrison = os.path.join(workdir, "harrison.pdf")
+        build_ddx(ddx, args.pages, image_every=args.image_every)
+        build_harrison(harrison, args.harrison_scale)
+        output = os.path.join(workdir, "out.csv")
+
+        runs = [
+            ("pdf_extractor", ("ddx", "--pdf", ddx, "--output", output)),
+            ("pdf_extractor --low-memory", ("ddx", "--pdf", ddx, "--output", output, "--low-memory")),
+            ("pdfplumber, pages kept open", ("harrison", "--pdf", harrison, "--keep-pages")),
+            ("pdfplumber", ("harrison", "--pdf", harrison)),
+            ("pdfplumber --low-memory", ("harrison", "--pdf", harrison, "--low-memory")),
+            ("pymupdf --low-memory", ("harrison", "--pdf", harrison, "--engine", "pymupdf", "--low-memory")),
+        ]
+        print(f"RSS in MB; DDx {args.pages} pages (figure every {args.image_every}), Harrison scale {args.harrison_scale}")
+        print(
+            f"{'':<28} {'pages':>6} {'first':>7} {'10%':>7} {'50%':>7} {'100%':>7} {'peak':>7}"
+            f" {'MB/1000p':>9} {'seconds':>8}"
+        )
+        for name, arguments in runs:
+            result = measure(*arguments)
+            print(
+                f"{name:<28} {result['pages']:>6} {result['first']:>7.0f} {result['10%']:>7.0f} {result['50%']:>7.0f}"
+                f" {result['100%']:>7.0f} {result['peak']:>7.0f} {result['growth_per_1000']:>9.1f} {result['seconds']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Writing and querying bullets: workbooks of section strings vs a Parquet dataset.
+
+Builds --documents synthetic DDx PDFs and extracts each once (not timed).
+Then, for the whole corpus:
+
+- write: every document's sections to its own .xlsx workbook, the way
+  pdf_extractor always has, vs every document's bullets to one Parquet
+  dataset partitioned by document (pdf_extractor --bullets),
+- query: the bullets of one chapter in one document, and of the same
+  chapter across all documents. From the workbooks that means opening them
+  (all of them for the corpus query) and splitting the SectionContent
+  strings back into bullets and "(Page N)" tags; from Parquet it is a
+  pyarrow.dataset filter, which skips the other documents' partitions and
+  reads only the two columns asked for.
+
+Both queries must return the same bullets from both sources.
+
+    python -m benchmarks.parquet_bench [--documents 8] [--pages 250]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx, ddx_chapter_title  # noqa: E402
+import pdf_extractor  # noqa: E402
+from sinks import ListSink, open_sink  # noqa: E402
+
+_PAGE_TAG_RE = re.compile(r"\(Page (\d+)\)$")
+
+
+def extract(pdf_path):
+    rows, bullets = ListSink(pdf_extractor.OUTPUT_COLUMNS), ListSink(pdf_extractor.BULLET_COLUMNS)
+    pdf_extractor.extract_to_sink(pdf_path, rows, bullet_sink=bullets)
+    return rows.rows, bullets.rows
+
+
+def write_workbooks(corpus, directory):
+    os.makedirs(directory)
+    for document, (rows, _) in corpus.items():
+        with open_sink(os.path.join(directory, f"{document}.xlsx"), pdf_extractor.OUTPUT_COLUMNS) as sink:
+            sink.write_many(rows)
+
+
+def write_dataset(corpus, directory):
+    for document, (_, bullets) in corpus.items():
+        with pdf_extractor.open_bullet_sink(directory, f"{document}.pdf") as sink:
+            sink.write_many(bullets)
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def workbook_bullets(path, chapter):
+    """(bullet text, page) of chapter's sections, parsed out of SectionContent."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    found = []
+    for row_chapter, content in workbook.active.iter_rows(min_row=2, values_only=True):
+        if row_chapter != chapter or not content:
+            continue
+        # Every bullet_text chunk ends with its page tag
+        chunk = []
+        for line in content.splitlines():
+            tag = _PAGE_TAG_RE.match(line)
+            if tag:
+                found += [(text, int(tag.group(1))) for text in chunk]
+                chunk = []
+            elif line.startswith("•"):
+                chunk.append(line)
+    workbook.close()
+    return found
+
+
+def query_workbooks(directory, documents, chapter, pages=None):
+    found = []
+    for document in documents:
+        for text, page in workbook_bullets(os.path.join(directory, f"{document}.xlsx"), chapter):
+            if pages is None or pages[0] <= page <= pages[1]:
+                found.append((document, text))
+    return found
+
+
+def query_dataset(directory, documents, chapter, pages=None):
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(directory, format="parquet", partitioning="hive")
+    condition = ds.field("Chapter") == chapter
+    if len(documents) == 1:
+        condition &= ds.field("document") == documents[0]
+    if pages is not None:
+        condition &= (ds.field("Page") >= pages[0]) & (ds.field("Page") <= pages[1])
+    table = dataset.to_table(columns=["document", "Text"], filter=condition)
+    return list(zip(table.column("document").to_pylist(), table.column("Text").to_pylist()))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=8, help="synthetic DDx PDFs in the corpus (default: %(default)s)")
+    parser.add_argument("--pages", type=int, default=250, help="pages per PDF (default: %(default)s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = {}
+        for number in range(args.documents):
+            document = f"ddx{number:02d}"
+            pdf_path = os.path.join(workdir, f"{document}.pdf")
+            build_ddx(pdf_path, args.pages, seed=number)
+            corpus[document] = extract(pdf_path)
+        documents = list(corpus)
+        bullet_count = sum(len(bullets) for _, bullets in corpus.values())
+        print(f"{len(documents)} documents x {args.pages} pages, {bullet_count} bullets")
+
+        workbooks, dataset = os.path.join(workdir, "xlsx"), os.path.join(workdir, "bullets")
+        xlsx_seconds, _ = timed(write_workbooks, corpus, workbooks)
+        parquet_seconds, _ = timed(write_dataset, corpus, dataset)
+        print(f"{'':<36} {'xlsx':>9} {'parquet':>9} {'speedup':>8}")
+        print(f"{'write seconds':<36} {xlsx_seconds:>9.3f} {parquet_seconds:>9.3f} {xlsx_seconds / parquet_seconds:>7.1f}x")
+        print(f"{'size MB':<36} {directory_bytes(workbooks) / 1e6:>9.2f} {directory_bytes(dataset) / 1e6:>9.2f}")
+
+        # A chapter in the middle of the book
+        chapter = ddx_chapter_title(args.pages // 8)
+        print(f"queries for chapter '{chapter}'")
+        queries = [
+            ("one document", [documents[-1]], chapter, None),
+            ("all documents", documents, chapter, None),
+        ]
+        for name, selected, query_chapter, pages in queries:
+            xlsx_seconds, from_workbooks = timed(query_workbooks, workbooks, selected, query_chapter, pages)
+            parquet_seconds, from_dataset = timed(query_dataset, dataset, selected, query_chapter, pages)
+            same = sorted(from_workbooks) == sorted(from_dataset)
+            print(
+                f"{'query, ' + name:<36} {xlsx_seconds:>9.3f} {parquet_seconds:>9.3f} {xlsx_seconds / parquet_seconds:>7.1f}x"
+                f"  {len(from_dataset)} bullets{'' if same else ', RESULTS DIFFER'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
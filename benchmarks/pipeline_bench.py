@@ -0,0 +1,99 @@
+"""
+End-to-end throughput and peak memory of both scripts on synthetic PDFs.
+
+Builds (or reuses) a DDx and a Harrison PDF of the requested size in the
+work directory, runs pdf_extractor.py and pandas_table.py on them as
+separate processes (quiet, JSONL output, no span cache, page index rebuilt)
+and reports wall time, pages per second and peak RSS. Peak RSS is the
+largest resident size of the script's process tree as reported by wait4().
+
+    python -m benchmarks.pipeline_bench --ddx-pages 2000 --harrison-scale 1 [--workers 2] [--engine pymupdf]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx, build_harrison  # noqa: E402
+from page_text import ENGINES  # noqa: E402
+
+
+def ensure_ddx(workdir, pages, seed):
+    path = os.path.join(workdir, f"ddx-{pages}-s{seed}.pdf")
+    if not os.path.exists(path):
+        print(f"building {path}")
+        build_ddx(path, pages, seed)
+    return path, pages
+
+
+def ensure_harrison(workdir, scale, seed):
+    path = os.path.join(workdir, f"harrison-x{scale:g}-s{seed}.pdf")
+    if not os.path.exists(f"{path}.sections.json"):
+        print(f"building {path}")
+        build_harrison(path, scale, seed)
+    with open(f"{path}.sections.json", encoding="utf-8") as f:
+        sections = json.load(f)
+    return path, sum(end - start for start, end in sections.values())
+
+
+def run_measured(command, cwd):
+    """(wall seconds, peak RSS in MB) of one child process."""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    stderr = process.stderr.read().decode(errors="replace")
+    process.stderr.close()
+    if process.returncode:
+        raise RuntimeError(f"{' '.join(command)} failed with {process.returncode}:\n{stderr}")
+    # ru_maxrss is in KB on Linux, in bytes on macOS
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, rss
+
+
+def count_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ddx-pages", type=int, default=2000)
+    parser.add_argument("--harrison-scale", type=float, default=1.0, help="1.0 is the book's 475 pages")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="pdfplumber", help="pandas_table text backend")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="where the PDFs are built and kept (default: a temporary directory)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        ddx_pdf, ddx_pages = ensure_ddx(workdir, args.ddx_pages, args.seed)
+        harrison_pdf, harrison_pages = ensure_harrison(workdir, args.harrison_scale, args.seed)
+
+        runs = [
+            ("pdf_extractor", ddx_pdf, ddx_pages, ["--no-cache"]),
+            ("pandas_table", harrison_pdf, harrison_pages, ["--reindex", "--engine", args.engine]),
+        ]
+        print(f"{'script':>14} {'pages':>6} {'rows':>6} {'seconds':>8} {'pages/s':>8} {'peak MB':>8}")
+        for script, pdf, pages, extra in runs:
+            output = os.path.join(workdir, f"{script}-out.jsonl")
+            command = [
+                sys.executable, os.path.join(ROOT, f"{script}.py"), pdf, "-q", "-o", output,
+                "--workers", str(args.workers), *extra,
+            ]
+            # pandas_table also writes questions_<N>.jsonl into its working directory
+            elapsed, rss = run_measured(command, workdir)
+            print(f"{script:>14} {pages:>6} {count_lines(output):>6} {elapsed:>8.2f} {pages / elapsed:>8.1f} {rss:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+pdf_extractor with and without the page probe (page_probe.py).
+
+Builds two synthetic DDx books with the same chapter pages: the plain one
+the other benchmarks use, where every page is inside a section, and a
+"whole book" with a title page, contents and preface, a full-page figure
+after every --plates-every pages and a --index-pages index at the end. Each
+is extracted (tables on, no span cache) with every page going through
+get_text("dict") and with the probe, and the best of --repeat interleaved
+runs is reported with the pages that took the fast path and whether the
+rows and matrix cells are identical. The probe runs leave out the sample of skipped
+pages extracted afterwards for pdf_extractor's own speedup estimate.
+
+    python -m benchmarks.probe_bench [--pages 400] [--workers 1]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx  # noqa: E402
+from ddx_tables import TABLE_COLUMNS  # noqa: E402
+import pdf_extractor  # noqa: E402
+from profiling import StageProfiler  # noqa: E402
+from sinks import ListSink  # noqa: E402
+
+
+def run(pdf_path, workers, probe):
+    rows, tables, profile = ListSink(pdf_extractor.OUTPUT_COLUMNS), ListSink(TABLE_COLUMNS), StageProfiler()
+    start = time.perf_counter()
+    pdf_extractor.extract_to_sink(pdf_path, rows, workers, table_sink=tables, profile=profile, probe=probe)
+    # Not the probe's own cost: the skipped pages it extracts afterwards for the log's estimate
+    seconds = time.perf_counter() - start - profile.stages["probe_calibration"]
+    return seconds, rows.rows + tables.rows, profile.counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400, help="chapter pages per book (default: %(default)s)")
+    parser.add_argument("--front-matter", type=int, default=12, help="title, contents and preface pages (default: %(default)s)")
+    parser.add_argument("--plates-every", type=int, default=8, help="a full-page figure after every n pages (default: %(default)s)")
+    parser.add_argument("--index-pages", type=int, default=40, help="index pages at the end (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        books = {
+            "chapters only": os.path.join(workdir, "ddx.pdf"),
+            "whole book": os.path.join(workdir, "book.pdf"),
+        }
+        build_ddx(books["chapters only"], args.pages)
+        build_ddx(books["whole book"], args.pages, front_matter=args.front_matter, plates_every=args.plates_every, index_pages=args.index_pages)
+
+        print(f"{'book':<15} {'pages':>6} {'no probe s':>11} {'probe s':>8} {'speedup':>8} {'empty':>6} {'plain':>6}  output")
+        for name, pdf_path in books.items():
+            # Interleaved, so both modes see the same machine load
+            runs = {False: [], True: []}
+            for _ in range(args.repeat):
+                for probe in runs:
+                    runs[probe].append(run(pdf_path, args.workers, probe))
+            baseline, expected, _ = min(runs[False], key=lambda result: result[0])
+            probed, output, counters = min(runs[True], key=lambda result: result[0])
+            print(
+                f"{name:<15} {sum(counters[f'pages_probe_{verdict}'] for verdict in ('empty', 'plain', 'full')):>6}"
+                f" {baseline:>11.2f} {probed:>8.2f} {baseline / probed:>7.2f}x"
+                f" {counters['pages_probe_empty']:>6} {counters['pages_probe_plain']:>6}"
+                f"  {'identical' if output == expected else 'DIFFERS'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
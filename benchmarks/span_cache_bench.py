@@ -0,0 +1,60 @@
+"""
+Cold vs. warm span cache timing for pdf_extractor.py.
+
+Runs the extraction three times on the same PDF: without the cache, with an
+empty cache (cold) and again with the now filled cache (warm), and splits
+each run into page loading (get_text or cache read) and the rest
+(classification and stitching).
+
+    python -m benchmarks.span_cache_bench "DDx Tabelle.pdf"
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pdf_extractor  # noqa: E402
+from span_cache import SpanCache  # noqa: E402
+
+
+def timed_run(pdf_path, cache):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        rows = pdf_extractor.extract_rows(pdf_path, cache=cache)
+        elapsed = time.perf_counter() - start
+    return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf")
+    args = parser.parse_args()
+
+    results = []
+    plain_time, plain_rows = timed_run(args.pdf, None)
+    results.append(("no cache", plain_time, None))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cold", "warm"):
+            cache = SpanCache(cache_dir)
+            elapsed, rows = timed_run(args.pdf, cache)
+            assert rows == plain_rows, f"{label} cache run changed the output"
+            results.append((label, elapsed, cache))
+
+    print(f"{'run':>9} {'total s':>8} {'load s':>8} {'other s':>8} {'hits':>6} {'misses':>6}")
+    for label, elapsed, cache in results:
+        if cache is None:
+            print(f"{label:>9} {elapsed:>8.3f} {'-':>8} {'-':>8} {'-':>6} {'-':>6}")
+            continue
+        load = cache.load_seconds + cache.extract_seconds
+        print(f"{label:>9} {elapsed:>8.3f} {load:>8.3f} {elapsed - load:>8.3f} {cache.hits:>6} {cache.misses:>6}")
+    print(f"warm speedup over no cache: {plain_time / results[-1][1]:.2f}x, identical output")
+
+
+if __name__ == "__main__":
+    main()
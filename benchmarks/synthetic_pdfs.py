@@ -0,0 +1,459 @@
+"""
+Synthetic PDFs with the layouts pdf_extractor.py and pandas_table.py expect.
+
+DDx: 420x600 pages with a running "3 8 Allgemeinsymptome ..." header, a
+14pt chapter title every few pages (repeated as an 8pt running title on the
+following pages), the four KNOWN_SECTIONS in 9pt bold, bold 8pt
+häufig/gelegentlich/selten sub-subsections with bullets, 7.5pt ja/nein
+matrix rows and page-number footers. image_every=n adds a raster figure
+below the text of every n-th page. front_matter, plates_every and
+index_pages add the pages a real book has around its chapters: a 16pt title
+page, a contents listing and preface text before the first chapter, a
+full-page figure without text after every n-th page, and a 14pt
+"Sachverzeichnis" with two-column index entries at the end. logo=True puts
+the same small image (one XObject) in the top corner of every chapter
+page. These use their own random generator, so the chapter pages' text is
+the same with or without them.
+
+Harrison: 612x792 two-column pages laid out like the self-assessment book,
+i.e. 11 front-matter pages (with the CONTENTS listing) followed by the
+question and answer parts of sections I-XII at the printed pages of the
+table of contents. Questions look like "IV-12." with A.-H. options, and a
+question that runs over a page break starts the next page with
+"IV-12. (Continued)". scale stretches every part, so scale=4 gives ~1900
+pages; the section ranges in pandas_table's chap numbering are returned
+and written next to the PDF as <pdf>.sections.json.
+
+Both generators are deterministic for a given seed.
+
+    python -m benchmarks.synthetic_pdfs ddx ddx.pdf --pages 2000
+    python -m benchmarks.synthetic_pdfs harrison harrison.pdf --scale 4
+"""
+import argparse
+import json
+import random
+
+import fitz  # PyMuPDF
+
+# NimbusSans, embedded once per document. The base-14 "helv" has no glyph for "•"
+REGULAR = fitz.Font("helv")
+BOLD = fitz.Font("hebo")
+
+KNOWN_SECTIONS = ["Ursachen", "Untersuchungen", "Wichtige Hinweise", "Alarmsignale"]
+SUBSUB_HEADINGS = ["häufig", "gelegentlich", "selten"]
+MATRIX_WORDS = ["ja", "nein", "eventuell"]
+DDX_CHAPTERS = [
+    "Fieber", "Gewichtsverlust", "Müdigkeit", "Nachtschweiß", "Kopfschmerz", "Schwindel", "Synkope",
+    "Brustschmerz", "Dyspnoe", "Husten", "Hämoptyse", "Übelkeit und Erbrechen", "Bauchschmerz",
+    "Diarrhö", "Obstipation", "Ikterus", "Ödeme", "Gelenkschmerz", "Rückenschmerz", "Juckreiz",
+]
+DDX_WORDS = (
+    "Infektion Entzündung Tumor Medikament Stoffwechsel Erkrankung Syndrom chronische akute "
+    "Niereninsuffizienz Herzinsuffizienz Anämie Hypothyreose Depression Malnutrition Tuberkulose "
+    "Lymphom Leukämie Vaskulitis Sarkoidose Endokarditis Pneumonie Hepatitis Diabetes"
+).split()
+
+ROMAN_NUMERALS = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+# (title, first question page, first answer page) as printed in the book's CONTENTS
+HARRISON_TOC = [
+    ("INTRODUCTION TO CLINICAL MEDICINE", 1, 18),
+    ("NUTRITION", 47, 50),
+    ("ONCOLOGY AND HEMATOLOGY", 55, 71),
+    ("INFECTIOUS DISEASES", 103, 130),
+    ("DISORDERS OF THE CARDIOVASCULAR SYSTEM", 175, 202),
+    ("DISORDERS OF THE RESPIRATORY SYSTEM", 237, 254),
+    ("DISORDERS OF THE URINARY AND KIDNEY TRACT", 283, 293),
+    ("DISORDERS OF THE GASTROINTESTINAL SYSTEM", 307, 321),
+    ("RHEUMATOLOGY AND IMMUNOLOGY", 345, 358),
+    ("ENDOCRINOLOGY AND METABOLISM", 379, 393),
+    ("NEUROLOGIC DISORDERS", 421, 435),
+    ("DERMATOLOGY", 457, 460),
+]
+HARRISON_LAST_PAGE = 465
+FRONT_MATTER_PAGES = 11
+HARRISON_WORDS = (
+    "patient fever cough renal hepatic cardiac therapy dose chronic acute infection syndrome diagnosis "
+    "treatment presents with history of following most likely serum elevated biopsy weeks examination "
+    "pressure pain shows normal blood count"
+).split()
+FOOTER = "Copyright © 2008 by The McGraw-Hill Companies, Inc. Click here for terms of use."
+
+
+class _Page:
+    """A new page whose text is collected in one TextWriter and written by finish()."""
+
+    def __init__(self, doc, width, height):
+        self.page = doc.new_page(width=width, height=height)
+        # pdfplumber warns about every page without one
+        self.page.set_cropbox(self.page.rect)
+        self.writer = fitz.TextWriter(self.page.rect)
+
+    def text(self, pos, line, size=8, bold=False):
+        self.writer.append(pos, line, font=BOLD if bold else REGULAR, fontsize=size)
+
+    def finish(self):
+        self.writer.write_text(self.page)
+
+
+def _words(rnd, words, count):
+    return " ".join(rnd.choice(words) for _ in range(count))
+
+
+def _save(doc, path):
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+# ➤ DDx
+
+def ddx_chapter_title(number):
+    name = DDX_CHAPTERS[number % len(DDX_CHAPTERS)]
+    return name if number < len(DDX_CHAPTERS) else f"{name} {number // len(DDX_CHAPTERS) + 1}"
+
+
+def _ddx_block(page, rnd, y):
+    """Draw one content block at y, return the y after it."""
+    def text(line, size=8, bold=False, x=40):
+        page.text((x, y), line, size, bold)
+
+    kind = rnd.random()
+    if kind < 0.15:
+        text(rnd.choice(KNOWN_SECTIONS), size=9, bold=True)
+        return y + 22
+    if kind < 0.3:
+        text(rnd.choice(SUBSUB_HEADINGS), bold=True)
+        y += 10
+        for _ in range(rnd.randint(1, 3)):
+            text("• " + _words(rnd, DDX_WORDS, 5))
+            y += 10
+        return y + 12
+    if kind < 0.36 and y < 300:
+        # Differential matrix: 7.5pt label and one cell per column
+        columns = rnd.randint(5, 9)
+        for _ in range(rnd.randint(8, 20)):
+            text(rnd.choice(DDX_WORDS), size=7.5)
+            for column in range(columns):
+                text(rnd.choice(MATRIX_WORDS), size=7.5, x=150 + column * 30)
+            y += 9
+        return y + 14
+    if kind < 0.45:
+        for _ in range(rnd.randint(2, 4)):
+            text(" ".join(rnd.choice(MATRIX_WORDS) for _ in range(5)), size=7.5)
+            y += 9
+        return y + 14
+    if kind < 0.55:
+        text("Hinweis " + _words(rnd, DDX_WORDS, 3), size=7.5)
+        y += 9
+        text("• " + _words(rnd, DDX_WORDS, 4))
+        return y + 22
+    for index in range(rnd.randint(1, 4)):
+        text(("• " if index == 0 else "") + _words(rnd, DDX_WORDS, rnd.randint(3, 7)))
+        y += 10
+    return y + 14
+
+
+def _ddx_figure(rnd, width=1200, height=200):
+    """A PNG figure; each one differs, like the book's, so none is shared between pages."""
+    # Vertical stripes of random colours, 100 pixels wide
+    row = b"".join(bytes(rnd.randrange(256) for _ in range(3)) * 100 for _ in range(width // 100))
+    return fitz.Pixmap(fitz.csRGB, width, height, row * height, False).tobytes("png")
+
+
+def _ddx_front_matter(doc, rnd, pages, chapters, pages_per_chapter):
+    for index in range(pages):
+        page = _Page(doc, 420, 600)
+        if index == 0:
+            page.text((80, 200), "Differenzialdiagnose", 16, bold=True)
+            page.text((80, 230), "Allgemeinsymptome bei Erwachsenen", 10)
+        elif index == 1:
+            page.text((40, 60), "Inhaltsverzeichnis", 10, bold=True)
+            for number in range(min(chapters, 45)):
+                page.text((40, 85 + number * 10), f"{ddx_chapter_title(number)} {number * pages_per_chapter + 1}", 8)
+        else:
+            y = 60
+            while y < 540:
+                page.text((40, y), _words(rnd, DDX_WORDS, rnd.randint(6, 9)), 8)
+                y += 10 if rnd.random() < 0.85 else 20
+        page.finish()
+
+
+def _ddx_plate(doc, rnd):
+    page = doc.new_page(width=420, height=600)
+    page.set_cropbox(page.rect)
+    page.insert_image(fitz.Rect(40, 60, 380, 540), stream=_ddx_figure(rnd, 600, 840))
+
+
+def _ddx_index(doc, rnd, pages):
+    for index in range(pages):
+        page = _Page(doc, 420, 600)
+        y = 60
+        if index == 0:
+            page.text((40, y), "Sachverzeichnis", 14, bold=True)
+            y += 30
+        top = y
+        for x in (40, 220):
+            y = top
+            while y < 560:
+                page.text((x, y), f"{rnd.choice(DDX_WORDS)}, {rnd.randint(1, 900)}", 8)
+                y += 9
+        page.finish()
+
+
+def build_ddx(path, pages, seed=0, pages_per_chapter=4, image_every=0, front_matter=0, plates_every=0, index_pages=0, logo=False):
+    rnd = random.Random(seed)
+    extra = random.Random(seed + 1)
+    doc = fitz.open()
+    logo_image = _ddx_figure(extra, 300, 100) if logo else None
+    logo_xref = 0
+    _ddx_front_matter(doc, extra, front_matter, -(-pages // pages_per_chapter), pages_per_chapter)
+    chapter = None
+    for page_num in range(pages):
+        page = _Page(doc, 420, 600)
+        page.text((40, 30), f"{page_num + 1} {rnd.randint(1, 9)} Allgemeinsymptome bei Erwachsenen", 7)
+        y = 60
+        if page_num % pages_per_chapter == 0:
+            chapter = ddx_chapter_title(page_num // pages_per_chapter)
+            page.text((40, y), chapter, 14, bold=True)
+            y += 30
+        else:
+            page.text((40, y), chapter, 8)
+            y += 25
+        while y < 520:
+            y = _ddx_block(page, rnd, y)
+        page.text((200, 580), str(page_num + 1), 7)
+        page.finish()
+        if image_every and page_num % image_every == 0:
+            page.page.insert_image(fitz.Rect(40, 530, 380, 565), stream=_ddx_figure(rnd))
+        if logo:
+            # Embedded once, then placed by xref
+            logo_rect = fitz.Rect(350, 12, 390, 25)
+            if logo_xref:
+                page.page.insert_image(logo_rect, xref=logo_xref)
+            else:
+                logo_xref = page.page.insert_image(logo_rect, stream=logo_image)
+        if plates_every and page_num % plates_every == plates_every - 1:
+            _ddx_plate(doc, extra)
+    _ddx_index(doc, extra, index_pages)
+    _save(doc, path)
+
+
+# ➤ Harrison
+
+def harrison_layout(scale=1.0):
+    """[(roman, title, first question page, first answer page, end page)] in printed page numbers."""
+    def stretch(printed):
+        return 1 + round((printed - 1) * scale)
+
+    layout = []
+    for index, (title, questions, answers) in enumerate(HARRISON_TOC):
+        end = HARRISON_TOC[index + 1][1] if index + 1 < len(HARRISON_TOC) else HARRISON_LAST_PAGE
+        start, answers, end = stretch(questions), stretch(answers), stretch(end)
+        # Every part keeps at least one page
+        answers = max(answers, start + 1)
+        end = max(end, answers + 1)
+        if layout and start < layout[-1][4]:
+            shift = layout[-1][4] - start
+            start, answers, end = start + shift, answers + shift, end + shift
+        layout.append((ROMAN_NUMERALS[index], title, start, answers, end))
+    return layout
+
+
+class _TwoColumnWriter:
+    """Fills 9pt lines into the two columns of one page after the other."""
+
+    LINE_HEIGHT = 12
+    TOP = 80
+    BOTTOM = 740
+    COLUMNS = (40, 320)
+    CHARS_PER_LINE = 52
+
+    def __init__(self, doc, running_header):
+        self.doc = doc
+        self.running_header = running_header
+        self.page = None
+        self.column = 0
+        self.y = self.TOP
+
+    def start_page(self):
+        self.finish()
+        printed = self.doc.page_count - FRONT_MATTER_PAGES + 1
+        self.page = _Page(self.doc, 612, 792)
+        self.page.text((40, 30), self.running_header, 8)
+        self.page.text((560, 30), str(printed), 8)
+        self.page.text((40, 775), FOOTER, 6)
+        self.column = 0
+        self.y = self.TOP
+
+    def finish(self):
+        if self.page is not None:
+            self.page.finish()
+            self.page = None
+
+    def put(self, line):
+        """Write one line, return False if the page is full."""
+        if self.y > self.BOTTOM:
+            if self.column == 0:
+                self.column = 1
+                self.y = self.TOP
+            else:
+                return False
+        self.page.text((self.COLUMNS[self.column], self.y), line, 9)
+        self.y += self.LINE_HEIGHT
+        return True
+
+    def gap(self):
+        self.y += self.LINE_HEIGHT // 2
+
+
+def _wrap(text, width):
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _fill_part(doc, writer, pages, items, repeated_headers=False, bare_continuations=False):
+    """
+    Lay out items (qid, [lines]) over the given number of pages. An item that
+    runs over a page break is resumed with "<qid>. (Continued)", with
+    repeated_headers by repeating "<qid>." in front of its next line, or with
+    bare_continuations by just going on with its next line.
+    Returns the number of items written.
+    """
+    written = 0
+    remaining = pages
+    writer.start_page()
+    remaining -= 1
+    for qid, lines in items:
+        for index, line in enumerate(lines):
+            if not writer.put(line):
+                if remaining == 0:
+                    writer.finish()
+                    return written
+                writer.start_page()
+                remaining -= 1
+                if index and bare_continuations:
+                    pass
+                elif index and repeated_headers:
+                    line = f"{qid}. {line}"
+                elif index:
+                    writer.put(f"{qid}. (Continued)")
+                writer.put(line)
+        writer.gap()
+        written += 1
+    while remaining:
+        writer.start_page()
+        remaining -= 1
+    writer.finish()
+    return written
+
+
+def _question_lines(rnd, qid):
+    stem = f"{qid}. " + _words(rnd, HARRISON_WORDS, rnd.randint(12, 45)) + "?"
+    lines = _wrap(stem, _TwoColumnWriter.CHARS_PER_LINE)
+    for letter in "ABCDEFGH"[:rnd.choice((4, 5, 5, 5, 6, 8))]:
+        lines.append(f"{letter}. " + _words(rnd, HARRISON_WORDS, rnd.randint(1, 6)))
+    return lines
+
+
+def _answer_lines(rnd, qid, long=False):
+    text = (
+        f"{qid}. The answer is {rnd.choice('ABCDE')}. (Chap. {rnd.randint(1, 380)}) "
+        + _words(rnd, HARRISON_WORDS, rnd.randint(30, 160)) + "."
+    )
+    if long:
+        # A review-article explanation, more than a page of both columns
+        text += " " + _words(rnd, HARRISON_WORDS, rnd.randint(1000, 1400)) + "."
+    return _wrap(text, _TwoColumnWriter.CHARS_PER_LINE)
+
+
+def _front_matter(doc, layout):
+    for index in range(FRONT_MATTER_PAGES):
+        page = _Page(doc, 612, 792)
+        if index == 0:
+            page.text((120, 300), "HARRISON'S PRINCIPLES OF INTERNAL MEDICINE", 16, bold=True)
+            page.text((200, 330), "SELF-ASSESSMENT AND BOARD REVIEW", 12, bold=True)
+        elif index == 4:
+            page.text((40, 60), "CONTENTS", 14, bold=True)
+            y = 100
+            for roman, title, questions, answers, _ in layout:
+                page.text((40, y), f"SECTION {roman} {title}", 9, bold=True)
+                page.text((60, y + 12), f"Questions {questions}", 9)
+                page.text((60, y + 24), f"Answers {answers}", 9)
+                y += 44
+        page.text((300, 775), _roman_lower(index + 1), 8)
+        page.finish()
+
+
+def _roman_lower(number):
+    result = ""
+    for value, numeral in ((10, "x"), (9, "ix"), (5, "v"), (4, "iv"), (1, "i")):
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+
+def build_harrison(path, scale=1.0, seed=0, repeated_headers=False, long_every=0):
+    """
+    Build the PDF, write <path>.sections.json and return the chap-style
+    {roman: [start, end]} ranges. With repeated_headers a question that runs
+    over a page break repeats its "<qid>." header instead of "(Continued)".
+    long_every=n gives every n-th answer an explanation longer than a page,
+    resumed after page breaks without any header, so some answer pages hold
+    no question id at all.
+    """
+    rnd = random.Random(seed)
+    layout = harrison_layout(scale)
+    doc = fitz.open()
+    _front_matter(doc, layout)
+
+    sections = {}
+    for roman, title, questions_page, answers_page, end_page in layout:
+        writer = _TwoColumnWriter(doc, f"SECTION {roman} {title} — QUESTIONS")
+        capacity = (answers_page - questions_page) * 2 * ((writer.BOTTOM - writer.TOP) // writer.LINE_HEIGHT)
+        question_items = (
+            (f"{roman}-{number}", _question_lines(rnd, f"{roman}-{number}")) for number in range(1, capacity)
+        )
+        question_count = _fill_part(doc, writer, answers_page - questions_page, question_items, repeated_headers)
+
+        writer = _TwoColumnWriter(doc, f"SECTION {roman} {title} — ANSWERS")
+        answer_items = (
+            (f"{roman}-{number}", _answer_lines(rnd, f"{roman}-{number}", long_every and number % long_every == 0))
+            for number in range(1, question_count + 1)
+        )
+        _fill_part(doc, writer, end_page - answers_page, answer_items, bare_continuations=bool(long_every))
+        # chap ranges count printed pages, pandas_table adds the 10-page offset
+        sections[roman] = [answers_page, end_page]
+
+    _save(doc, path)
+    with open(f"{path}.sections.json", "w", encoding="utf-8") as f:
+        json.dump(sections, f, indent=1)
+    return sections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("layout", choices=["ddx", "harrison"])
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=400, help="DDx page count")
+    parser.add_argument("--scale", type=float, default=1.0, help="Harrison page scale, 1.0 gives the book's 475 pages")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.layout == "ddx":
+        build_ddx(args.output, args.pages, args.seed)
+    else:
+        build_harrison(args.output, args.scale, args.seed)
+    with fitz.open(args.output) as doc:
+        print(f"{args.output}: {doc.page_count} pages")
+
+
+if __name__ == "__main__":
+    main()
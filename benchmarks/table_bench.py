@@ -0,0 +1,126 @@
+"""
+Cost of the decision-matrix stage compared with general-purpose table finders.
+
+On a synthetic DDx PDF (or --pdf), times:
+
+- the ddx_tables stage: page_has_matrix() on every page and extract_matrices()
+  on the flagged ones, both on the PageSpans the classifier already has
+  (get_text("dict") is paid by pdf_extractor anyway and timed separately),
+- PyMuPDF's page.find_tables() and pdfplumber's page.extract_tables() on
+  every page, with their text-alignment strategies (the matrices have no
+  ruling lines, the default line strategies find nothing),
+- camelot's lattice and stream flavours, if camelot is installed.
+
+    python -m benchmarks.table_bench [--pages 200] [--pdf DDx.pdf] [--sample 50]
+
+The slow finders run on --sample pages and are scaled up to the whole
+document.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_pdfs import build_ddx  # noqa: E402
+from ddx_tables import extract_matrices, page_has_matrix  # noqa: E402
+from page_spans import PageSpans  # noqa: E402
+
+
+def time_ddx_tables(pdf_path):
+    get_text = prefilter = reconstruct = 0.0
+    flagged = tables = 0
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            start = time.perf_counter()
+            page_spans = PageSpans.from_blocks(page.get_text("dict")["blocks"])
+            loaded = time.perf_counter()
+            has_matrix = page_has_matrix(page_spans)
+            filtered = time.perf_counter()
+            if has_matrix:
+                flagged += 1
+                tables += len(extract_matrices(page_spans))
+            get_text += loaded - start
+            prefilter += filtered - loaded
+            reconstruct += time.perf_counter() - filtered
+    return get_text, prefilter, reconstruct, flagged, tables
+
+
+def time_pymupdf(pdf_path, sample):
+    tables = 0
+    start = time.perf_counter()
+    with fitz.open(pdf_path) as doc:
+        for page_num in sample:
+            tables += len(doc.load_page(page_num).find_tables(strategy="text").tables)
+    return time.perf_counter() - start, tables
+
+
+def time_pdfplumber(pdf_path, sample):
+    import pdfplumber
+
+    tables = 0
+    start = time.perf_counter()
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in sample:
+            page = pdf.pages[page_num]
+            tables += len(page.extract_tables({"vertical_strategy": "text", "horizontal_strategy": "text"}))
+            page.close()
+    return time.perf_counter() - start, tables
+
+
+def time_camelot(pdf_path, sample, flavor):
+    import camelot
+
+    pages = ",".join(str(page_num + 1) for page_num in sample)
+    start = time.perf_counter()
+    tables = camelot.read_pdf(pdf_path, pages=pages, flavor=flavor)
+    return time.perf_counter() - start, len(tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", help="DDx PDF to use instead of a synthetic one")
+    parser.add_argument("--pages", type=int, default=200, help="pages of the synthetic PDF (default: %(default)s)")
+    parser.add_argument("--sample", type=int, default=50, help="pages given to the general table finders (default: %(default)s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(workdir, "ddx.pdf")
+            build_ddx(pdf_path, args.pages)
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+        sample = range(min(args.sample, page_count))
+        scale = page_count / len(sample)
+
+        get_text, prefilter, reconstruct, flagged, tables = time_ddx_tables(pdf_path)
+        stage = prefilter + reconstruct
+        print(f"{page_count} pages, {flagged} flagged by the pre-filter, {tables} matrices rebuilt")
+        print(f"{'':<28} {'seconds':>9} {'ms/page':>8} {'tables':>7}")
+        print(f"{'get_text(dict) (already paid)':<28} {get_text:>9.3f} {get_text / page_count * 1000:>8.2f}")
+        print(f"{'ddx_tables pre-filter':<28} {prefilter:>9.3f} {prefilter / page_count * 1000:>8.2f}")
+        print(f"{'ddx_tables reconstruction':<28} {reconstruct:>9.3f} {reconstruct / page_count * 1000:>8.2f} {tables:>7}")
+
+        finders = [("PyMuPDF find_tables", time_pymupdf, ()), ("pdfplumber extract_tables", time_pdfplumber, ())]
+        finders += [(f"camelot {flavor}", time_camelot, (flavor,)) for flavor in ("lattice", "stream")]
+        for name, finder, extra in finders:
+            try:
+                seconds, found = finder(pdf_path, sample, *extra)
+            except ImportError as exc:
+                print(f"{name:<28} skipped ({exc.name} not installed)")
+                continue
+            seconds *= scale
+            print(
+                f"{name:<28} {seconds:>9.3f} {seconds / page_count * 1000:>8.2f} {round(found * scale):>7}"
+                f"  (table stage is {stage / seconds:.1%} of this)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Periodic checkpoints of a long extraction run, and --resume, for both scripts.
+
+A checkpoint file is an append-only log: a header holding the run's key
+(the PDF's hash and every option that changes the output), then one
+marshal-encoded, zlib-compressed chunk per checkpoint, each length-prefixed
+and flushed as soon as it is written. What a chunk holds is up to the
+caller: pdf_extractor appends the rows emitted since the previous chunk
+plus the stitching state, pandas_table the state of a section's collectors.
+Appending keeps the cost of a checkpoint proportional to what changed
+since the last one, not to everything done so far.
+
+A run killed while writing leaves a truncated last chunk; it is dropped on
+load, along with everything after it, and the run resumes from the chunk
+before. A file with another key (a different PDF or other options) is
+ignored and the run starts over.
+"""
+import logging
+import marshal
+import os
+import sys
+import zlib
+
+log = logging.getLogger(__name__)
+
+# Pages between two checkpoints when --resume is given without --checkpoint-every
+DEFAULT_EVERY = 50
+
+_FORMAT_TAG = f"checkpoint-v1-m{marshal.version}-py{sys.version_info[0]}{sys.version_info[1]}"
+_LENGTH_BYTES = 4
+
+
+def checkpoint_path(output_path):
+    return f"{output_path}.checkpoint"
+
+
+def _encode(value):
+    data = zlib.compress(marshal.dumps(value), 1)
+    return len(data).to_bytes(_LENGTH_BYTES, "big") + data
+
+
+def _read_chunks(data):
+    """(chunks, end offset of the last complete one)."""
+    chunks, offset = [], 0
+    while offset + _LENGTH_BYTES <= len(data):
+        length = int.from_bytes(data[offset:offset + _LENGTH_BYTES], "big")
+        end = offset + _LENGTH_BYTES + length
+        if end > len(data):
+            break
+        try:
+            chunks.append(marshal.loads(zlib.decompress(data[offset + _LENGTH_BYTES:end])))
+        except (ValueError, EOFError, TypeError, zlib.error):
+            break
+        offset = end
+    return chunks, offset
+
+
+class Checkpoint:
+    """
+    The checkpoint log at path, written every `every` pages (0: never).
+
+    start() opens it for the run and returns the chunks of the run it
+    resumes, tick() is called once per page done and says when the next
+    chunk is due, save() appends it. remove() deletes the file once the
+    run's output is complete.
+    """
+
+    def __init__(self, path, every=DEFAULT_EVERY):
+        self.path = path
+        self.every = every
+        self.pages = 0
+        self.saved = 0
+        self._file = None
+
+    def start(self, key, resume=False):
+        """The chunks saved by an earlier run with the same key if resume, else []; starts the log."""
+        chunks, end = [], 0
+        if resume:
+            try:
+                with open(self.path, "rb") as f:
+                    found, end = _read_chunks(f.read())
+            except OSError:
+                found = []
+            if found and found[0] == {"format": _FORMAT_TAG, "key": key}:
+                chunks = found[1:]
+            elif found:
+                log.warning("⚠️ %s is from another PDF or other options, starting over", self.path)
+            else:
+                log.info("⏯️ No checkpoint in %s, starting from the first page", self.path)
+        if chunks:
+            # Drop a chunk cut short by the run that died
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        elif self.every:
+            with open(self.path, "wb") as f:
+                f.write(_encode({"format": _FORMAT_TAG, "key": key}))
+        if self.every:
+            self._file = open(self.path, "ab")
+        return chunks
+
+    def tick(self):
+        """Count a page done; True when a checkpoint is due."""
+        self.pages += 1
+        return bool(self.every) and self.pages % self.every == 0
+
+    def save(self, chunk):
+        if self._file is None:
+            return
+        self._file.write(_encode(chunk))
+        self._file.flush()
+        self.saved += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Delete the log. Only once the output sinks are closed: an xlsx or Parquet file isn't complete before."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def add_checkpoint_arguments(parser, what):
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=0, metavar="PAGES",
+        help=f"save {what} every PAGES pages next to the output, for --resume (default: off)",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="carry on after the last checkpoint of a run that didn't finish, with the same output as a full run;"
+        f" checkpoints every {DEFAULT_EVERY} pages unless --checkpoint-every says otherwise",
+    )
+
+
+def checkpoint_every_from_args(args):
+    """Pages between checkpoints, 0 for none: off unless --checkpoint-every or --resume asks for them."""
+    if args.checkpoint_every > 0:
+        return args.checkpoint_every
+    return DEFAULT_EVERY if args.resume else 0
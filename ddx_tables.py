@@ -0,0 +1,188 @@
+"""
+The DDx decision matrices (7.5pt ja/nein/eventuell grids) as structured rows.
+
+The matrices are rebuilt from the span geometry get_text("dict") already gave
+the classifier, so there is no second pass over the PDF and no rendering:
+
+- 7.5pt spans are grouped into visual rows by their vertical centre,
+- a row with cells in at least two spans is a matrix row; the text left of
+  its first cell is the row label,
+- consecutive matrix rows form one table, their cells are put into columns by
+  clustering the cells' x positions,
+- a 7.5pt text row right above the first matrix row is the column header.
+
+MuPDF merges cells that touch into one span ("eventuellja"), so such spans are
+split and each cell's x is estimated from its character offset. Only pages
+where page_has_matrix() finds enough 7.5pt cell spans are reconstructed.
+"""
+import re
+
+import numpy as np
+
+from page_spans import TABLE_FONT_SIZE
+
+# A span made of matrix cells only, and the cells in it
+_ONLY_CELLS_RE = re.compile(r"(?:\s*(?:eventuell|evtl\.|nein|ja))+\s*", re.IGNORECASE)
+_CELL_RE = re.compile(r"eventuell|evtl\.|nein|ja", re.IGNORECASE)
+
+MIN_CELL_SPANS = 6
+MIN_ROWS = 2
+ROW_TOLERANCE = 2.0
+COLUMN_TOLERANCE = 8.0
+# Matrix rows further apart than this many row heights, or than 1.5 times the
+# table's own row pitch, start a new table
+MAX_ROW_GAP = 2.5
+MAX_PITCH_RATIO = 1.5
+
+TABLE_COLUMNS = ["Chapter", "Section", "Page", "Table", "Row", "Label", "Column", "Value"]
+
+
+def cell_span_mask(page_spans, small=None):
+    """7.5pt spans that hold nothing but ja/nein/eventuell cells."""
+    small = page_spans.small_print_mask() if small is None else small
+    mask = np.zeros(len(small), dtype=bool)
+    for index in np.flatnonzero(small):
+        mask[index] = _ONLY_CELLS_RE.fullmatch(page_spans.span_text(index)) is not None
+    return mask
+
+
+def page_has_matrix(page_spans, small=None, min_spans=MIN_CELL_SPANS):
+    """Cheap pre-filter: does the page hold enough 7.5pt cell spans to be worth reconstructing?"""
+    small = page_spans.small_print_mask() if small is None else small
+    if np.count_nonzero(small) < min_spans:
+        return False
+    return np.count_nonzero(cell_span_mask(page_spans, small)) >= min_spans
+
+
+def text_may_hold_matrix(text, min_spans=MIN_CELL_SPANS):
+    """page_has_matrix() from plain text alone: False only if the page can't have enough cell spans."""
+    return len(_CELL_RE.findall(text)) >= min_spans
+
+
+def _split_cells(text, x0, x1):
+    """(x, value) per cell of a span, x estimated from the cell's character offset."""
+    char_width = (x1 - x0) / max(len(text), 1)
+    return [(x0 + match.start() * char_width, match.group().lower()) for match in _CELL_RE.finditer(text)]
+
+
+def _visual_rows(page_spans, small, cells):
+    """7.5pt spans grouped by vertical centre, top to bottom, each row sorted left to right."""
+    bbox = page_spans.bbox
+    centre = (bbox[:, 1] + bbox[:, 3]) / 2
+    indexes = sorted(np.flatnonzero(small), key=lambda index: (centre[index], bbox[index, 0]))
+    span_block = np.repeat(np.arange(len(page_spans)), page_spans.block_span_count)
+
+    rows = []
+    for index in indexes:
+        text = page_spans.span_text(index)
+        if not text.strip():
+            continue
+        if not rows or centre[index] - rows[-1]["y"] > ROW_TOLERANCE:
+            rows.append({"y": centre[index], "height": bbox[index, 3] - bbox[index, 1], "block": int(span_block[index]), "spans": []})
+        rows[-1]["spans"].append((bbox[index, 0], bbox[index, 2], text, bool(cells[index])))
+    for row in rows:
+        row["spans"].sort()
+        row["cell_spans"] = sum(1 for span in row["spans"] if span[3])
+    return rows
+
+
+def _matrix_row(row):
+    """(label, [(x, value)]): cells from the first cell span on, the text left of it as label."""
+    first_cell = next(x0 for x0, _, _, is_cell in row["spans"] if is_cell)
+    label = " ".join(text.strip() for x0, _, text, _ in row["spans"] if x0 < first_cell)
+    values = []
+    for x0, x1, text, is_cell in row["spans"]:
+        if x0 < first_cell:
+            continue
+        if is_cell:
+            values.extend(_split_cells(text, x0, x1))
+        else:
+            values.append((x0, text.strip()))
+    return label, values
+
+
+def _columns(positions):
+    """Cluster cell x positions into column positions, left to right."""
+    clusters = []
+    for x in sorted(positions):
+        if clusters and x - clusters[-1][-1] <= COLUMN_TOLERANCE:
+            clusters[-1].append(x)
+        else:
+            clusters.append([x])
+    return np.array([sum(cluster) / len(cluster) for cluster in clusters])
+
+
+def _build_table(header_row, matrix_rows):
+    parsed = [_matrix_row(row) for row in matrix_rows]
+    columns = _columns([x for _, values in parsed for x, _ in values])
+    names = [str(number + 1) for number in range(len(columns))]
+    if header_row is not None:
+        for x0, _, text, _ in header_row["spans"]:
+            nearest = int(np.argmin(np.abs(columns - x0)))
+            if abs(columns[nearest] - x0) <= 2 * COLUMN_TOLERANCE:
+                names[nearest] = text.strip() if names[nearest].isdigit() else f"{names[nearest]} {text.strip()}"
+
+    rows = []
+    for label, values in parsed:
+        cells = [""] * len(columns)
+        for x, value in values:
+            column = int(np.argmin(np.abs(columns - x)))
+            cells[column] = f"{cells[column]} {value}".strip()
+        rows.append([label, cells])
+    block = (header_row or matrix_rows[0])["block"]
+    return {"block_index": block, "columns": names, "rows": rows}
+
+
+def _max_gap(current, row):
+    max_gap = MAX_ROW_GAP * row["height"]
+    if len(current) >= 2:
+        max_gap = min(max_gap, MAX_PITCH_RATIO * (current[-1]["y"] - current[-2]["y"]))
+    return max_gap
+
+
+def extract_matrices(page_spans, small_print_size=TABLE_FONT_SIZE):
+    """The decision matrices on a page as [{"block_index", "columns", "rows": [[label, [cells]]]}]."""
+    small = page_spans.small_print_mask(small_print_size)
+    if not page_has_matrix(page_spans, small):
+        return []
+    cells = cell_span_mask(page_spans, small)
+
+    tables = []
+    header_row = None
+    current = []
+    previous = None
+    for row in _visual_rows(page_spans, small, cells):
+        is_matrix = row["cell_spans"] >= 2
+        if current and (not is_matrix or row["y"] - current[-1]["y"] > _max_gap(current, row)):
+            if len(current) >= MIN_ROWS:
+                tables.append(_build_table(header_row, current))
+            current = []
+        if is_matrix:
+            if not current:
+                # A text row right above the first matrix row names the columns
+                header_row = None
+                if previous is not None and not previous["cell_spans"] and len(previous["spans"]) >= 2 \
+                        and row["y"] - previous["y"] <= MAX_ROW_GAP * row["height"]:
+                    header_row = previous
+            current.append(row)
+        previous = row
+    if len(current) >= MIN_ROWS:
+        tables.append(_build_table(header_row, current))
+    return tables
+
+
+def table_rows(table, chapter, section, page_num, table_number):
+    """TABLE_COLUMNS rows for one reconstructed table, one per non-empty cell."""
+    for row_number, (label, cells) in enumerate(table["rows"], 1):
+        for column, value in zip(table["columns"], cells):
+            if value:
+                yield {
+                    "Chapter": chapter,
+                    "Section": section,
+                    "Page": page_num + 1,
+                    "Table": table_number,
+                    "Row": row_number,
+                    "Label": label,
+                    "Column": column,
+                    "Value": value,
+                }
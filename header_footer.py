@@ -0,0 +1,112 @@
+"""
+Running headers and footers found once per document instead of per line.
+
+A pre-pass over an even sample of pages collects the lines in the top and
+bottom margins and keys them by vertical band and normalized text (digits
+folded, so "3 8 Allgemeinsymptome bei Erwachsenen" on one page and "4 1
+Allgemeinsymptome bei Erwachsenen" on the next, or page numbers, share a
+key). A key seen on enough sampled pages is a running line. A margin band
+where running lines make up nearly everything on most pages is excluded as
+a whole, so lines there are dropped on their bbox alone.
+
+HeaderFooterModel.is_running() is then a set lookup per line. Lines the model
+doesn't recognise go to the regex heuristics (pdf_extractor's
+is_running_header_line), which also cover documents too short to show any
+repetition. pdf_extractor keeps lines that may be headings out of the
+sample and away from is_running(), so a section title that often opens a
+page isn't mistaken for a running line.
+"""
+import math
+import re
+
+BAND_HEIGHT = 4.0
+# Lines starting in the top or ending in the bottom fraction of the page are candidates
+MARGIN = 0.08
+SAMPLE_PAGES = 60
+MIN_PAGES = 3
+MIN_SHARE = 0.25
+BAND_SHARE = 0.9
+
+_DIGITS_RE = re.compile(r"\d+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize(line):
+    return _DIGITS_RE.sub("#", _SPACES_RE.sub(" ", line.strip()).lower())
+
+
+def band(top, bottom):
+    return int(round((top + bottom) / 2 / BAND_HEIGHT))
+
+
+def sample_pages(page_count, count=SAMPLE_PAGES):
+    """Up to count page indexes spread evenly over the document."""
+    if page_count <= count:
+        return list(range(page_count))
+    step = page_count / count
+    return sorted({int(index * step) for index in range(count)})
+
+
+class HeaderFooterModel:
+    def __init__(self, lines=(), bands=()):
+        # (band, normalized text) of running lines, each also stored for the neighbouring bands
+        self.lines = frozenset(tuple(key) for key in lines)
+        self.bands = frozenset(bands)
+        self.line_bands = frozenset(line_band for line_band, _ in self.lines)
+
+    def __eq__(self, other):
+        return isinstance(other, HeaderFooterModel) and (self.lines, self.bands) == (other.lines, other.bands)
+
+    def __bool__(self):
+        return bool(self.lines or self.bands)
+
+    @classmethod
+    def build(cls, pages):
+        """
+        pages: [(page height, [(line text, top, bottom)])] for the sampled pages.
+        """
+        pages = list(pages)
+        needed = max(MIN_PAGES, math.ceil(MIN_SHARE * len(pages)))
+        key_pages = {}
+        band_lines = {}
+        for page_index, (height, lines) in enumerate(pages):
+            for text, top, bottom in lines:
+                if not text.strip() or not (top < MARGIN * height or bottom > (1 - MARGIN) * height):
+                    continue
+                line_band = band(top, bottom)
+                key_pages.setdefault((line_band, normalize(text)), set()).add(page_index)
+                band_lines.setdefault(line_band, []).append((page_index, normalize(text)))
+
+        running = {key for key, seen in key_pages.items() if len(seen) >= needed}
+        lines = {(line_band + offset, text) for line_band, text in running for offset in (-1, 0, 1)}
+
+        bands = set()
+        for line_band, entries in band_lines.items():
+            pages_with_running = {page_index for page_index, text in entries if (line_band, text) in running}
+            running_share = sum((line_band, text) in running for _, text in entries) / len(entries)
+            if len(pages_with_running) >= max(needed, BAND_SHARE * len(pages)) and running_share >= BAND_SHARE:
+                bands.add(line_band)
+        return cls(lines, bands)
+
+    def is_running(self, line, top, bottom):
+        """True if the line is a running header/footer, None if the model can't tell."""
+        line_band = band(top, bottom)
+        if line_band in self.bands:
+            return True
+        if line_band in self.line_bands and (line_band, normalize(line)) in self.lines:
+            return True
+        return None
+
+    def as_tuple(self):
+        """Plain, marshal-able form, see from_tuple()."""
+        return (sorted(self.lines), sorted(self.bands))
+
+    @classmethod
+    def from_tuple(cls, data):
+        return cls(*data)
+
+
+def page_lines(page_spans):
+    """(line text, top, bottom) for every line of a PageSpans."""
+    boxes = page_spans.line_bbox
+    return [(text, boxes[index, 1], boxes[index, 3]) for index, text in enumerate(page_spans.line_texts)]
@@ -1,24 +1,62 @@
-import cv2
-import fitz  # PyMuPDF
-
-# CONFIG
-pdf_path = "DDx Tabelle.pdf"
-img_path = r"C:\Users\kavya\Documents\My_programming\upwork\page13_embedded_images\page13_img1.png"
-page_number = 29  # Page 30 in 0-based
-
-
-
-# Step 2: Map image coordinates back to PDF space
-doc = fitz.open(pdf_path)
-print(f"Page {page_number + 1} loaded.")
-for page_num in range(20, 40):
-    print(f"Processing page {page_num + 1}...")
-    page = doc.load_page(page_num)
-    blocks = page.get_text("dict")["blocks"]
-    for block in blocks:
-        for line in block.get("lines", []):
-            for span in line.get("spans", []):
-                text = span["text"].strip()
-                print(f"Text: '{text}' | font size: {span['size']} | font flags: {span['flags']} | font: {span['font']}")
-                if "Malnutrition (selten in den entwickelten Ländern; weltweit verbreitet)" in text:
-                    print(f"Page {page_num + 1}: '{text}' | font size: {span['size']} | font flags: {span['flags']} | font: {span['font']}")
\ No newline at end of file
+"""
+Font profile of a whole PDF, written as the layout profile pdf_extractor loads.
+
+One pass over every page's spans (through the span cache, text only)
+histograms (font, size, flags) by character count and assigns the sizes to
+body, small print, sub-subsection, section and chapter roles, see
+layout_profile. The thresholds go to <pdf>.layout.json, where
+pdf_extractor.py picks them up instead of its built-in DDx values.
+
+    python image.py "DDx Tabelle.pdf" [-o layout.json] [--no-cache]
+"""
+import argparse
+import logging
+import time
+
+from layout_profile import layout_path, profile_document
+from profiling import configure_logging
+from span_cache import DEFAULT_CACHE_DIR, SpanCache
+
+PDF_FILE = "DDx Tabelle.pdf"
+
+log = logging.getLogger("image")
+
+
+def print_histogram(layout, limit=20):
+    total = sum(entry["chars"] for entry in layout.fonts) or 1
+    print(f"{'font':<32} {'size':>5} {'flags':>5} {'chars':>9} {'share':>6}  role")
+    for entry in layout.fonts[:limit]:
+        print(
+            f"{entry['font']:<32} {entry['size']:>5} {entry['flags']:>5} {entry['chars']:>9}"
+            f" {entry['chars'] / total:>6.1%}  {entry['role']}"
+        )
+    if len(layout.fonts) > limit:
+        print(f"... {len(layout.fonts) - limit} more in the profile file")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf", nargs="?", default=PDF_FILE)
+    parser.add_argument("-o", "--output", help="profile file (default: <pdf>.layout.json)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="span cache directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="extract every page instead of using the span cache")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print the font histogram")
+    args = parser.parse_args()
+    configure_logging(quiet=args.quiet)
+
+    start = time.perf_counter()
+    layout = profile_document(args.pdf, None if args.no_cache else SpanCache(args.cache_dir))
+    elapsed = time.perf_counter() - start
+    output = args.output or layout_path(args.pdf)
+    layout.save(output)
+
+    if not args.quiet:
+        print_histogram(layout)
+    log.info("🔤 Profiled %d pages in %.2fs", layout.pages, elapsed)
+    for name, value in layout.thresholds().items():
+        log.info("   %s: %s", name, value)
+    log.info("📐 Layout profile written to: %s", output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Font thresholds of a book's layout, and the profiler that finds them.
+
+pdf_extractor tells blocks apart by font: chapter titles are set large,
+sub-subsection headings bold at one size, and decision-matrix and note text
+in small print. DEFAULT_LAYOUT holds the DDx book's values. For another
+book, profile_document() histograms (font, size, flags) over every page in
+one pass over the spans (the span cache's, so it is nearly free after an
+extraction and the extraction is nearly free after it) and assigns roles:
+
+- body: the size carrying the most characters outside the page margins,
+- small_print: the size carrying the most characters below body size,
+- subheading: the size of the most common short, all-bold lines near body
+  size,
+- section: short bold lines between body size and chapter size,
+- chapter: short lines at least CHAPTER_RATIO times body size; the chapter
+  threshold is put just below the smallest such size,
+- margin: sizes only seen in running lines, i.e. lines in the top and
+  bottom margins whose text (digits folded, see header_footer) recurs on
+  RUNNING_PAGES pages or more.
+
+The thresholds and the histogram are saved as <pdf>.layout.json, which
+pdf_extractor loads when it is there. A role the book doesn't show keeps
+its default.
+"""
+import json
+import logging
+import os
+from collections import Counter
+
+import fitz  # PyMuPDF
+
+from header_footer import MARGIN, band, normalize
+from page_spans import SUBSUB_FONT_SIZE, TABLE_FONT_SIZE
+from span_cache import page_packed
+
+log = logging.getLogger("layout_profile")
+
+LAYOUT_VERSION = 1
+CHAPTER_MIN_SIZE = 12.0
+SIZE_TOLERANCE = 0.2
+RUNNING_PAGES = 3
+CHAPTER_RATIO = 1.3
+HEADING_MAX_WORDS = 5
+# Small print needs this share of the body characters, a chapter size this many pages
+MIN_SMALL_PRINT_SHARE = 0.005
+MIN_CHAPTER_PAGES = 2
+
+
+def _is_bold(font, flags):
+    return "Bold" in font or bool(flags & fitz.TEXT_FONT_BOLD)
+
+
+class LayoutProfile:
+    def __init__(self, body_size=8.0, small_print_size=TABLE_FONT_SIZE, subheading_size=SUBSUB_FONT_SIZE,
+                 chapter_min_size=CHAPTER_MIN_SIZE, fonts=(), pages=0):
+        self.body_size = body_size
+        self.small_print_size = small_print_size
+        self.subheading_size = subheading_size
+        self.chapter_min_size = chapter_min_size
+        # [{"font", "size", "flags", "chars", "role"}] by characters, for the reader of the file
+        self.fonts = list(fonts)
+        self.pages = pages
+
+    def thresholds(self):
+        return {
+            "body_size": self.body_size,
+            "small_print_size": self.small_print_size,
+            "subheading_size": self.subheading_size,
+            "chapter_min_size": self.chapter_min_size,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, LayoutProfile) and self.thresholds() == other.thresholds()
+
+    def __repr__(self):
+        return f"LayoutProfile({', '.join(f'{name}={value}' for name, value in self.thresholds().items())})"
+
+    def save(self, path):
+        data = {"version": LAYOUT_VERSION, "pages": self.pages, **self.thresholds(), "fonts": self.fonts}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != LAYOUT_VERSION:
+            raise ValueError(f"{path}: layout profile version {data.get('version')}, expected {LAYOUT_VERSION}")
+        thresholds = {name: float(data[name]) for name in cls().thresholds()}
+        return cls(**thresholds, fonts=data.get("fonts", ()), pages=data.get("pages", 0))
+
+
+DEFAULT_LAYOUT = LayoutProfile()
+
+
+def layout_path(pdf_path):
+    return f"{pdf_path}.layout.json"
+
+
+def load_layout(pdf_path, path=None):
+    """The profile at path, else <pdf>.layout.json if it exists, else DEFAULT_LAYOUT."""
+    if path is None:
+        path = layout_path(pdf_path)
+        if not os.path.exists(path):
+            return DEFAULT_LAYOUT
+    layout = LayoutProfile.load(path)
+    log.info("📐 Layout profile %s: %s", path, layout)
+    return layout
+
+
+def _best(counter, accept):
+    candidates = [(count, key) for key, count in counter.items() if accept(key)]
+    return max(candidates)[1] if candidates else None
+
+
+class _LineStats:
+    """Font and heading counts of a set of lines."""
+
+    def __init__(self):
+        # (font, size, flags) -> characters
+        self.fonts = Counter()
+        # size -> characters of short all-bold lines; size -> pages with a short line at that size
+        self.bold_lines = Counter()
+        self.heading_pages = {}
+
+    def add(self, page_num, line):
+        """line: [(text, font, size, flags)] of its non-blank spans."""
+        for text, font, size, flags in line:
+            self.fonts[font, size, flags] += len(text)
+        text = " ".join(span[0] for span in line)
+        if len(text.split()) > HEADING_MAX_WORDS or text.startswith("•"):
+            return
+        size = max(span[2] for span in line)
+        self.heading_pages.setdefault(size, set()).add(page_num)
+        if all(_is_bold(font, flags) for _, font, _, flags in line):
+            self.bold_lines[size] += len(text)
+
+    def update(self, other):
+        self.fonts.update(other.fonts)
+        self.bold_lines.update(other.bold_lines)
+        for size, seen in other.heading_pages.items():
+            self.heading_pages.setdefault(size, set()).update(seen)
+
+
+def profile_spans(pages):
+    """
+    LayoutProfile from pages given as (page height, fonts, packed blocks),
+    see span_cache.pack_blocks().
+    """
+    body_lines = _LineStats()
+    # Margin lines by (band, normalized text): their pages and their stats
+    margin = {}
+    page_count = 0
+    for page_num, (height, fonts, packed) in enumerate(pages):
+        page_count += 1
+        for _, _, _, lines in packed:
+            for (_, top, _, bottom), spans in lines:
+                line = [
+                    (text.strip(), fonts[font_id], round(size, 1), flags)
+                    for text, size, flags, font_id, _ in spans if text.strip()
+                ]
+                if not line:
+                    continue
+                if top < MARGIN * height or bottom > (1 - MARGIN) * height:
+                    key = (band(top, bottom), normalize(" ".join(span[0] for span in line)))
+                    seen, stats = margin.setdefault(key, (set(), _LineStats()))
+                    seen.add(page_num)
+                    stats.add(page_num, line)
+                else:
+                    body_lines.add(page_num, line)
+
+    running = _LineStats()
+    for seen, stats in margin.values():
+        # A margin line that doesn't recur (a chapter title near the top) is body text
+        (running if len(seen) >= RUNNING_PAGES else body_lines).update(stats)
+    body_fonts, margin_fonts = body_lines.fonts, running.fonts
+    bold_lines, heading_pages = body_lines.bold_lines, body_lines.heading_pages
+
+    layout = LayoutProfile(pages=page_count)
+    sizes = Counter()
+    for (_, size, _), chars in body_fonts.items():
+        sizes[size] += chars
+    if not sizes:
+        return layout
+    total = sum(sizes.values())
+
+    layout.body_size = body = _best(sizes, lambda size: True)
+    small = _best(sizes, lambda size: size < body - SIZE_TOLERANCE and sizes[size] >= MIN_SMALL_PRINT_SHARE * total)
+    if small is not None:
+        layout.small_print_size = small
+    subheading = _best(bold_lines, lambda size: abs(size - body) <= 0.5)
+    if subheading is not None:
+        layout.subheading_size = subheading
+    chapter_sizes = [
+        size for size, seen in heading_pages.items() if size >= CHAPTER_RATIO * body and len(seen) >= MIN_CHAPTER_PAGES
+    ]
+    if chapter_sizes:
+        layout.chapter_min_size = min(chapter_sizes) - 0.5
+
+    def role(size, flags, font, margin):
+        if margin:
+            return "margin"
+        if size >= layout.chapter_min_size:
+            return "chapter"
+        if abs(size - layout.small_print_size) < SIZE_TOLERANCE:
+            return "small_print"
+        if _is_bold(font, flags) and abs(size - layout.subheading_size) < SIZE_TOLERANCE:
+            return "subheading"
+        if _is_bold(font, flags) and body < size:
+            return "section"
+        if abs(size - body) < SIZE_TOLERANCE:
+            return "body"
+        return "other"
+
+    histogram = [(key, chars, False) for key, chars in body_fonts.items()]
+    # Margin-only fonts; ones also used in the body are already listed
+    histogram += [(key, chars, True) for key, chars in margin_fonts.items() if key not in body_fonts]
+    layout.fonts = [
+        {"font": font, "size": size, "flags": flags, "chars": chars, "role": role(size, flags, font, margin)}
+        for (font, size, flags), chars, margin in sorted(histogram, key=lambda entry: -entry[1])
+    ]
+    return layout
+
+
+def profile_document(pdf_path, cache=None):
+    """One pass over every page of pdf_path (text only, through the span cache if given)."""
+    with fitz.open(pdf_path) as doc:
+        pages = (
+            (doc.page_cropbox(page_num).height, *page_packed(doc, page_num, cache, text_only=True))
+            for page_num in range(doc.page_count)
+        )
+        return profile_spans(pages)
@@ -0,0 +1,149 @@
+"""
+Low-memory mode and the --max-rss guard shared by both extraction scripts.
+
+MemoryGuard.page_done() is called after every page. It samples the
+process's resident set size and remembers it per page. In low-memory mode
+it also releases, every RELEASE_EVERY pages, the caches that grow with the
+page count: MuPDF's resource store (decoded images, fonts) and Python's
+garbage cycles. If RSS is still above max_rss_mb after a release,
+MemoryLimitExceeded is raised, naming the page.
+
+RSS comes from /proc/self/statm on Linux. Elsewhere psutil is used if it is
+installed, and failing that the peak from getrusage(), which only grows.
+"""
+import gc
+import logging
+import os
+import sys
+
+import fitz  # PyMuPDF
+
+log = logging.getLogger(__name__)
+
+RELEASE_EVERY = 25
+# Pages a process pool may run ahead of the consumer in low-memory mode, per worker
+IN_FLIGHT_PER_WORKER = 2
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class MemoryLimitExceeded(RuntimeError):
+    pass
+
+
+def rss_mb():
+    """Current resident set size in MB, None if it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1 << 20)
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return peak_rss_mb()
+    return psutil.Process().memory_info().rss / (1 << 20)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def release_page_caches():
+    """Empty MuPDF's resource store and collect garbage cycles."""
+    fitz.TOOLS.store_shrink(100)
+    gc.collect()
+
+
+class MemoryGuard:
+    def __init__(self, low_memory=False, max_rss_mb=None):
+        self.low_memory = low_memory
+        self.max_rss_mb = max_rss_mb
+        self.enabled = low_memory or max_rss_mb is not None
+        self.page_rss = {}
+        self.peak_page = None
+        self._since_release = 0
+
+    def settings(self):
+        """Constructor arguments, for a guard of the same kind in a worker process."""
+        return self.low_memory, self.max_rss_mb
+
+    def in_flight(self, workers):
+        """Pages a process pool may have submitted ahead of the consumer, None for no cap."""
+        return workers * IN_FLIGHT_PER_WORKER if self.low_memory else None
+
+    def page_done(self, page_num):
+        """Sample RSS after a page, release caches in low-memory mode and enforce max_rss_mb."""
+        if not self.enabled:
+            return None
+        self._since_release += 1
+        if self.low_memory and self._since_release >= RELEASE_EVERY:
+            release_page_caches()
+            self._since_release = 0
+        rss = rss_mb()
+        if self.max_rss_mb is not None and rss is not None and rss > self.max_rss_mb:
+            release_page_caches()
+            self._since_release = 0
+            rss = rss_mb()
+            if rss > self.max_rss_mb:
+                raise MemoryLimitExceeded(
+                    f"RSS {rss:.0f} MB after page {page_num + 1} is above --max-rss {self.max_rss_mb:.0f} MB"
+                )
+        self.record(page_num, rss)
+        return rss
+
+    def record(self, page_num, rss):
+        """Keep an RSS sample measured elsewhere, e.g. in a worker process."""
+        if rss is None:
+            return
+        self.page_rss[page_num] = rss
+        if self.peak_page is None or rss > self.page_rss[self.peak_page]:
+            self.peak_page = page_num
+
+    def take_samples(self):
+        """The samples so far, which are then forgotten (a worker hands them over per job)."""
+        page_rss, self.page_rss, self.peak_page = self.page_rss, {}, None
+        return page_rss
+
+    def merge(self, page_rss):
+        for page_num, rss in page_rss.items():
+            self.record(page_num, rss)
+
+    def report(self):
+        if not self.page_rss:
+            return {}
+        samples = [self.page_rss[page_num] for page_num in sorted(self.page_rss)]
+        return {
+            "low_memory": self.low_memory,
+            "max_rss_mb": self.max_rss_mb,
+            "peak_rss_mb": round(self.page_rss[self.peak_page], 1),
+            "peak_page": self.peak_page + 1,
+            "first_page_rss_mb": round(samples[0], 1),
+            "last_page_rss_mb": round(samples[-1], 1),
+            "page_rss_mb": {page_num + 1: round(self.page_rss[page_num], 1) for page_num in sorted(self.page_rss)},
+        }
+
+    def log_peak(self):
+        if self.page_rss:
+            log.info("🧠 Peak RSS %.0f MB after page %d", self.page_rss[self.peak_page], self.peak_page + 1)
+
+
+NULL_GUARD = MemoryGuard()
+
+
+def add_memory_arguments(parser):
+    parser.add_argument(
+        "--low-memory", action="store_true",
+        help="release page caches as pages are done, skip image data and cap pages in flight",
+    )
+    parser.add_argument("--max-rss", type=float, metavar="MB", help="stop with an error if resident memory exceeds this after a page")
+
+
+def guard_from_args(args):
+    return MemoryGuard(args.low_memory, args.max_rss)
@@ -0,0 +1,195 @@
+"""
+Embedded images of a PDF: where each page draws them, and one file per image.
+
+image_placements() follows a page's content stream (q/Q, cm, /Name Do) to
+the bbox of every image XObject the page draws, in drawing order, without
+decoding any image. Pages that draw through form XObjects or hold inline
+images fall back to MuPDF's get_image_info(), which does decode them.
+
+ImageStore is handed every placement in page order and writes each xref's
+image once, when it is first seen, in a process pool with one open document
+per worker. JPEG and JPEG 2000 streams are written as embedded, every other
+image as PNG. Files go to <directory>/<book>/img-<xref>.<ext>, and an image
+already there from an earlier run is not written again.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from page_probe import content_tokens
+from text_index import book_name
+
+# One row per placement; Page is 1-based, the bbox in page coordinates like the bullets'
+IMAGE_COLUMNS = ["Chapter", "Section", "Subsection", "Page", "Image", "x0", "y0", "x1", "y1"]
+
+_EXTENSIONS = {"DCTDecode": "jpeg", "JPXDecode": "jpx"}
+_UNIT_SQUARE = fitz.Rect(0, 0, 1, 1)
+
+
+def image_name(xref, image_filter):
+    return f"img-{xref:05d}.{_EXTENSIONS.get(image_filter, 'png')}"
+
+
+def image_placements(page):
+    """[(xref, file name, bbox)] of the images a page draws, in drawing order."""
+    # full=True: images inside the page's form XObjects too
+    images = page.get_images(full=True)
+    if not images:
+        return []
+    names = {image[0]: image_name(image[0], image[8]) for image in images}
+    contents = page.read_contents()
+    if page.get_xobjects() or b"BI" in contents:
+        # Inline images have no xref and aren't extracted
+        return [
+            (info["xref"], names[info["xref"]], tuple(info["bbox"]))
+            for info in page.get_image_info(xrefs=True) if info["xref"] in names
+        ]
+
+    by_resource = {image[7]: image[0] for image in images}
+    to_page = page.transformation_matrix
+    ctm, stack, numbers, operand = fitz.Identity, [], [], None
+    placements = []
+    for name, number, operator in content_tokens(contents):
+        if name:
+            operand = name[1:].decode("latin-1")
+            continue
+        if number:
+            numbers.append(float(number))
+            continue
+        if not operator:
+            continue
+        if operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q" and stack:
+            ctm = stack.pop()
+        elif operator == b"cm" and len(numbers) >= 6:
+            ctm = fitz.Matrix(*numbers[-6:]) * ctm
+        elif operator == b"Do" and operand in by_resource:
+            xref = by_resource[operand]
+            placements.append((xref, names[xref], tuple(_UNIT_SQUARE * (ctm * to_page))))
+        numbers, operand = [], None
+    return placements
+
+
+def image_bytes(doc, xref, name):
+    """The file contents for image_name(): the embedded stream when it has that format, else PNG."""
+    extension = name.rsplit(".", 1)[1]
+    info = doc.extract_image(xref)
+    if info and info["ext"] == extension:
+        return info["image"]
+    pixmap = fitz.Pixmap(doc, xref)
+    if pixmap.colorspace is not None and pixmap.colorspace.n > 3:
+        pixmap = fitz.Pixmap(fitz.csRGB, pixmap)
+    return pixmap.tobytes("png")
+
+
+def write_image(doc, xref, name, path):
+    """(bytes written, seconds); 0 bytes if the file is already there."""
+    start = time.perf_counter()
+    if os.path.exists(path):
+        return 0, time.perf_counter() - start
+    data = image_bytes(doc, xref, name)
+    # Write then rename so a killed run never leaves a truncated image behind
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data), time.perf_counter() - start
+
+
+_worker_doc = None
+
+
+def _init_worker(pdf_path):
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _write_at(xref, name, path):
+    return write_image(_worker_doc, xref, name, path)
+
+
+class ImageStore:
+    """
+    Receives every image placement in page order and writes each xref once.
+
+    add() returns the reference the output rows use, <book>/<file name>,
+    relative to directory. With workers > 1 the files are written in a
+    process pool while the extraction goes on; close() waits for them and
+    returns the report.
+    """
+
+    def __init__(self, directory, pdf_path, workers=1):
+        self.book = book_name(pdf_path)
+        self.pdf_path = pdf_path
+        self.directory = os.path.join(directory, self.book)
+        self.workers = workers
+        self.refs = {}
+        self.placements = 0
+        self.pending = []
+        self.bytes_written = 0
+        self.files_written = 0
+        # write_image() time of every pool process added together
+        self.write_seconds = 0.0
+        self._doc = None
+        self._pool = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def add(self, xref, name):
+        self.placements += 1
+        ref = self.refs.get(xref)
+        if ref is not None:
+            return ref
+        ref = self.refs[xref] = f"{self.book}/{name}"
+        path = os.path.join(self.directory, name)
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.pdf_path,))
+            self.pending.append(self._pool.submit(_write_at, xref, name, path))
+        else:
+            if self._doc is None:
+                self._doc = fitz.open(self.pdf_path)
+            self._count(*write_image(self._doc, xref, name, path))
+        return ref
+
+    def resume(self, refs, placements):
+        """Carry on from a checkpoint: refs [(xref, ref)] were added before, over that many placements."""
+        self.refs.update(refs)
+        self.placements = placements
+
+    def _count(self, written, seconds):
+        self.bytes_written += written
+        self.files_written += bool(written)
+        self.write_seconds += seconds
+
+    def close(self):
+        for future in self.pending:
+            self._count(*future.result())
+        self.pending = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        return self.report()
+
+    def report(self):
+        unique = len(self.refs)
+        return {
+            "placements": self.placements,
+            "images": unique,
+            "dedup_ratio": round(self.placements / unique, 2) if unique else None,
+            "files_written": self.files_written,
+            "bytes_written": self.bytes_written,
+            "write_seconds": round(self.write_seconds, 4),
+            "images_per_second": round(self.files_written / self.write_seconds, 1) if self.files_written else None,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,143 @@
+"""
+Where the Harrison questions and answers are, found from the PDF itself.
+
+One pass of PyMuPDF's plain text extraction (much cheaper than pdfplumber's
+layout) records which question-id headers ("IV-12." or "IV-12. (Continued)"
+at the start of a line) every page holds. From that:
+
+- a section's question part starts on the first page with one of its ids,
+- its answer part starts where the numbering starts over (an id below the
+  highest one already seen in that section),
+- both parts end after the last page holding one of their ids.
+
+Page numbers are 0-based PDF page indexes, so no front-matter offset is
+needed. The index is cached next to the PDF as <pdf>.pageindex.json and
+rebuilt when the PDF's hash or INDEX_VERSION changes.
+"""
+import json
+import logging
+import os
+import re
+
+import fitz  # PyMuPDF
+
+from question_lexer import ROMAN_PATTERN
+from span_cache import file_digest
+
+# Bump when find_parts() or the cached page headers change, so old index files are rebuilt
+INDEX_VERSION = 2
+
+_QUESTION_HEADER_RE = re.compile(rf"^[ \t]*({ROMAN_PATTERN})-(\d+)\.( \((?i:continued)\))?", re.MULTILINE)
+
+log = logging.getLogger("page_index")
+
+
+def scan_page(text):
+    """[(roman, number, continued)] for every question-id header in a page's text."""
+    return [(roman, int(number), bool(continued)) for roman, number, continued in _QUESTION_HEADER_RE.findall(text)]
+
+
+def find_parts(pages):
+    """
+    {roman: {"questions": [start, end], "answers": [start, end] or None}} from
+    scan_page() results, keyed by page index. Ranges are end-exclusive.
+    """
+    parts = {}
+    highest = {}
+    for page_num in sorted(pages):
+        for roman, number, continued in pages[page_num]:
+            section = parts.setdefault(roman, {"questions": [page_num, page_num + 1], "answers": None})
+            if continued:
+                part = section["answers"] or section["questions"]
+            elif section["answers"] is None and number < highest.get(roman, 0):
+                # Strictly below: a header repeated on the next page without
+                # "(Continued)" is still the same question
+                section["answers"] = [page_num, page_num + 1]
+                part = section["answers"]
+            else:
+                part = section["answers"] or section["questions"]
+            highest[roman] = max(highest.get(roman, 0), number)
+            part[1] = page_num + 1
+    return parts
+
+
+class PageIndex:
+    def __init__(self, digest, pages, page_count):
+        self.digest = digest
+        self.page_count = page_count
+        # page index -> [(roman, number, continued)], only pages with headers
+        self.pages = pages
+        self.parts = find_parts(pages)
+
+    @classmethod
+    def build(cls, pdf_path, digest=None):
+        pages = {}
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            for page_num in range(page_count):
+                headers = scan_page(doc.load_page(page_num).get_text("text"))
+                if headers:
+                    pages[page_num] = headers
+        return cls(digest or file_digest(pdf_path), pages, page_count)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            return None
+        pages = {int(page_num): [tuple(header) for header in headers] for page_num, headers in data["pages"].items()}
+        return cls(data["digest"], pages, data["page_count"])
+
+    def save(self, path):
+        data = {
+            "version": INDEX_VERSION,
+            "digest": self.digest,
+            "page_count": self.page_count,
+            "pages": {str(page_num): headers for page_num, headers in sorted(self.pages.items())},
+            "parts": self.parts,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def sections(self, part="answers"):
+        """{roman: [start, end]} page ranges of one part, as expected by pandas_table.iter_sections(page_offset=0)."""
+        return {roman: list(parts[part]) for roman, parts in self.parts.items() if parts[part] is not None}
+
+    def question_pages(self):
+        """
+        Pages from the first to the last question-id page of every part. A
+        page without an id in between still holds the rest of a question,
+        its options or an explanation, so only the pages outside the parts
+        are left out.
+        """
+        return {
+            page_num for section in self.parts.values() for part in (section["questions"], section["answers"]) if part
+            for page_num in range(*part)
+        }
+
+
+def index_path(pdf_path):
+    return f"{pdf_path}.pageindex.json"
+
+
+def load_page_index(pdf_path, rebuild=False):
+    """The cached index of pdf_path if it is still valid, else a freshly built (and cached) one."""
+    path = index_path(pdf_path)
+    digest = file_digest(pdf_path)
+    if not rebuild and os.path.exists(path):
+        try:
+            index = PageIndex.load(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            index = None
+        if index is not None and index.digest == digest:
+            return index
+
+    index = PageIndex.build(pdf_path, digest)
+    try:
+        index.save(path)
+    except OSError as exc:
+        log.warning("⚠️ Could not cache the page index at %s: %s", path, exc)
+    return index
@@ -0,0 +1,150 @@
+"""
+Per-page fingerprints and stitch state stored next to pdf_extractor's output.
+
+A page's fingerprint is the SHA-1 of its content stream, page box and the
+fonts and XObjects it uses, each hashed with its stream and everything it
+references (object_digest()), so text drawn through a form XObject counts
+too. A corrected revision of the PDF can thus be compared page by page
+without running the text extraction. The manifest (<output>.pages) keeps,
+for every page of the last run:
+
+- the fingerprint,
+- the classified block records,
+- the SectionStitcher state before the page,
+- the rows emitted while the page was stitched, the decision matrix cells
+  written to the Tables sheet, the rows of the bullets dataset and the
+  image placements written to the Images sheet,
+
+plus the header/footer model and the layout thresholds the records were
+classified with, and whether they include image records.
+
+That is enough to reuse every page whose content and incoming state did not
+change, and to re-extract only the rest. Stored like the span cache:
+marshal-encoded and zlib-compressed, written atomically.
+"""
+import hashlib
+import marshal
+import os
+import re
+import sys
+import zlib
+
+from span_cache import EXTRACTOR_VERSION
+
+# Bump when the fingerprint, record, state or row layout changes
+MANIFEST_VERSION = 7
+
+# "12 0 R" in an object's source
+_REFERENCE_RE = re.compile(r"\b(\d+) \d+ R\b")
+
+_FORMAT_TAG = f"pages-v{MANIFEST_VERSION}-x{EXTRACTOR_VERSION}-m{marshal.version}-py{sys.version_info[0]}{sys.version_info[1]}"
+
+
+def _uses(contents, name):
+    """Does a content stream refer to the resource /name?"""
+    return re.search(rb"/" + re.escape(name.encode()) + rb"(?![^\s/\[\]()<>{}%])", contents) is not None
+
+
+def object_digest(doc, xref, memo):
+    """
+    SHA-1 of an object's source, its raw stream and, recursively, of every
+    object it references: for a form XObject that is its content stream and
+    the fonts, images and nested forms it draws with. memo ({xref: digest})
+    is shared by the pages of a document, so a shared font is hashed once.
+    """
+    if xref in memo:
+        return memo[xref]
+    # A reference cycle hashes as the bare xref
+    memo[xref] = str(xref)
+    source = doc.xref_object(xref, compressed=True)
+    digest = hashlib.sha1(source.encode())
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref))
+    for referenced in _REFERENCE_RE.findall(source):
+        digest.update(object_digest(doc, int(referenced), memo).encode())
+    memo[xref] = digest.hexdigest()
+    return memo[xref]
+
+
+def page_fingerprint(doc, page_num, memo=None):
+    memo = {} if memo is None else memo
+    page = doc.load_page(page_num)
+    contents = page.read_contents()
+    digest = hashlib.sha1(contents)
+    digest.update(repr(tuple(page.rect)).encode())
+    # Only the fonts and XObjects the page's own stream uses, resource dicts are often
+    # shared between pages; the ones drawn inside a form are part of the form's digest
+    used_fonts = [(font[4], object_digest(doc, font[0], memo)) for font in page.get_fonts() if _uses(contents, font[4])]
+    digest.update(repr(used_fonts).encode())
+    xobjects = [(xobject[1], xobject[0]) for xobject in page.get_xobjects() if xobject[2] == 0]
+    xobjects += [(image[7], image[0]) for image in page.get_images(full=True) if image[9] == 0]
+    used_xobjects = sorted((name, object_digest(doc, xref, memo)) for name, xref in xobjects if _uses(contents, name))
+    digest.update(repr(used_xobjects).encode())
+    return digest.hexdigest()
+
+
+def document_fingerprints(doc):
+    memo = {}
+    return [page_fingerprint(doc, page_num, memo) for page_num in range(doc.page_count)]
+
+
+def manifest_path(output_path):
+    return f"{output_path}.pages"
+
+
+class PageManifest:
+    def __init__(
+        self, fingerprints=(), records=(), states=(), rows=(), tables=(), header_footer=None, layout=None, bullets=(), images=(),
+        with_images=False,
+    ):
+        self.fingerprints = list(fingerprints)
+        self.records = list(records)
+        # states[i] is the stitch state before page i; states[page_count] the one before finish()
+        self.states = list(states)
+        self.rows = list(rows)
+        self.tables = list(tables)
+        self.bullets = list(bullets)
+        self.images = list(images)
+        self.with_images = with_images
+        # HeaderFooterModel.as_tuple() the records were classified with
+        self.header_footer = header_footer
+        # LayoutProfile.thresholds() the records were classified with
+        self.layout = layout
+
+    @property
+    def page_count(self):
+        return len(self.fingerprints)
+
+    @classmethod
+    def load(cls, path):
+        """The manifest at path, or None if it is missing, unreadable or from another version."""
+        try:
+            with open(path, "rb") as f:
+                data = marshal.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+        if not isinstance(data, dict) or data.get("format") != _FORMAT_TAG:
+            return None
+        return cls(
+            data["fingerprints"], data["records"], data["states"], data["rows"], data["tables"], data["header_footer"], data["layout"],
+            data["bullets"], data["images"], data["with_images"],
+        )
+
+    def save(self, path):
+        data = {
+            "format": _FORMAT_TAG,
+            "fingerprints": self.fingerprints,
+            "records": self.records,
+            "states": self.states,
+            "rows": self.rows,
+            "tables": self.tables,
+            "bullets": self.bullets,
+            "images": self.images,
+            "with_images": self.with_images,
+            "header_footer": self.header_footer,
+            "layout": self.layout,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(marshal.dumps(data), 1))
+        os.replace(tmp_path, path)
@@ -0,0 +1,194 @@
+"""
+Cheap first look at a DDx page, to skip get_text("dict") where it can't matter.
+
+Two tiers, each much cheaper than the span-level extraction:
+
+- the page's content stream is searched for text operators. A page without
+  any (an image-only page) has no records at all, whatever the state,
+- only when the stitcher has no section open, the stream is followed to
+  bound the size MuPDF can report for any span (font size, text matrix,
+  CTM and horizontal scaling), which rules out a chapter title, and then
+  the page's plain text is searched for the lines that can change the
+  state: a KNOWN_SECTIONS line, a SUBSUB_HEADINGS line and, when tables
+  are written, enough ja/nein cells for a decision matrix.
+
+A page that passes both is PLAIN: outside a section its blocks are all
+dropped by SectionStitcher, so it is fed no records. Every doubt (form
+XObjects, Type3 fonts, annotations, inline images, an unbalanced q/Q) makes
+the page FULL, so the output is the same as without the probe.
+"""
+import math
+import re
+from collections import Counter
+
+from ddx_tables import text_may_hold_matrix
+from span_cache import TEXT_ONLY_FLAGS
+
+EMPTY, PLAIN, FULL = "empty", "plain", "full"
+
+# Strings and comments are matched whole so their bytes are never read as operators
+_TOKEN_RE = re.compile(
+    rb"\((?:\\.|[^\\()])*\)|<[0-9A-Fa-f\s]*>|%[^\r\n]*"
+    rb"|(/[^\s\[\]()<>{}/%]*)|([+-]?(?:\d+\.?\d*|\.\d+))|([A-Za-z'\"*]+)"
+)
+_SHOW_OPERATORS = {b"Tj", b"TJ", b"'", b'"'}
+# Can only miss a stream without text; a string holding these bytes merely costs the full scan
+_MAY_SHOW_TEXT_RE = re.compile(rb"BT|Tj|TJ|'|\"")
+# Skipped pages per verdict extracted after the run to estimate what the probe saved
+SAMPLE_PAGES = 8
+
+
+def content_tokens(contents):
+    """(name, number, operator) per token of a content stream, two of them empty; strings come out all empty."""
+    return _TOKEN_RE.findall(contents)
+
+
+def _scale(a, b, c, d):
+    """Largest singular value of the 2x2 part of a PDF matrix."""
+    total = a * a + b * b + c * c + d * d
+    det = a * d - b * c
+    return math.sqrt((total + math.sqrt(max(total * total - 4 * det * det, 0.0))) / 2)
+
+
+def text_size_bound(contents):
+    """
+    None if a content stream shows no text, else an upper bound on the size
+    of its spans (math.inf when the stream can't be followed).
+    """
+    ctm, stack = 1.0, []
+    font_size, text_matrix, scaling = 0.0, 1.0, 1.0
+    bound = None
+    numbers = []
+    for _, number, operator in content_tokens(contents):
+        if number:
+            numbers.append(float(number))
+            continue
+        if not operator:
+            continue
+        if operator in _SHOW_OPERATORS:
+            bound = max(bound or 0.0, font_size * text_matrix * scaling * ctm if font_size else math.inf)
+        elif operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q":
+            if not stack:
+                return math.inf
+            ctm = stack.pop()
+        elif operator == b"cm" and len(numbers) >= 6:
+            ctm *= _scale(*numbers[-6:-2])
+        elif operator == b"BT":
+            text_matrix = 1.0
+        elif operator == b"Tm" and len(numbers) >= 6:
+            text_matrix = _scale(*numbers[-6:-2])
+        elif operator == b"Tf" and numbers:
+            # Never lowered: Q may restore an earlier, larger font
+            font_size = max(font_size, abs(numbers[-1]))
+        elif operator == b"Tz" and numbers:
+            scaling = max(scaling, numbers[-1] / 100)
+        elif operator == b"BI":
+            return math.inf
+        numbers = []
+    return bound
+
+
+class PageProbe:
+    """
+    Decides per page whether the span-level extraction is needed.
+
+    collecting is a callable telling whether the stitcher keeps content
+    right now (a section or subsection is open); without it only pages
+    without text are skipped, which is what process-pool workers do since
+    the stitching state lives in the main process. record() keeps the
+    verdicts and timings; report() estimates what the skipped pages would
+    have cost from a few of them extracted after the run (calibrate()).
+    """
+
+    def __init__(self, sections, subsections, chapter_min_size, tables=True, collecting=None):
+        self.sections = frozenset(sections)
+        self.subsections = frozenset(subsections)
+        self.chapter_min_size = chapter_min_size
+        self.tables = tables
+        self.collecting = collecting
+        self.counts = Counter({EMPTY: 0, PLAIN: 0, FULL: 0})
+        self.skipped_pages = {EMPTY: [], PLAIN: []}
+        # Time spent probing, extracting the FULL pages, and extracting a sample of the skipped ones per verdict
+        self.seconds = 0.0
+        self.full_seconds = 0.0
+        self.sample_seconds = {}
+
+    def stateless(self):
+        """A copy without the stitcher callback, for the pool workers."""
+        return PageProbe(self.sections, self.subsections, self.chapter_min_size, self.tables)
+
+    def check(self, doc, page_num):
+        collecting = self.collecting is None or self.collecting()
+        if collecting and doc.xref_get_key(doc.page_xref(page_num), "Resources/Font")[0] != "null":
+            # Fonts of its own: the page may well show text, and all of it is needed
+            return FULL
+        page = doc.load_page(page_num)
+        if page.first_annot is not None or page.get_xobjects():
+            # Text drawn outside the page's own content stream
+            return FULL
+        contents = page.read_contents()
+        if not _MAY_SHOW_TEXT_RE.search(contents):
+            return EMPTY
+        if collecting:
+            return FULL
+        bound = text_size_bound(contents)
+        if bound is None:
+            return EMPTY
+        if bound >= self.chapter_min_size:
+            return FULL
+        if any(font[2] == "Type3" for font in page.get_fonts()):
+            # Glyph sizes come from the font's own matrix
+            return FULL
+        text = page.get_text("text", flags=TEXT_ONLY_FLAGS)
+        lines = {line.strip() for line in text.splitlines()}
+        if lines & self.sections or {line.lower() for line in lines} & self.subsections:
+            return FULL
+        if self.tables and text_may_hold_matrix(text):
+            return FULL
+        return PLAIN
+
+    def record(self, page_num, verdict, probe_seconds, extract_seconds=0.0):
+        self.counts[verdict] += 1
+        self.seconds += probe_seconds
+        self.full_seconds += extract_seconds
+        if verdict != FULL:
+            self.skipped_pages[verdict].append(page_num)
+
+    def skipped(self):
+        return self.counts[EMPTY] + self.counts[PLAIN]
+
+    def sample(self, size=SAMPLE_PAGES):
+        """Up to size skipped pages per verdict, evenly spread, to time with calibrate()."""
+        return {
+            verdict: page_nums[::max(1, -(-len(page_nums) // size))][:size]
+            for verdict, page_nums in self.skipped_pages.items() if page_nums
+        }
+
+    def calibrate(self, verdict, seconds):
+        """seconds: the full extraction time of each sample() page of that verdict."""
+        self.sample_seconds[verdict] = sum(seconds) / len(seconds)
+
+    def report(self, wall_seconds=None):
+        """
+        Verdict counts and probe time; once calibrated, the estimated time
+        the skipped pages would have taken and the speedup of the page
+        extraction stage and, given the run's wall time, of the whole run.
+        """
+        report = {
+            "pages": sum(self.counts.values()),
+            "empty": self.counts[EMPTY],
+            "plain": self.counts[PLAIN],
+            "full": self.counts[FULL],
+            "probe_seconds": round(self.seconds, 4),
+            "extract_seconds": round(self.full_seconds, 4),
+        }
+        if len(self.sample_seconds) == len([pages for pages in self.skipped_pages.values() if pages]):
+            avoided = sum(self.counts[verdict] * seconds for verdict, seconds in self.sample_seconds.items())
+            with_probe = self.full_seconds + self.seconds
+            report["estimated_seconds_avoided"] = round(avoided, 4)
+            report["extraction_speedup"] = round((self.full_seconds + avoided) / with_probe, 2) if with_probe else None
+            if wall_seconds:
+                report["overall_speedup"] = round((wall_seconds - self.seconds + avoided) / wall_seconds, 2)
+        return report
@@ -0,0 +1,126 @@
+"""
+Columnar view of one page's spans.
+
+The page is walked once into flat NumPy arrays (size, flags, interned font
+id, bbox) plus span/line/block offsets; the per-block and per-line font
+predicates used by the DDx classifier are then computed for the whole page
+at once instead of rescanning nested span dicts for every block and line.
+"""
+import numpy as np
+
+TABLE_FONT_SIZE = 7.5
+SUBSUB_FONT_SIZE = 8.0
+
+
+def _segment_reduce(ufunc, values, starts, counts, sentinel):
+    """ufunc.reduceat over [start, next start) segments; empty segments give 0."""
+    if not len(starts):
+        return np.zeros(0, dtype=values.dtype)
+    # The sentinel keeps every start a valid index, including trailing empty segments;
+    # it is neutral for the reduction, so the last segment running over it is harmless
+    extended = np.append(values, np.array([sentinel], dtype=values.dtype))
+    reduced = ufunc.reduceat(extended, starts)
+    return np.where(counts > 0, reduced, 0)
+
+
+def _segment_sum(values, starts, counts):
+    return _segment_reduce(np.add, values, starts, counts, 0)
+
+
+def _segment_max(values, starts, counts):
+    return _segment_reduce(np.maximum, values, starts, counts, -np.inf)
+
+
+def _segment_any(mask, starts, counts):
+    return _segment_sum(mask.astype(np.int64), starts, counts) > 0
+
+
+class PageSpans:
+    def __init__(self, fonts, packed):
+        """Build from span_cache.pack_blocks() output: (fonts, packed blocks)."""
+        self.fonts = list(fonts)
+        self.block_numbers = [block[0] for block in packed]
+        self.block_types = [block[1] for block in packed]
+        line_spans = [spans for block in packed for _, spans in block[3]]
+        block_line_counts = [len(block[3]) for block in packed]
+        line_span_counts = [len(spans) for spans in line_spans]
+        self.line_texts = [" ".join([span[0] for span in spans]).strip() for spans in line_spans]
+        self.line_bbox = np.array([line_bbox for block in packed for line_bbox, _ in block[3]], dtype=np.float64).reshape(-1, 4)
+
+        flat = [span for spans in line_spans for span in spans]
+        texts, sizes, flags, font_ids, bboxes = zip(*flat) if flat else ((), (), (), (), ())
+
+        # One text buffer, span i is text[span_offsets[i]:span_offsets[i + 1]]
+        self.text = "".join(texts)
+        self.span_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)), out=self.span_offsets[1:])
+
+        self.size = np.array(sizes, dtype=np.float64)
+        self.flags = np.array(flags, dtype=np.int32)
+        self.font_id = np.array(font_ids, dtype=np.int32)
+        self.bbox = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+
+        # Offsets: line -> first span, block -> first line, block -> first span
+        self.line_span_count = np.array(line_span_counts, dtype=np.int64)
+        self.line_span_start = np.cumsum(self.line_span_count) - self.line_span_count
+        self.block_line_count = np.array(block_line_counts, dtype=np.int64)
+        self.block_line_start = np.cumsum(self.block_line_count) - self.block_line_count
+        line_bounds = np.append(self.line_span_start, len(texts))
+        self.block_span_start = line_bounds[self.block_line_start]
+        self.block_span_count = line_bounds[self.block_line_start + self.block_line_count] - self.block_span_start
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        from span_cache import pack_blocks
+
+        return cls(*pack_blocks(blocks))
+
+    def __len__(self):
+        return len(self.block_numbers)
+
+    def span_text(self, index):
+        return self.text[self.span_offsets[index]:self.span_offsets[index + 1]]
+
+    def block_lines(self, block_index):
+        start = self.block_line_start[block_index]
+        return self.line_texts[start:start + self.block_line_count[block_index]]
+
+    # ➤ Vectorized predicates, one value per block or per line
+
+    def small_print_mask(self, size=TABLE_FONT_SIZE, tolerance=0.2):
+        return np.abs(self.size - size) < tolerance
+
+    def block_max_size(self):
+        return _segment_max(self.size, self.block_span_start, self.block_span_count)
+
+    def line_has_small_print(self, small=None):
+        small = self.small_print_mask() if small is None else small
+        return _segment_any(small, self.line_span_start, self.line_span_count)
+
+    def block_small_print_count(self, small=None):
+        small = self.small_print_mask() if small is None else small
+        return _segment_sum(small.astype(np.int64), self.block_span_start, self.block_span_count)
+
+    def table_block_mask(self, min_spans=5, min_ratio=0.6):
+        """Same rule as is_table_block(): enough 7.5pt spans with text, and mostly 7.5pt."""
+        has_text = np.array([bool(self.span_text(i).strip()) for i in range(len(self.size))], dtype=bool)
+        count = self.block_small_print_count(self.small_print_mask() & has_text)
+        return (count >= min_spans) & (count / np.maximum(self.block_span_count, 1) >= min_ratio)
+
+    def block_first_span(self):
+        """Index of the first span of each block's first line, -1 if that line has no spans."""
+        first = np.full(len(self.block_numbers), -1, dtype=np.int64)
+        has_line = self.block_line_count > 0
+        first_lines = self.block_line_start[has_line]
+        first[has_line] = np.where(self.line_span_count[first_lines] > 0, self.line_span_start[first_lines], -1)
+        return first
+
+    def block_starts_bold(self, size=SUBSUB_FONT_SIZE, tolerance=0.2):
+        """First span of the first line is bold and of the given size (the is_subsub() font rule)."""
+        bold_fonts = np.array(["Bold" in font for font in self.fonts] or [False], dtype=bool)
+        first = self.block_first_span()
+        valid = first >= 0
+        result = np.zeros(len(first), dtype=bool)
+        index = first[valid]
+        result[valid] = (np.abs(self.size[index] - size) < tolerance) & bold_fonts[self.font_id[index]]
+        return result
@@ -0,0 +1,248 @@
+"""
+Text backends for the Harrison question extraction.
+
+Both return a page's plain text below the running header, one line per
+visual line, words separated by single spaces, in the line order the
+question lexer expects:
+
+- "pdfplumber": page.within_bbox(...).extract_text(), pdfminer's layout
+  analysis in pure Python (the original behaviour).
+- "pymupdf": page.get_text("words", clip=...) from MuPDF, grouped into
+  lines the way pdfplumber does it: words whose tops are within
+  y_tolerance of each other form one line (across both columns), sorted
+  left to right.
+
+Either way a line runs across both columns of a two-column page, so the
+left and right column lines at the same height come out as one line. With
+columns=True, page_lines() takes each page's words with their positions
+once (page.extract_words() / get_text("words")), drops the ones in the
+header and footer margins from that same list, finds the gutter between
+the columns as the widest x-range hardly any word covers, and returns the
+left column's lines, then the right column's. A line that crosses the
+gutter (a full-width heading or footer) ends the column block above it.
+page_line_orders() gives both orders from one page_words() read, for a
+pass that needs the page line by line and column by column.
+
+pdfplumber keeps every parsed layout object of a page it has read until
+the page is closed, several MB per page, so page_text() closes each page
+once its text is out. Each source carries a memory.MemoryGuard (NULL_GUARD
+by default) that the readers call after every page.
+"""
+import fitz  # PyMuPDF
+import numpy as np
+
+from memory import NULL_GUARD
+
+HEADER_HEIGHT = 50
+FOOTER_HEIGHT = 0
+Y_TOLERANCE = 3
+# A gutter is at least this wide, crossed by at most this share of the lines, with this share of the words on either side
+MIN_GUTTER = 8
+GUTTER_CROSSING = 0.1
+MIN_COLUMN_SHARE = 0.1
+
+
+class TextSource:
+    """An open PDF that hands out clipped page text; use as a context manager."""
+
+    engine = None
+
+    def __init__(self, path, columns=False):
+        self.path = path
+        self.columns = columns
+        self.memory = NULL_GUARD
+
+    @property
+    def page_count(self):
+        raise NotImplementedError
+
+    def page_text(self, page_index, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT):
+        raise NotImplementedError
+
+    def page_words(self, page_index):
+        """([(x0, top, x1, bottom, text)], page height) of every word on the page."""
+        raise NotImplementedError
+
+    def page_lines(self, page_index, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT, columns=None):
+        """The lines of page_text(), or with columns=True the lines column by column; columns defaults to the source's."""
+        if not (self.columns if columns is None else columns):
+            return self.page_text(page_index, header, footer).split("\n")
+        words, height = self.page_words(page_index)
+        return column_lines([word for word in words if word[1] >= header and word[3] <= height - footer])
+
+    def clip_words(self, words, height, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT):
+        """The words page_text() keeps: pdfplumber's within_bbox() only keeps those wholly inside."""
+        return [word for word in words if word[1] >= header and word[3] <= height - footer]
+
+    def page_line_orders(self, page_index, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT):
+        """(the lines of page_text(), the lines column by column) from a single page_words() read."""
+        words, height = self.page_words(page_index)
+        inside = [word for word in words if word[1] >= header and word[3] <= height - footer]
+        # page_text() of a page without text is "", one empty line
+        return _cluster_lines(self.clip_words(words, height, header, footer)) or [""], column_lines(inside)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PdfplumberSource(TextSource):
+    engine = "pdfplumber"
+
+    def __init__(self, path, columns=False):
+        import pdfplumber
+
+        super().__init__(path, columns)
+        self.pdf = pdfplumber.open(path)
+
+    @property
+    def page_count(self):
+        return len(self.pdf.pages)
+
+    def page_text(self, page_index, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT):
+        page = self.pdf.pages[page_index]
+        cropped = page.within_bbox((0, header, page.width, page.height - footer))
+        text = cropped.extract_text() or ''
+        cropped.close()
+        page.close()
+        return text
+
+    def page_words(self, page_index):
+        page = self.pdf.pages[page_index]
+        words = [(word["x0"], word["top"], word["x1"], word["bottom"], word["text"]) for word in page.extract_words()]
+        height = page.height
+        page.close()
+        return words, height
+
+    def close(self):
+        self.pdf.close()
+
+
+def _cluster_rows(words, tolerance=Y_TOLERANCE):
+    """Words (x0, top, ..., text) grouped into rows by top; same chaining rule as pdfplumber's cluster_objects()."""
+    rows = []
+    current = []
+    last_top = None
+    for word in sorted(words, key=lambda word: word[1]):
+        if current and word[1] > last_top + tolerance:
+            rows.append(current)
+            current = []
+        current.append(word)
+        last_top = word[1]
+    if current:
+        rows.append(current)
+    return rows
+
+
+def _cluster_lines(words, tolerance=Y_TOLERANCE):
+    """Words (x0, top, ..., text) -> lines of text, each sorted left to right."""
+    return [" ".join(word[-1] for word in sorted(row, key=lambda word: word[0])) for row in _cluster_rows(words, tolerance)]
+
+
+def find_gutter(words):
+    """
+    x in the middle of the gap between two columns of words (x0, top, x1,
+    bottom, text), or None if the words don't form two columns.
+    """
+    if len(words) < 2:
+        return None
+    origin = int(min(word[0] for word in words))
+    size = int(np.ceil(max(word[2] for word in words))) - origin + 1
+    # Words covering each 1pt slot: +1 where a word starts, -1 after it ends
+    boxes = np.array([(word[0], word[2]) for word in words])
+    starts = boxes[:, 0].astype(np.int64) - origin
+    ends = np.ceil(boxes[:, 1]).astype(np.int64) - origin
+    coverage = np.cumsum(np.bincount(starts, minlength=size + 1) - np.bincount(ends, minlength=size + 1))[:size]
+    # Only gaps in the middle three fifths can be a gutter, not a ragged margin
+    low = coverage <= GUTTER_CROSSING * coverage.max()
+    low[:size // 5] = False
+    low[size - size // 5:] = False
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], low.astype(np.int8), [0]))))
+    best = None
+    for start, stop in zip(edges[::2], edges[1::2]):
+        if stop - start >= MIN_GUTTER and (best is None or stop - start > best[1] - best[0]):
+            best = (start, stop)
+    if best is None:
+        return None
+    gutter = origin + (best[0] + best[1]) / 2
+    left = np.count_nonzero(boxes[:, 1] <= gutter)
+    right = np.count_nonzero(boxes[:, 0] >= gutter)
+    if min(left, right) < MIN_COLUMN_SHARE * len(words):
+        return None
+    return gutter
+
+
+def column_lines(words, tolerance=Y_TOLERANCE):
+    """
+    Words (x0, top, x1, bottom, text) -> lines in reading order: the left
+    column's lines, then the right column's, down to the next line that
+    crosses the gutter, which follows them as it is. Without a gutter
+    this is _cluster_lines().
+    """
+    gutter = find_gutter(words)
+    if gutter is None:
+        return _cluster_lines(words, tolerance)
+    if not any(word[0] < gutter < word[2] for word in words):
+        return _cluster_lines([word for word in words if word[2] <= gutter], tolerance) + \
+            _cluster_lines([word for word in words if word[2] > gutter], tolerance)
+    lines = []
+    left, right = [], []
+    for row in _cluster_rows(words, tolerance):
+        if any(word[0] < gutter < word[2] for word in row):
+            lines += _cluster_lines(left, tolerance) + _cluster_lines(right, tolerance)
+            lines += _cluster_lines(row, tolerance)
+            left, right = [], []
+            continue
+        for word in row:
+            (left if word[2] <= gutter else right).append(word)
+    return lines + _cluster_lines(left, tolerance) + _cluster_lines(right, tolerance)
+
+
+class PymupdfSource(TextSource):
+    engine = "pymupdf"
+
+    def __init__(self, path, columns=False):
+        super().__init__(path, columns)
+        self.doc = fitz.open(path)
+
+    @property
+    def page_count(self):
+        return self.doc.page_count
+
+    def page_text(self, page_index, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT):
+        page = self.doc.load_page(page_index)
+        rect = page.rect
+        clip = fitz.Rect(rect.x0, rect.y0 + header, rect.x1, rect.y1 - footer)
+        words = page.get_text("words", clip=clip, sort=False)
+        return "\n".join(_cluster_lines((word[0], word[1], word[4]) for word in words))
+
+    def page_words(self, page_index):
+        page = self.doc.load_page(page_index)
+        words = [word[:5] for word in page.get_text("words", sort=False)]
+        return words, page.rect.height
+
+    def clip_words(self, words, height, header=HEADER_HEIGHT, footer=FOOTER_HEIGHT):
+        """MuPDF's clip also keeps a word that only reaches into the clip rectangle."""
+        return [word for word in words if word[3] > header and word[1] < height - footer]
+
+    def close(self):
+        self.doc.close()
+
+
+ENGINES = {
+    "pdfplumber": PdfplumberSource,
+    "pymupdf": PymupdfSource,
+}
+
+
+def open_text_source(path, engine="pdfplumber", columns=False):
+    try:
+        source_class = ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unsupported text engine {engine!r}, use one of {', '.join(ENGINES)}") from None
+    return source_class(path, columns)
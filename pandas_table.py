@@ -1,292 +1,684 @@
-import pdfplumber
+import argparse
+import json
+import logging
+import os
 import re
-import pandas as pd
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from checkpoint import Checkpoint, add_checkpoint_arguments, checkpoint_every_from_args, checkpoint_path
+from memory import NULL_GUARD, MemoryGuard, MemoryLimitExceeded, add_memory_arguments, guard_from_args
+from page_index import load_page_index
+from page_text import ENGINES, open_text_source
+from question_lexer import CONTINUATION, FOOTER, JUNK, OPTION, QUESTION_START, ROMAN_PATTERN, lex_lines
+from profiling import NULL_PROFILER, add_logging_arguments, configure_logging, make_profiler
+from sinks import open_sink
+from span_cache import file_digest
+from text_index import IndexUpdate, book_name
+
+log = logging.getLogger("pandas_table")
 
 roman_numerals = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
 OPTION_LETTERS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
-'''
- SECTION I INTRODUCTION TO CLINICAL MEDICINE
- Questions 1
- Answers 18
- SECTION II NUTRITION
- Questions 47
- Answers 50
- SECTION III ONCOLOGY AND HEMATOLOGY
- Questions 55
- Answers 71
- SECTION IV INFECTIOUS DISEASES
- Questions 103
- Answers 130
- SECTION V DISORDERS OF THE CARDIOVASCULAR SYSTEM
- Questions 175
- Answers 202
- SECTION VI DISORDERS OF THE RESPIRATORY SYSTEM
- Questions 237
- Answers 254
- SECTION VII DISORDERS OF THE URINARY AND KIDNEY TRACT
- Questions 283
- Answers 293
- SECTION VIII DISORDERS OF THE GASTROINTESTINAL SYSTEM
- Questions 307
- Answers 321
- SECTION IX RHEUMATOLOGY AND IMMUNOLOGY
- Questions 345
- Answers 358
- For more information about this title, click here
-vi CONTENTS
- SECTION X ENDOCRINOLOGY AND METABOLISM
- Questions 379
- Answers 393
- SECTION XI NEUROLOGIC DISORDERS
- Questions 421
- Answers 435
- SECTION XII DERMATOLOGY
- Questions 457
- Answers 460
-
-'''
-chap = {'I': [18, 47],
-        'II': [50, 55],
-        'III': [71, 103],
-        'IV': [130, 175],
-        'V': [202, 237],
-        'VI': [254, 283],
-        'VII': [293, 307],
-        'VIII': [321, 345],
-        'IX': [358, 379],
-        'X': [393, 421],
-        'XI': [435, 457],
-        'XII': [460, 465],
-}
-
-def is_option_start(line):
-    return re.match(r'^[A-Ha-h]\.', line.strip())
-
-def extract_options(lines, start_idx):
+
+
+def extract_options(tokens, start_idx):
     options = {}
     current_option = None
     idx = start_idx
 
-    while idx < len(lines):
-        line = lines[idx].strip()
+    while idx < len(tokens):
+        token = tokens[idx]
 
         # Stop if a new question begins
-        if re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', line):
+        if token.kind is QUESTION_START or token.kind is CONTINUATION:
             break
 
-        # Skip footer or copyright/junk
-        if re.search(r'Copyright|Click here for terms|McGra|Hill|^\d+[\s\-]', line, re.IGNORECASE):
-            idx += 1
-            continue
-
-        # Skip junk lines (e.g., CLINICAL MEDICINE)
-        if line.isupper() and len(line.split()) <= 4:
+        # Skip footer or copyright/junk (e.g., CLINICAL MEDICINE)
+        if token.kind is FOOTER or token.kind is JUNK:
             idx += 1
             continue
 
         # Start of new option
-        match = re.match(r'^([A-Ha-h])\. +(.+)', line)
-        if match:
-            current_option = match.group(1).upper()
-            options[current_option] = match.group(2).strip()
+        if token.kind is OPTION:
+            current_option = token.qid
+            options[current_option] = [token.text]
         elif current_option:
+            parts = options[current_option]
             # Merge hyphenated word across lines
-            if options[current_option].endswith('-') and line and line[0].islower():
-                options[current_option] = options[current_option][:-1] + line.strip()
+            if parts[-1].endswith('-') and token.line and token.line[0].islower():
+                parts[-1] = parts[-1][:-1] + token.line
             else:
-                options[current_option] += ' ' + line.strip()
+                parts.append(token.line)
 
         idx += 1
 
-    return options, idx
-
-def clean_question_text(text):
-    print("\n--- Raw Collected Text ---")
-    print(text)
-
-    
-
-    # 2. Remove known footers and repeated irrelevant phrases line by line
-    lines = text.split('\n')
-    # print("\n--- Lines ---", lines)
-    cleaned_lines = []
-    for line in lines:
-        if re.search(r'CLINICAL MEDICINE|Hill Companies', line, re.IGNORECASE):
-            print(f"❌ Skipping footer line: {line}")
-            continue
-
-        cleaned_lines.append(line.strip())
+    return {letter: ' '.join(parts) for letter, parts in options.items()}, idx
 
-    text = '. '.join(cleaned_lines)
-    text = re.sub(r'Copyright ©.*?Click here for terms of use\.?', '', text, flags=re.IGNORECASE)
-    print("\n--- After Footer Removal ---")
-    print(text)
-
-    # 3. Remove (continued)
-    text = re.sub(r'\(\s*continued\s*\)', '', text, flags=re.IGNORECASE)
-    print("\n--- After Continued Removal ---")
-    print(text)
-
-    # 1. Fix hyphenated line breaks FIRST
-    text = text.replace('-\n', '').replace('\n', ' ')
-    text = re.sub(r'(\w)-\s+(\w)', r'\1\2', text)  # Also fix leftover "- word" cases
-    print("\n--- After Hyphen Fix ---")
-    print(text)
-
-    return text.strip()
-
-
-def extract_questions_columnwise(pdf_path, start_page, end_page):
-    questions = {}
-    question_number = None
-    current_question_lines = []
-    is_question_section = True
-
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages[start_page:end_page]:  # Adjust page range as needed
-            print(f"\n📄 Page {page.page_number} Text:")
-            
-            header = 50
-            footer = 0
-            full_text = page.within_bbox((0, header, page.width, page.height - footer)).extract_text() or ''
-            all_lines = full_text.split('\n')
-
-            i = 0
-            while i < len(all_lines):
-                line = all_lines[i].strip()
-                if page.page_number == 26:
-                    print("Line", i, ":", line)
-
-                if not is_question_section:
-                    i += 1
-                    continue
 
-                # if re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\. The answer is [A-Ha-h]\.', line) or re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d{1,3}\. and (?:I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d{1,3}\. The answers are [A-H] and [A-H]\.', line):
-                #     print(f"❌ Skipping answer line: {line}")
-                #     i += 1
-                #     continue
+_QUESTION_FOOTER_RE = re.compile(r'CLINICAL MEDICINE|Hill Companies', re.IGNORECASE)
+_QUESTION_NOISE_RE = re.compile(r'Copyright ©.*?Click here for terms of use\.?|\(\s*continued\s*\)', re.IGNORECASE)
+_HYPHEN_BREAK_RE = re.compile(r'(\w)-\s+(\w)')
 
 
-                # If an options block begins
-                if is_option_start(line):
-                    options_dict, new_idx = extract_options(all_lines, i)
-                    print(f"📌 Collected options block: {options_dict}")
-                    i = new_idx
-                    continue
+def clean_question_text(text):
+    debug = log.isEnabledFor(logging.DEBUG)
+    if debug:
+        log.debug("\n--- Raw Collected Text ---\n%s", text)
 
-                # Match question start
-                match = re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-(\d+)\.', line)
-                continued_match = re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-(\d+)\. \(Continued\)', line, re.IGNORECASE)
+    # Remove known footers and repeated irrelevant phrases line by line
+    text = '. '.join(line.strip() for line in text.split('\n') if not _QUESTION_FOOTER_RE.search(line))
 
-                if continued_match:
-                    cont_qnum = f"{continued_match.group(1)}-{continued_match.group(2)}"
-                    if question_number == cont_qnum:
-                        cleaned_line = re.sub(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\. \(Continued\)', '', line, flags=re.IGNORECASE).strip()
-                        current_question_lines.append(cleaned_line)
-                        print(f"🔁 Appending to continued: {cont_qnum}")
-                    i += 1
-                    continue
+    # Copyright notice and (continued) markers in one pass, then hyphenated line breaks
+    text = _QUESTION_NOISE_RE.sub('', text)
+    text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)
+    if debug:
+        log.debug("\n--- Cleaned Text ---\n%s", text)
 
-                if match:
-                    new_qnum = f"{match.group(1)}-{match.group(2)}"
-
-                    if new_qnum == question_number:
-                        cleaned_line = re.sub(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', '', line).strip()
-                        current_question_lines.append(cleaned_line)
-                        print(f"🔁 Duplicate header in same question: {new_qnum}")
-                        i += 1
-                        continue
-
-                    # Save previous question
-                    if question_number and current_question_lines:
-                        full_text = ' '.join(current_question_lines)
-                        words = full_text.split()
-
-                        if len(words) > 4:
-                            first_part = ' '.join(words[:4])
-                            rest_part = ' '.join(words[4:])
-                            question_label_pattern = re.escape(question_number) + r'\.\s*'
-                            rest_part = re.sub(question_label_pattern, '', rest_part)
-                            full_text = f"{first_part} {rest_part}"
-                        else:
-                            full_text = ' '.join(words)
-
-                        cleaned = clean_question_text(full_text)
-                        print(f"📝 Cleaning question text: {cleaned}")
-                        if question_number in questions:
-                            questions[question_number] += ' ' + cleaned
-                            print(f"🔄 Appended to existing question: {question_number}")
-                        else:
-                            questions[question_number] = cleaned
-                            print(f"✅ New question added: {question_number}")
-
-                    question_number = new_qnum
-                    current_question_lines = [line]
-                    print(f"▶️ Starting new question: {question_number}")
-                elif question_number:
-                    dup_header_inside = re.match(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', line)
-                    if dup_header_inside:
-                        line = re.sub(r'^(I|II|III|IV|V|VI|VII|VIII|IX|X|XI|XII)-\d+\.', '', line).strip()
-                        print(f"🧹 Removed duplicate header in body of {question_number}")
-                    current_question_lines.append(line)
+    return text.strip()
 
-                i += 1
 
-    # Save last question
-    if question_number and current_question_lines:
-        full_text = ' '.join(current_question_lines)
-        words = full_text.split()
+def join_question_lines(question_number, question_lines):
+    full_text = ' '.join(question_lines)
+    words = full_text.split()
 
-        if len(words) > 4:
-            first_part = ' '.join(words[:4])
-            rest_part = ' '.join(words[4:])
+    if len(words) > 4:
+        first_part = ' '.join(words[:4])
+        rest_part = ' '.join(words[4:])
+        if question_number + '.' in rest_part:
             question_label_pattern = re.escape(question_number) + r'\.\s*'
             rest_part = re.sub(question_label_pattern, '', rest_part)
-            full_text = f"{first_part} {rest_part}"
-        else:
-            full_text = ' '.join(words)
+        return f"{first_part} {rest_part}"
+    return ' '.join(words)
+
+
+def question_sort_key(question_number):
+    roman, number = question_number.split('-')
+    return roman_numerals.index(roman), int(number)
+
+
+class QuestionCollector:
+    """
+    Builds question text from the lexed lines of consecutive pages.
+
+    Question text is kept as lists of parts and only joined once in finish().
+    The A.-H. option blocks are parsed into self.options (question id ->
+    {letter: text}); with parse_options=False they are kept as text instead.
+    skip_noise drops footer and running-title lines rather than appending them
+    to the question (the original output keeps them).
+    """
+
+    def __init__(self, profile=NULL_PROFILER, skip_noise=False, parse_options=True):
+        self.questions = {}
+        self.options = {}
+        self.question_number = None
+        self.current_question_lines = []
+        self.profile = profile
+        self.skip_noise = skip_noise
+        self.parse_options = parse_options
+
+    def feed_tokens(self, tokens):
+        profile = self.profile
+        debug = log.isEnabledFor(logging.DEBUG)
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+
+            if self.skip_noise and (token.kind is FOOTER or token.kind is JUNK):
+                i += 1
+                continue
+
+            # If an options block begins
+            if token.option_prefix and self.parse_options:
+                options_dict, i = extract_options(tokens, i)
+                profile.count("option_blocks")
+                if self.question_number:
+                    # A block resumed after "(Continued)" adds to the same question
+                    self.options.setdefault(self.question_number, {}).update(options_dict)
+                if debug:
+                    log.debug("📌 Collected options block: %s", options_dict)
+                continue
+
+            if token.kind is CONTINUATION:
+                if token.qid == self.question_number:
+                    self.current_question_lines.append(token.text)
+                    profile.count("continuations")
+                    if debug:
+                        log.debug("🔁 Appending to continued: %s", token.qid)
+                i += 1
+                continue
+
+            if token.kind is QUESTION_START:
+                if token.qid == self.question_number:
+                    self.current_question_lines.append(token.text)
+                    profile.count("duplicate_headers")
+                    if debug:
+                        log.debug("🔁 Duplicate header in same question: %s", token.qid)
+                    i += 1
+                    continue
 
-        cleaned = clean_question_text(full_text)
-        print(f"📝 Cleaning question text 1: {cleaned}")
-        if question_number in questions:
-            questions[question_number] += ' ' + cleaned
-            print(f"🔄 Appended to existing question: {question_number}")
+                # Save previous question
+                self.save_current()
+                self.question_number = token.qid
+                self.current_question_lines = [token.line]
+                if debug:
+                    log.debug("▶️ Starting new question: %s", self.question_number)
+            elif self.question_number:
+                self.current_question_lines.append(token.line)
+
+            i += 1
+
+    def save_current(self):
+        if not (self.question_number and self.current_question_lines):
+            return
+
+        with self.profile.stage("flush"):
+            cleaned = clean_question_text(join_question_lines(self.question_number, self.current_question_lines))
+        if self.question_number in self.questions:
+            self.questions[self.question_number].append(cleaned)
+            self.profile.count("repeated_question_ids")
+            log.debug("🔄 Appended to existing question: %s", self.question_number)
         else:
-            questions[question_number] = cleaned
-            print(f"✅ New question added: {question_number}")
+            self.questions[self.question_number] = [cleaned]
+            self.profile.count("questions")
+            log.debug("✅ New question added: %s", self.question_number)
+
+    def state(self):
+        """Everything the next page's tokens build on, for a checkpoint."""
+        return self.questions, self.options, self.question_number, self.current_question_lines
+
+    def restore(self, state):
+        self.questions, self.options, self.question_number, self.current_question_lines = state
+
+    def texts(self):
+        """{question id: text}, with the pieces of a repeated id joined."""
+        # Save last question
+        self.save_current()
+        self.current_question_lines = []
+        return {q: ' '.join(parts) for q, parts in self.questions.items()}
+
+    def finish(self):
+        texts = self.texts()
+        log.info("📦 Total questions collected: %d", len(texts))
+        return [texts[q] for q in sorted(texts, key=question_sort_key)]
+
+
+# "IV-12. The answer is C." or "IV-12. and IV-13. The answers are B and D.", then the explanation
+_ANSWER_RE = re.compile(
+    rf"(?P<ids>{ROMAN_PATTERN}-\d+\.(?:\s*(?:,|and)\s*{ROMAN_PATTERN}-\d+\.)*)\s*"
+    r"The answers? (?:is|are) (?P<letters>[A-Ha-h](?:\s*(?:,|and|, and)\s*[A-Ha-h])*)\.\s*(?P<explanation>.*)",
+    re.DOTALL,
+)
+_ANSWER_ID_RE = re.compile(rf"{ROMAN_PATTERN}-\d+")
+_ANSWER_LETTER_RE = re.compile(r"\b[A-Ha-h]\b")
+
+
+def parse_answer(text):
+    """
+    An answer entry -> ({question id: [letters]}, explanation), or None if it
+    doesn't start with "The answer is". Two ids with as many letters ("I-12.
+    and I-13. The answers are B and D.") get one letter each, otherwise every
+    id gets all letters.
+    """
+    match = _ANSWER_RE.match(text)
+    if not match:
+        return None
+    ids = _ANSWER_ID_RE.findall(match.group("ids"))
+    letters = [letter.upper() for letter in _ANSWER_LETTER_RE.findall(match.group("letters"))]
+    if len(ids) > 1 and len(ids) == len(letters):
+        by_id = {qid: [letter] for qid, letter in zip(ids, letters)}
+    else:
+        by_id = {qid: letters for qid in ids}
+    return by_id, match.group("explanation").strip()
+
+
+def _strip_question_id(question_number, text):
+    if text.startswith(question_number + '.'):
+        return text[len(question_number) + 1:].strip()
+    return text
+
+
+QA_COLUMNS = ["Section", "Question ID", "Question", "Option", "Option Text", "Correct", "Explanation"]
+
+
+def answer_table(stems, options, answer_texts, profile=NULL_PROFILER):
+    """
+    Join question stems ({id: text}), their options ({id: {letter: text}})
+    and answer entries ({id: text}) on the question id into QA_COLUMNS rows,
+    one per option. A correct letter that isn't among the options still gets
+    a row (with empty option text), a question without options or answer a
+    single row with an empty Option.
+    """
+    answers = {}
+    for answer_id in sorted(answer_texts, key=question_sort_key):
+        parsed = parse_answer(answer_texts[answer_id])
+        if parsed is None:
+            profile.count("unparsed_answers")
+            log.debug("❓ No answer letter in: %s", answer_texts[answer_id][:80])
+            continue
+        letters_by_id, explanation = parsed
+        for question_number, letters in letters_by_id.items():
+            answers[question_number] = (letters, explanation)
+
+    rows = []
+    for question_number in sorted(stems.keys() | answers.keys(), key=question_sort_key):
+        letters, explanation = answers.get(question_number, ((), None))
+        if question_number not in answers:
+            profile.count("unanswered_questions")
+        elif question_number not in stems:
+            profile.count("answers_without_question")
+        base = {
+            "Section": question_number.split('-')[0],
+            "Question ID": question_number,
+            "Question": _strip_question_id(question_number, stems.get(question_number, '')),
+            "Explanation": explanation,
+        }
+        question_options = dict(options.get(question_number, ()))
+        for letter in letters:
+            if letter not in question_options:
+                question_options[letter] = ''
+                profile.count("answers_not_in_options")
+        if not question_options:
+            rows.append(dict(base, Option=None, Correct=None))
+            continue
+        for letter in sorted(question_options):
+            rows.append(dict(base, **{"Option": letter, "Option Text": question_options[letter], "Correct": letter in letters}))
+    return rows
+
+
+def extract_questions_columnwise(pdf_path, start_page, end_page, engine="pdfplumber", columns=False):
+    with open_text_source(pdf_path, engine, columns) as source:
+        return extract_questions_from_pdf(source, start_page, end_page)
+
+
+class SectionCheckpoint:
+    """
+    Checkpoints of one section's collectors, in a checkpoint.Checkpoint of
+    their own so that pool workers never share a file.
+
+    Every chunk holds the part of the section (0: question pages, 1: answer
+    pages) and the page last read, with the state of every tracked
+    collector; a finished section's last chunk holds its result instead.
+    Resumed, the collectors start from the last chunk and the pages it
+    covers are not read again.
+    """
+
+    def __init__(self, path, key, every, resume=False, profile=NULL_PROFILER):
+        self.checkpoint = Checkpoint(path, every)
+        chunks = self.checkpoint.start(key, resume)
+        self.last = chunks[-1] if chunks else None
+        self.collectors = ()
+        self.profile = profile
+
+    def result(self):
+        """The section's result if it was finished before, else None."""
+        return self.last.get("result") if self.last is not None else None
+
+    def track(self, *collectors):
+        """The collectors to save; they are restored from the last checkpoint if there is one."""
+        self.collectors = collectors
+        if self.last is not None:
+            log.info("⏯️ Resuming after page %d", self.last["page"] + 1)
+            for collector, state in zip(collectors, self.last["collectors"]):
+                collector.restore(state)
+
+    def first_page(self, part, start_page, end_page):
+        """The first page of part's range not covered by the last checkpoint."""
+        if self.last is None or part > self.last["part"]:
+            return start_page
+        if part < self.last["part"]:
+            return end_page
+        return max(start_page, self.last["page"] + 1)
+
+    def page_done(self, part, page_index):
+        if self.checkpoint.tick():
+            with self.profile.stage("checkpoint"):
+                self.checkpoint.save({"part": part, "page": page_index, "collectors": [c.state() for c in self.collectors]})
+
+    def done(self, result):
+        with self.profile.stage("checkpoint"):
+            self.checkpoint.save({"result": result})
+        self.checkpoint.close()
+        self.profile.count("checkpoints", self.checkpoint.saved)
+
+
+def feed_pages(
+    source, start_page, end_page, collectors, profile=NULL_PROFILER, pages=None, checkpoint=None, part=0, column_collectors=(),
+):
+    """
+    Read and lex every page of the range once and feed the tokens to each
+    collector. column_collectors are fed the page's lines column by column
+    whatever the source's columns setting; when the source reads line by
+    line, both orders come from the one read (page_line_orders()).
+    checkpoint is the section's SectionCheckpoint, told about every page
+    read as page `part` of the section.
+    """
+    if checkpoint is not None:
+        start_page = checkpoint.first_page(part, start_page, end_page)
+    for page_index in range(start_page, min(end_page, source.page_count)):
+        if pages is not None and page_index not in pages:
+            profile.count("skipped_pages")
+            continue
+        log.debug("\n📄 Page %d Text:", page_index + 1)
 
-    print(f"\n📦 Total questions collected: {len(questions)}")
-    return [questions[q] for q in sorted(
-        questions.keys(),
-        key=lambda x: (roman_numerals.index(x.split('-')[0]), int(x.split('-')[1]))
-    )]
+        # The 50pt running header is clipped off
+        with profile.stage("get_text"):
+            if collectors and column_collectors and not source.columns:
+                lines, column_order = source.page_line_orders(page_index, header=50, footer=0)
+            else:
+                lines = column_order = source.page_lines(page_index, header=50, footer=0, columns=True if column_collectors else None)
+        with profile.stage("classify"):
+            tokens = lex_lines(lines)
+            column_tokens = tokens if column_order is lines else lex_lines(column_order)
+        if profile.enabled:
+            for kind, count in Counter(token.kind for token in tokens).items():
+                profile.count(f"{kind.lower()}_lines", count)
+        for collector in collectors:
+            collector.feed_tokens(tokens)
+        for collector in column_collectors:
+            collector.feed_tokens(column_tokens)
+        profile.add_pages()
+        source.memory.page_done(page_index)
+        if checkpoint is not None:
+            checkpoint.page_done(part, page_index)
+
+
+def extract_questions_from_pdf(source, start_page, end_page, profile=NULL_PROFILER, pages=None, checkpoint=None):
+    """
+    Same as extract_questions_columnwise() but on an already opened
+    page_text.TextSource. If pages is given, only those page indexes of the
+    range are read. checkpoint is a SectionCheckpoint.
+    """
+    collector = QuestionCollector(profile)
+    if checkpoint is not None:
+        checkpoint.track(collector)
+    feed_pages(source, start_page, end_page, (collector,), profile, pages, checkpoint)
+    return collector.finish()
+
+
+def extract_qa_from_pdf(source, question_range, answer_range, profile=NULL_PROFILER, pages=None, checkpoint=None):
+    """
+    One pass over a section's question pages and then its answer pages
+    ([start, end] page indexes, either may be None). Returns (questions,
+    rows): the answer part's questions exactly as extract_questions_from_pdf()
+    gives them, and the answer_table() rows joining stems, options and
+    answers. Stems, options and answers are always read column by column:
+    read line by line, the two columns of a page interleave and the options
+    end up under the wrong question. checkpoint is a SectionCheckpoint.
+    """
+    stems = QuestionCollector(skip_noise=True)
+    answers = QuestionCollector(skip_noise=True, parse_options=False)
+    questions = QuestionCollector(profile)
+    if checkpoint is not None:
+        checkpoint.track(stems, answers, questions)
+    if question_range:
+        feed_pages(source, question_range[0], question_range[1], (), profile, pages, checkpoint, 0, (stems,))
+    if answer_range:
+        feed_pages(source, answer_range[0], answer_range[1], (questions,), profile, pages, checkpoint, 1, (answers,))
+    with profile.stage("join"):
+        rows = answer_table(stems.texts(), stems.options, answers.texts(), profile)
+    return questions.finish(), rows
+
+QUESTION_COLUMNS = ["Questions"]
+
+
+def save_questions(questions, path):
+    with open_sink(path, QUESTION_COLUMNS) as sink:
+        sink.write_many({"Questions": question} for question in questions)
+    log.info("📥 Saved %d questions to %s", len(questions), path)
+
+
+# Each pool worker keeps a single open document and reuses it for every range it is given
+_worker_source = None
+
+
+def _init_worker(pdf_path, engine, verbosity, memory_settings, columns):
+    global _worker_source
+    logging.basicConfig(level=verbosity, format="%(message)s")
+    _worker_source = open_text_source(pdf_path, engine, columns)
+    _worker_source.memory = MemoryGuard(*memory_settings)
+
+
+def _run_section(source, function, args, profile, pages, checkpoint):
+    """function(source, *args, ...); with checkpoint, (path, key, every, resume) of its SectionCheckpoint."""
+    if checkpoint is None:
+        return function(source, *args, profile=profile, pages=pages)
+    section_checkpoint = SectionCheckpoint(*checkpoint, profile=profile)
+    result = section_checkpoint.result()
+    if result is not None:
+        log.info("⏯️ Finished before, taken from %s", section_checkpoint.checkpoint.path)
+        return result
+    result = function(source, *args, profile=profile, pages=pages, checkpoint=section_checkpoint)
+    section_checkpoint.done(result)
+    return result
+
+
+def _run_in_worker(function, args, pages, profiling, checkpoint):
+    profile = make_profiler(profiling)
+    result = _run_section(_worker_source, function, args, profile, pages, checkpoint)
+    return result, profile.as_dict(), _worker_source.memory.take_samples()
+
+
+def section_checkpoint_path(output_path, roman_number):
+    return f"{checkpoint_path(output_path)}-{roman_number}"
+
+
+def _run_sections(pdf_path, jobs, workers, profile, pages, engine, memory=NULL_GUARD, columns=False, checkpoint=None):
+    """
+    Run function(source, *args, profile=..., pages=...) for each job
+    (roman_number, label, page_ranges, function, args) on one open document
+    and yield (roman_number, result) in job order. With workers > 1 the jobs
+    are spread over a process pool, most pages first, so one large section
+    doesn't end up last; each worker only gets the pages of its own ranges.
+    memory (a memory.MemoryGuard) is called after every page, in the workers
+    with the same settings, their samples are merged back into it.
+    columns reads two-column pages column by column, see page_text.
+    checkpoint is (output path, every, resume): each section is then
+    checkpointed to section_checkpoint_path() every `every` pages read, see
+    SectionCheckpoint, and with resume a section picks up where its last
+    checkpoint left off, or is taken as it is if it was finished.
+    """
+
+    def job_pages(page_ranges):
+        if pages is None:
+            return None
+        return {page for page in pages if any(start <= page < end for start, end in page_ranges)}
+
+    def job_checkpoint(roman_number, page_ranges, function, args):
+        if checkpoint is None:
+            return None
+        output_path, every, resume = checkpoint
+        job_page_list = sorted(job_pages(page_ranges)) if pages is not None else None
+        key = (digest, engine, columns, roman_number, function.__name__, args, job_page_list)
+        return section_checkpoint_path(output_path, roman_number), key, every, resume
+
+    digest = None
+    if checkpoint is not None:
+        with profile.stage("checkpoint"):
+            digest = file_digest(pdf_path)
+
+    if workers <= 1:
+        with profile.stage("open"):
+            source = open_text_source(pdf_path, engine, columns)
+        source.memory = memory
+        with source:
+            for roman_number, label, page_ranges, function, args in jobs:
+                log.info("Processing %s: %s", roman_number, label)
+                section_checkpoint = job_checkpoint(roman_number, page_ranges, function, args)
+                yield roman_number, _run_section(source, function, args, profile, pages, section_checkpoint)
+        return
+
+    def job_size(job):
+        return sum(end - start for start, end in job[2])
+
+    initargs = (pdf_path, engine, logging.getLogger().getEffectiveLevel(), memory.settings(), columns)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = {
+            roman_number: pool.submit(
+                _run_in_worker, function, args, job_pages(page_ranges), profile.enabled,
+                job_checkpoint(roman_number, page_ranges, function, args),
+            )
+            for roman_number, _, page_ranges, function, args in sorted(jobs, key=job_size, reverse=True)
+        }
+        for roman_number, label, *_ in jobs:
+            result, stats, page_rss = futures.pop(roman_number).result()
+            if stats is not None:
+                profile.merge(stats)
+            memory.merge(page_rss)
+            log.info("Finished %s: %s", roman_number, label)
+            yield roman_number, result
+
+
+def iter_sections(
+    pdf_path, sections, workers=1, page_offset=10, profile=NULL_PROFILER, pages=None, engine="pdfplumber", memory=NULL_GUARD,
+    columns=False, checkpoint=None,
+):
+    """
+    Extract the questions of several sections, e.g. {'IV': [130, 175]} with
+    printed page numbers and the default offset, or page_index ranges with
+    page_offset=0. pages optionally limits extraction to those page indexes,
+    engine picks the page_text backend, memory is a memory.MemoryGuard,
+    columns=True reads two-column pages column by column, checkpoint is
+    (output path, every, resume), see _run_sections().
+
+    Yields (roman_number, [questions]) in roman-numeral order, each section as
+    soon as it and all sections before it are done.
+    """
+    jobs = []
+    for roman_number in sorted(sections, key=roman_numerals.index):
+        start, end = sections[roman_number]
+        page_range = (start + page_offset, end + page_offset)
+        jobs.append((roman_number, sections[roman_number], [page_range], extract_questions_from_pdf, page_range))
+    return _run_sections(pdf_path, jobs, workers, profile, pages, engine, memory, columns, checkpoint)
+
+
+def iter_qa_sections(
+    pdf_path, parts, workers=1, profile=NULL_PROFILER, pages=None, engine="pdfplumber", memory=NULL_GUARD, columns=False,
+    checkpoint=None,
+):
+    """
+    Questions, options and answers of every section in one pass, from
+    page_index parts ({roman: {"questions": [start, end], "answers": [start, end]}}).
+    Yields (roman_number, [questions], [QA_COLUMNS rows]) in roman-numeral
+    order, see extract_qa_from_pdf().
+    """
+    jobs = []
+    for roman_number in sorted(parts, key=roman_numerals.index):
+        question_range, answer_range = parts[roman_number]["questions"], parts[roman_number]["answers"]
+        page_ranges = [page_range for page_range in (question_range, answer_range) if page_range]
+        jobs.append((roman_number, parts[roman_number], page_ranges, extract_qa_from_pdf, (question_range, answer_range)))
+    for roman_number, (questions, rows) in _run_sections(pdf_path, jobs, workers, profile, pages, engine, memory, columns, checkpoint):
+        yield roman_number, questions, rows
+
+
+def extract_questions(pdf_path, ranges=None, engine="pdfplumber", workers=1, page_offset=0, profile=NULL_PROFILER, columns=False):
+    """
+    Yield (roman_number, [questions]) for every section, see iter_sections().
+
+    ranges maps roman numerals to [start, end) page indexes (plus page_offset);
+    by default the answer ranges found by page_index are used, reading only
+    the pages that hold a question id.
+    """
+    pages = None
+    if ranges is None:
+        with profile.stage("index"):
+            index = load_page_index(pdf_path)
+        ranges, page_offset, pages = index.sections(), 0, index.question_pages()
+    return iter_sections(pdf_path, ranges, workers, page_offset, profile, pages, engine, columns=columns)
+
+
+def extract_sections(pdf_path, sections, workers=1, page_offset=10, pages=None, engine="pdfplumber", columns=False):
+    """Returns {roman_number: [questions]} in roman-numeral order, see iter_sections()."""
+    return dict(iter_sections(pdf_path, sections, workers, page_offset, pages=pages, engine=engine, columns=columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the Harrison self-assessment questions into Excel.")
+    parser.add_argument("pdf", nargs="?", default=r"C:\Users\kavya\Downloads\Harrison Self Assessment, 17th.pdf")
+    parser.add_argument("-o", "--output", default="final_questions.xlsx", help="combined output, .xlsx, .csv or .jsonl")
+    parser.add_argument("--workers", type=int, default=1, help="processes used for the section ranges (default: 1)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="pdfplumber", help="page text backend (default: %(default)s)")
+    parser.add_argument("--columns", action="store_true", help="read two-column pages column by column instead of line by line across both")
+    parser.add_argument("--sections", metavar="JSON", help='printed page ranges like {"I": [18, 47], ...} instead of the discovered ones')
+    parser.add_argument("--page-offset", type=int, default=10, help="PDF pages before printed page 1, used with --sections (default: 10)")
+    parser.add_argument("--reindex", action="store_true", help="rebuild the cached <pdf>.pageindex.json")
+    parser.add_argument("--qa", metavar="OUTPUT", help="also write one question/option/answer table (.xlsx, .csv or .jsonl), read in the same pass")
+    parser.add_argument("--index", metavar="FILE", help="add the questions to a full-text index (text_index.py), replacing this PDF's")
+    add_checkpoint_arguments(parser, "the questions read so far in each section")
+    add_memory_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    if args.qa and args.sections:
+        parser.error("--qa needs the question and answer parts found in the PDF, not --sections")
+    configure_logging(args.verbose, args.quiet)
+
+    profile = make_profiler(args.profile)
+    memory = guard_from_args(args)
+    if args.sections:
+        with open(args.sections, encoding="utf-8") as f:
+            sections = json.load(f)
+        page_offset, pages = args.page_offset, None
+    else:
+        # Answer parts of every section found in the PDF; pages without a question id are skipped
+        with profile.stage("index"):
+            index = load_page_index(args.pdf, args.reindex)
+        sections, page_offset, pages = index.sections(), 0, index.question_pages()
+        log.info("🔎 %d sections, %d of %d pages hold question ids", len(sections), len(pages), index.page_count)
+
+    checkpoint_every = checkpoint_every_from_args(args)
+    checkpoint = (args.output, checkpoint_every, args.resume) if checkpoint_every else None
+    if args.qa:
+        # Question parts are read too, so a section without answers only adds to the table
+        results = iter_qa_sections(args.pdf, index.parts, args.workers, profile, pages, args.engine, memory, args.columns, checkpoint)
+    else:
+        results = (
+            (roman_number, questions, None)
+            for roman_number, questions in iter_sections(
+                args.pdf, sections, args.workers, page_offset, profile, pages, args.engine, memory, args.columns, checkpoint
+            )
+        )
+
+    extension = os.path.splitext(args.output)[1]
+    index_update = IndexUpdate(args.index, book_name(args.pdf)) if args.index else None
+    with open_sink(args.output, QUESTION_COLUMNS) as combined, (open_sink(args.qa, QA_COLUMNS) if args.qa else nullcontext()) as qa_table:
+        # Each section goes to its own file and to the combined output as soon as it is done
+        try:
+            for roman_number, questions, rows in results:
+                if rows is not None:
+                    with profile.stage("write"):
+                        qa_table.write_many(rows)
+                    log.info("🧩 %s: %d question/option rows", roman_number, len(rows))
+                if roman_number not in sections:
+                    continue
+                with profile.stage("write"):
+                    save_questions(questions, f"questions_{roman_number}{extension}")
+                    combined.write_many({"Questions": question} for question in questions)
+                log.info("📊 Total questions for %s: %d", roman_number, len(questions))
+                if index_update is not None:
+                    index_update.add_questions(roman_number, questions)
+        except MemoryLimitExceeded as exc:
+            log.error("❌ %s", exc)
+            raise SystemExit(1)
+
+    if checkpoint is not None:
+        # One log per section, including sections only read for the QA table
+        for roman_number in index.parts if args.qa else sections:
+            Checkpoint(section_checkpoint_path(args.output, roman_number)).remove()
+    memory.log_peak()
+    log.info("📥 Saved %d questions to %s", combined.row_count, args.output)
+    if args.qa:
+        log.info("📥 Saved %d question/option rows to %s", qa_table.row_count, args.qa)
+    if index_update is not None:
+        with profile.stage("index"):
+            index_update.finish()
+    if args.profile:
+        profile.write(
+            args.profile, script="pandas_table", pdf=args.pdf, workers=args.workers, engine=args.engine,
+            columns=args.columns, memory=memory.report(),
+        )
+        log.info("⏱️ Profile written to: %s", args.profile)
 
-def save_to_excel(questions, excel_path):
-    df = pd.DataFrame(questions, columns=["Questions"])
-    df.to_excel(excel_path, index=False)
-    print(f"\n📥 Saved {len(questions)} questions to {excel_path}")
-    print(df.head())
 
 if __name__ == "__main__":
-    pdf_file = r"C:\Users\kavya\Downloads\Harrison Self Assessment, 17th.pdf"
-    dfs = {}
-    for roman_number, chapter in chap.items():
-        start_page, end_page = chapter
-        print(f"Processing {roman_number}: {chapter}")
-        excel_file = f"questions_{roman_number}.xlsx"
-        questions = extract_questions_columnwise(pdf_file, start_page + 10, end_page + 10)
-        df = pd.DataFrame(questions, columns=["Questions"])
-        dfs[roman_number] = df
-        save_to_excel(questions, excel_file)
-
-    for rn, df in dfs.items():
-        print(f"\n📊 DataFrame for {rn}:")
-        print(df.tail())
-        print(f"Total questions: {len(df)}")
-
-    # Concatenate all DataFrames (outside the loop!)
-    final_df = pd.concat(dfs.values(), ignore_index=True)
-    excel_file = "final_questions.xlsx"
-    save_to_excel(final_df, excel_file)
-    print(f"\n📥 Saved final questions to {excel_file}")
-
+    main()
@@ -1,13 +1,43 @@
-import fitz  # PyMuPDF
-import pandas as pd
+import argparse
+import logging
 import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from checkpoint import Checkpoint, add_checkpoint_arguments, checkpoint_every_from_args, checkpoint_path
+from ddx_tables import TABLE_COLUMNS, extract_matrices, table_rows
+from header_footer import HeaderFooterModel, page_lines, sample_pages
+from layout_profile import CHAPTER_MIN_SIZE, DEFAULT_LAYOUT, load_layout
+from memory import NULL_GUARD, MemoryGuard, MemoryLimitExceeded, add_memory_arguments, guard_from_args
+from page_images import IMAGE_COLUMNS, ImageStore, image_placements
+from page_manifest import PageManifest, document_fingerprints, manifest_path
+from page_probe import FULL, PageProbe
+from page_spans import SUBSUB_FONT_SIZE, TABLE_FONT_SIZE, PageSpans
+from profiling import NULL_PROFILER, add_logging_arguments, configure_logging, make_profiler
+from sinks import ListSink, ParquetSink, RowSink, open_sink
+from span_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, SpanCache, file_digest, page_packed
+from text_index import IndexUpdate, book_name
 
 PDF_FILE = "DDx Tabelle.pdf"
 OUTPUT_EXCEL = "structured_output_final_full_table.xlsx"
+OUTPUT_COLUMNS = ["Chapter", "SectionContent"]
+# One row per bullet; Page is 1-based, the bbox covers the bullet's lines on that page
+BULLET_COLUMNS = ["Chapter", "Section", "Subsection", "Page", "Bullet", "Text", "x0", "y0", "x1", "y1"]
+BULLET_TYPES = {
+    "Chapter": "dictionary", "Section": "dictionary", "Subsection": "dictionary",
+    "Page": "int32", "Bullet": "int32", "x0": "float32", "y0": "float32", "x1": "float32", "y1": "float32",
+}
 
 KNOWN_SECTIONS = ["Ursachen", "Untersuchungen", "Wichtige Hinweise", "Alarmsignale"]
 SUBSUB_HEADINGS = ["häufig", "gelegentlich", "selten"]
 
+log = logging.getLogger("pdf_extractor")
+
 def is_heading(text):
     text = text.strip()
     if text.startswith("•"):
@@ -26,18 +56,51 @@ def is_subsub(text_lines, spans):
         return False
     first_span = spans[0]
     return (
-        abs(first_span.get("size", 0) - 8.0) < 0.2 and
+        abs(first_span.get("size", 0) - SUBSUB_FONT_SIZE) < 0.2 and
         "Bold" in first_span.get("font", "")
     )
 
 def is_bullet(text):
     return text.strip().startswith("•")
 
+def group_bullets(lines):
+    """[(bullet text, [indexes of its lines])]: a "•" line starts a bullet, other non-blank lines continue it."""
+    bullets = []
+    current_bullet = ""
+    members = []
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("•"):
+            if current_bullet:
+                bullets.append((current_bullet.strip(), members))
+            current_bullet = stripped
+            members = [index]
+        elif stripped:
+            current_bullet += " " + stripped
+            members.append(index)
+    if current_bullet:
+        bullets.append((current_bullet.strip(), members))
+    return bullets
+
 def is_section(text):
     return text.strip() in KNOWN_SECTIONS
 
-def is_possible_chapter(text, font_size):
-    return is_heading(text) and font_size >= 12
+def is_possible_chapter(text, font_size, min_size=CHAPTER_MIN_SIZE):
+    return is_heading(text) and font_size >= min_size
+
+def heading_line_mask(page_spans, layout=DEFAULT_LAYOUT):
+    """
+    Per line of a PageSpans: True if it may be a chapter, section or subsub
+    heading (a line of a chapter-size block, or a known section or subsub
+    title). The header/footer model is kept away from these lines, so a
+    heading that keeps turning up at the top of a page is never taken for a
+    running header; only the regexes judge them.
+    """
+    chapter_size = np.repeat(page_spans.block_max_size() >= layout.chapter_min_size, page_spans.block_line_count)
+    return [
+        bool(chapter_size[index]) or line.strip() in KNOWN_SECTIONS or line.strip().lower() in SUBSUB_HEADINGS
+        for index, line in enumerate(page_spans.line_texts)
+    ]
 
 def is_noise_block(text_lines):
     joined = " ".join(text_lines).strip().lower()
@@ -64,21 +127,74 @@ def is_table_block(block):
             size = span.get("size", 0)
             total_spans += 1
 
-            if abs(size - 7.5) < 0.2 and text:
+            if abs(size - TABLE_FONT_SIZE) < 0.2 and text:
                 count_7_5 += 1
                 words_7_5.append(text)
 
     # Print all words that were size 7.5
     if words_7_5:
-        print(f"🟡 Page suspected table content (size 7.5): {words_7_5}")
+        log.debug("🟡 Page suspected table content (size 7.5): %s", words_7_5)
 
     # Only consider block as table if 7+ 7.5-sized words AND they make up most of the block
     is_table = count_7_5 >= 5 and (count_7_5 / max(total_spans, 1)) >= 0.6
 
-    print(f"📊 Block {block.get('number', '?')} | Font size 7.5 count: {count_7_5} | Total spans: {total_spans} | Is table: {is_table}")
+    log.debug("📊 Block %s | Font size 7.5 count: %d | Total spans: %d | Is table: %s", block.get("number", "?"), count_7_5, total_spans, is_table)
     return is_table
 
 
+_RUNNING_TITLE_RE = re.compile(r"^\d+ \d+ [\wÄÖÜäöüß\s\-]{3,}$")
+_DIGITS_ONLY_RE = re.compile(r"(\d\s*){1,5}")
+_PAGE_NUMBER_RE = re.compile(r"(flush\s*)?\d{1,3}", re.IGNORECASE)
+_NUMBERED_TITLE_RE = re.compile(r"^\d{1,3} [A-ZÄÖÜa-zäöüß\- ]{3,}$")
+# Every rule below needs a digit, a matrix word or a line shorter than 10 characters
+_HEADER_HINT_RE = re.compile(r"\d|ja|nein|eventuell", re.IGNORECASE)
+_CHAPTER_PAGE_DIGITS_RE = re.compile(r"(\s+\d\s*)*")
+
+
+def is_running_header_line(line):
+    """Chapter-independent part of the header/footer check for a single line."""
+    cleaned = " ".join(line.split())
+    if len(cleaned) >= 10 and not _HEADER_HINT_RE.search(cleaned):
+        return False
+
+    # Detect lines like "3 8 Allgemeinsymptome bei Erwachsenen"
+    if _RUNNING_TITLE_RE.match(cleaned):
+        return True
+
+    if _DIGITS_ONLY_RE.fullmatch(cleaned):
+        return True
+
+    if _PAGE_NUMBER_RE.fullmatch(cleaned):
+        return True
+
+    if _NUMBERED_TITLE_RE.match(cleaned):
+        return True
+
+    lower_words = cleaned.lower().split()
+    if lower_words:
+        matrix_terms = {"ja", "nein", "eventuell"}
+        matrix_count = sum(w in matrix_terms for w in lower_words)
+        if matrix_count >= len(lower_words) * 0.6 and len(lower_words) >= 3:
+            return True
+
+    if len(cleaned) < 10 and any(c.isdigit() for c in cleaned):
+        return True
+
+    return False
+
+
+def matches_current_chapter(line, current_chapter):
+    """Running chapter title repeated on a page, optionally followed by page digits."""
+    if not current_chapter:
+        return False
+    cleaned = " ".join(line.split())
+    current_chap_clean = " ".join(current_chapter.split())
+    if cleaned == current_chap_clean:
+        return True
+    # The title itself is compared as a prefix, only the page digits after it need a pattern
+    return cleaned.startswith(current_chap_clean) and _CHAPTER_PAGE_DIGITS_RE.fullmatch(cleaned, len(current_chap_clean)) is not None
+
+
 def is_header_or_footer(text_lines, page_num, current_chapter):
     if isinstance(text_lines, str):
         lines = [text_lines]
@@ -86,197 +202,1032 @@ def is_header_or_footer(text_lines, page_num, current_chapter):
         lines = text_lines
 
     for line in lines:
-        cleaned = re.sub(r"\s+", " ", line.strip())
-
-        # Detect lines like "3 8 Allgemeinsymptome bei Erwachsenen"
-        if re.match(r"^\d+ \d+ [\wÄÖÜäöüß\s\-]{3,}$", cleaned):
+        if is_running_header_line(line) or matches_current_chapter(line, current_chapter):
             return True
 
-        if re.fullmatch(r"(\d\s*){1,5}", cleaned):
-            return True
+    return False
 
-        if re.fullmatch(r"(flush\s*)?\d{1,3}", cleaned, flags=re.IGNORECASE):
-            return True
 
-        if current_chapter:
-            current_chap_clean = re.sub(r"\s+", " ", current_chapter).strip()
-            if cleaned == current_chap_clean:
-                return True
-            if re.fullmatch(rf"{re.escape(current_chap_clean)}(\s+\d\s*)*", cleaned):
-                return True
+def classify_spans(page_spans, header_footer=None, layout=DEFAULT_LAYOUT):
+    """
+    Page-local classification of every text block on a page.
 
-        if re.match(r"^\d{1,3} [A-ZÄÖÜa-zäöüß\- ]{3,}$", cleaned):
-            return True
+    Everything that does not depend on the chapter/section state is decided
+    here, so pages can be classified independently (and in parallel). The
+    chapter-dependent header check is left to SectionStitcher. Font-based
+    predicates come from PageSpans as one array per page. With a
+    header_footer.HeaderFooterModel, running lines are looked up by band and
+    text first and the regexes only see the lines it doesn't know; possible
+    headings (heading_line_mask()) only go to the regexes. The font sizes
+    come from a layout_profile.LayoutProfile.
+    """
+    max_font_sizes = page_spans.block_max_size()
+    small = page_spans.small_print_mask(layout.small_print_size)
+    line_small = page_spans.line_has_small_print(small)
+    block_small = page_spans.block_small_print_count(small)
+    starts_bold = page_spans.block_starts_bold(layout.subheading_size)
+    headings = heading_line_mask(page_spans, layout) if header_footer else None
 
-        lower_words = cleaned.lower().split()
-        if lower_words:
-            matrix_terms = {"ja", "nein", "eventuell"}
-            matrix_count = sum(w in matrix_terms for w in lower_words)
-            if matrix_count >= len(lower_words) * 0.6 and len(lower_words) >= 3:
-                return True
+    records = []
+    for block_index in range(len(page_spans)):
+        text_lines = page_spans.block_lines(block_index)
+        if not text_lines:
+            continue
 
-        if len(cleaned) < 10 and any(c.isdigit() for c in cleaned):
-            return True
+        first_line = page_spans.block_line_start[block_index]
+        boxes = page_spans.line_bbox[first_line:first_line + len(text_lines)].tolist()
+        if header_footer:
+            keep = [
+                not ((not heading and header_footer.is_running(line, box[1], box[3])) or is_running_header_line(line))
+                for line, box, heading in zip(text_lines, boxes, headings[first_line:first_line + len(text_lines)])
+            ]
+        else:
+            keep = [not is_running_header_line(line) for line in text_lines]
+        candidate_lines = [line for line, kept in zip(text_lines, keep) if kept]
+        full_text = "\n".join(candidate_lines).strip()
+        if not full_text:
+            # Nothing survives the header filter, whatever the current chapter is;
+            # kept only so the stitch pass can count the dropped lines
+            records.append({"block_index": block_index, "text_lines": text_lines, "keep": keep, "full_text": "", "line_bbox": boxes})
+            continue
 
-    return False
+        if block_small[block_index]:
+            # A line holding a 7.5pt span trivially contains its text; only the others need a substring check
+            start = page_spans.block_span_start[block_index]
+            stop = start + page_spans.block_span_count[block_index]
+            small_print = {page_spans.span_text(i).strip() for i in start + np.flatnonzero(small[start:stop])}
+            first_line = page_spans.block_line_start[block_index]
+            has_7_5_size = [
+                bool(line_small[first_line + offset]) or any(text in line for text in small_print)
+                for offset, line in enumerate(text_lines)
+            ]
+        else:
+            has_7_5_size = [False] * len(text_lines)
 
+        max_font_size = float(max_font_sizes[block_index])
+        chapter_size = max_font_size >= layout.chapter_min_size
+        records.append({
+            "block_index": block_index,
+            "text_lines": text_lines,
+            "keep": keep,
+            "full_text": full_text,
+            "max_font_size": max_font_size,
+            "chapter_size": chapter_size,
+            "is_chapter": chapter_size and is_heading(full_text) and full_text not in KNOWN_SECTIONS + SUBSUB_HEADINGS,
+            "is_noise": is_noise_block(text_lines),
+            "is_header": not all(keep),
+            "is_section": is_section(full_text),
+            "is_subsub": bool(starts_bold[block_index]) and text_lines[0].strip().lower() in SUBSUB_HEADINGS,
+            "has_7_5_size": has_7_5_size,
+            "line_bbox": boxes,
+        })
+    return records
 
-def flush(chapter, section, subsection, buffer, page_num, final=False):
-    if not buffer.strip() or not section:
-        return
 
-    global current_buffer_data
-    lines = buffer.splitlines()
-    bullet_lines = []
-    current_bullet = ""
+def classify_blocks(blocks):
+    return classify_spans(PageSpans.from_blocks(blocks))
 
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("•"):
-            if current_bullet:
-                bullet_lines.append(current_bullet.strip())
-            current_bullet = stripped
+
+def classify_page(page):
+    return classify_blocks(page.get_text("dict")["blocks"])
+
+
+STITCH_COUNTERS = (
+    "chapters", "sections", "subsections", "noise_blocks", "header_footer_lines",
+    "header_footer_blocks", "skipped_7_5_lines", "content_lines", "rows", "tables", "bullets", "images",
+)
+
+
+class SectionStitcher:
+    """
+    Sequential chapter/section/subsection state machine.
+
+    Replays classified pages in order and writes one row per finished section
+    to the sink as soon as the section is closed. The cells of reconstructed
+    decision matrices go to table_sink, tagged with the chapter and section
+    they appear in. bullet_sink gets one BULLET_COLUMNS row per bullet of
+    every finished section, with the page and bbox of its lines. Image
+    records go to image_store (a page_images.ImageStore), which writes each
+    image once; every placement becomes an IMAGE_COLUMNS row in image_sink,
+    and the rows of sections that show images get an "Images" column with
+    their references.
+    """
+
+    def __init__(self, sink=None, profile=NULL_PROFILER, table_sink=None, bullet_sink=None, image_store=None, image_sink=None):
+        self.sink = sink if sink is not None else ListSink(OUTPUT_COLUMNS)
+        self.table_sink = table_sink
+        self.bullet_sink = bullet_sink
+        self.image_store = image_store
+        self.image_sink = image_sink
+        self.profile = profile
+        for name in STITCH_COUNTERS:
+            profile.count(name, 0)
+        self.current_chapter = None
+        self.current_section = None
+        self.current_subsection = None
+        self.current_buffer_data = None
+        self.buffer = ""
+        # (text, page_num, bbox) of every line added to buffer
+        self.buffer_lines = []
+        # References of the images placed in the open section, in order
+        self.section_images = []
+        self.page_num = 0
+
+    def snapshot(self):
+        """Everything the next page's stitching depends on, as plain tuples."""
+        buffer_data = self.current_buffer_data
+        if buffer_data is not None:
+            buffer_data = (buffer_data["Chapter"], tuple(buffer_data["SectionContent"]))
+        return (
+            self.current_chapter, self.current_section, self.current_subsection, self.buffer, buffer_data,
+            tuple(self.buffer_lines), tuple(self.section_images),
+        )
+
+    def restore(self, state, page_num):
+        self.current_chapter, self.current_section, self.current_subsection, self.buffer, buffer_data, buffer_lines, section_images = state
+        self.buffer_lines = list(buffer_lines)
+        self.section_images = list(section_images)
+        if buffer_data is not None:
+            buffer_data = {"Chapter": buffer_data[0], "SectionContent": list(buffer_data[1])}
+        self.current_buffer_data = buffer_data
+        self.page_num = page_num
+
+    def collecting(self):
+        """True while content blocks would be added to a section."""
+        return bool(self.current_section or self.current_subsection)
+
+    def flush(self, page_num, final=False):
+        chapter, section, subsection, buffer = self.current_chapter, self.current_section, self.current_subsection, self.buffer
+        if not buffer.strip() or not section:
+            return
+
+        with self.profile.stage("flush"):
+            self._append_bullets(page_num)
+
+        if final:
+            self.emit(self.current_buffer_data)
+            log.debug("✅ Flushed FINAL: %s | %s%s", chapter, section, f" | {subsection}" if subsection else "")
+            self.current_buffer_data = None
+
+    def _append_bullets(self, page_num):
+        section, subsection, buffer = self.current_section, self.current_subsection, self.buffer
+        bullet_lines = [text for text, _ in group_bullets(buffer.splitlines())]
+        if self.bullet_sink is not None:
+            self._write_bullets()
+
+        page_tag = f"\n(Page {page_num + 1})"
+        bullet_text = "\n".join(bullet_lines) + page_tag if bullet_lines else buffer.strip() + page_tag
+
+        if self.current_buffer_data is None:
+            label = f"From Section: {section}"
+            if subsection:
+                label += f"\nSubsection: {subsection}"
+            self.current_buffer_data = {
+                "Chapter": self.current_chapter,
+                "SectionContent": [label, bullet_text]
+            }
         else:
-            if stripped:
-                current_bullet += " " + stripped
+            self.current_buffer_data["SectionContent"].append(bullet_text)
 
+    def _write_bullets(self):
+        """BULLET_COLUMNS rows for the buffered lines, numbered from 1 within the section."""
+        lines = self.buffer_lines
+        rows = []
+        for text, members in group_bullets([line[0] for line in lines]):
+            page_num = lines[members[0]][1]
+            boxes = [lines[index][2] for index in members if lines[index][1] == page_num]
+            rows.append({
+                "Chapter": self.current_chapter,
+                "Section": self.current_section,
+                "Subsection": self.current_subsection,
+                "Page": page_num + 1,
+                "Bullet": len(rows) + 1,
+                "Text": text,
+                "x0": min(box[0] for box in boxes),
+                "y0": min(box[1] for box in boxes),
+                "x1": max(box[2] for box in boxes),
+                "y1": max(box[3] for box in boxes),
+            })
+        with self.profile.stage("write"):
+            self.bullet_sink.write_many(rows)
+        self.profile.count("bullets", len(rows))
 
-    if current_bullet:
-        bullet_lines.append(current_bullet.strip())
-
-    page_tag = f"\n(Page {page_num + 1})"
-    bullet_text = "\n".join(bullet_lines) + page_tag if bullet_lines else buffer.strip() + page_tag
-
-    if current_buffer_data is None:
-        label = f"From Section: {section}"
-        if subsection:
-            label += f"\nSubsection: {subsection}"
-        content = f"{label}\n{bullet_text}"
-        current_buffer_data = {
-            "Chapter": chapter,
-            "SectionContent": content
+    def close_section(self, page_num):
+        self.flush(page_num, final=True)
+        if self.current_buffer_data:
+            self.emit(self.current_buffer_data)
+            self.current_buffer_data = None
+
+    def emit(self, buffer_data):
+        row = {
+            "Chapter": buffer_data["Chapter"],
+            "SectionContent": "\n".join(buffer_data["SectionContent"]),
         }
+        if self.image_store is not None:
+            row["Images"] = "\n".join(self.section_images)
+            self.section_images = []
+        with self.profile.stage("write"):
+            self.sink.write(row)
+        self.profile.count("rows")
+
+    def place_image(self, page_num, xref, name, bbox):
+        ref = self.image_store.add(xref, name) if self.image_store is not None else name
+        self.profile.count("images")
+        if self.image_sink is not None:
+            with self.profile.stage("write"):
+                self.image_sink.write({
+                    "Chapter": self.current_chapter,
+                    "Section": self.current_section,
+                    "Subsection": self.current_subsection,
+                    "Page": page_num + 1,
+                    "Image": ref,
+                    "x0": bbox[0], "y0": bbox[1], "x1": bbox[2], "y1": bbox[3],
+                })
+        if (self.current_section or self.current_subsection) and ref not in self.section_images:
+            self.section_images.append(ref)
+
+    def feed_page(self, page_num, records):
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug("\n=== Processing Page %d ===", page_num)
+        self.page_num = page_num
+        profile = self.profile
+        table_number = 0
+
+        for record in records:
+            if "table" in record:
+                table_number += 1
+                profile.count("tables")
+                if self.table_sink is not None:
+                    with profile.stage("write"):
+                        self.table_sink.write_many(
+                            table_rows(record["table"], self.current_chapter, self.current_section, page_num, table_number)
+                        )
+                continue
+            if "image" in record:
+                self.place_image(page_num, *record["image"])
+                continue
+
+            text_lines = record["text_lines"]
+            filtered_lines = []
+            filtered_boxes = []
+            chapter_lines = 0
+            for line, kept, box in zip(text_lines, record["keep"], record["line_bbox"]):
+                if not kept:
+                    continue
+                if matches_current_chapter(line, self.current_chapter):
+                    chapter_lines += 1
+                    continue
+                filtered_lines.append(line)
+                filtered_boxes.append(box)
+            profile.count("header_footer_lines", len(text_lines) - len(filtered_lines))
+            if not filtered_lines or not record["full_text"]:
+                continue
+
+            if chapter_lines:
+                # The running chapter title was dropped: re-derive the text-based tags
+                full_text = "\n".join(filtered_lines).strip()
+                if not full_text:
+                    continue
+                is_chapter = record["chapter_size"] and is_heading(full_text) and full_text not in KNOWN_SECTIONS + SUBSUB_HEADINGS
+                is_section_text = is_section(full_text)
+            else:
+                full_text = record["full_text"]
+                is_chapter = record["is_chapter"]
+                is_section_text = record["is_section"]
+
+            # ➤ Detect new chapter
+            if is_chapter:
+                if self.current_chapter != full_text:
+                    self.close_section(page_num)
+                    log.info("📘 New chapter detected: %s (page %d)", full_text, page_num)
+                    profile.count("chapters")
+                    self.current_chapter = full_text
+                    self.current_section = None
+                    self.current_subsection = None
+                    self.buffer = ""
+                    self.buffer_lines = []
+                    self.section_images = []
+                continue
+
+            # ➤ Skip noise or repeated headers
+            if record["is_noise"]:
+                profile.count("noise_blocks")
+                continue
+            # A kept line repeating the chapter title was counted in chapter_lines, a dropped one set is_header
+            if record["is_header"] or chapter_lines:
+                profile.count("header_footer_blocks")
+                continue
+
+            # ➤ Detect new section
+            if is_section_text:
+                if self.current_section != full_text:  # Only flush if it's a real new section
+                    self.close_section(page_num)
+                    log.debug("--- Section detected: %s", full_text)
+                    profile.count("sections")
+                    self.current_section = full_text
+                    self.current_subsection = None
+                    self.buffer = ""
+                    self.buffer_lines = []
+                    self.section_images = []
+                continue
+
+            # ➤ Detect sub-subsection
+            if record["is_subsub"]:
+                if self.current_subsection != text_lines[0].strip():  # Only flush on real change
+                    self.close_section(page_num)
+                    self.current_subsection = text_lines[0].strip()
+                    log.debug("--- Sub-subsection detected: %s", self.current_subsection)
+                    profile.count("subsections")
+                    self.buffer = ""
+                    self.buffer_lines = []
+                    self.section_images = []
+                    for line, box in zip(text_lines[1:], record["line_bbox"][1:]):
+                        self.buffer += line + "\n"
+                        self.buffer_lines.append((line, page_num, tuple(box)))
+                continue
+
+            # ➤ Accumulate content if under section/subsection
+            if self.current_section or self.current_subsection:
+                if debug:
+                    log.debug("[Block %d] Adding content under Section: '%s', Subsection: '%s'", record["block_index"], self.current_section, self.current_subsection)
+                small_print = dict(zip(text_lines, record["has_7_5_size"]))
+                for line, box in zip(filtered_lines, filtered_boxes):
+
+                    is_bullet_line = is_bullet(line)
+                    has_7_5_size = small_print[line]
+                    if debug:
+                        log.debug("  Line: %s | Bullet: %s | Font size 7.5: %s", line, is_bullet_line, has_7_5_size)
+                    SPECIAL_WORDS = {"häufig", "gelegentlich", "selten", "wichtige hinweise", "alarmsignale", "untersuchungen", "ursachen"}
+                    if not is_bullet_line and has_7_5_size:
+                        lower_line = line.lower().strip()
+                        if not any(word in lower_line for word in SPECIAL_WORDS):
+                            if debug:
+                                log.debug("⚠️ Skipping non-bullet line with font size 7.5 (no special keywords): %s", line)
+                            profile.count("skipped_7_5_lines")
+                            continue
+                    profile.count("content_lines")
+                    if is_bullet_line:
+                        self.buffer += line + "\n"
+                    else:
+                        self.buffer += line + "\n\n"
+                    self.buffer_lines.append((line, page_num, tuple(box)))
+
+    def finish(self):
+        # ❗️Only flush once, after loop ends — to save final accumulated content
+        self.close_section(self.page_num)
+        return self.sink
+
+
+# Process-pool workers keep one open document (and span cache) each
+_worker_doc = None
+_worker_cache = None
+_worker_header_footer = None
+_worker_tables = True
+_worker_memory = NULL_GUARD
+_worker_layout = DEFAULT_LAYOUT
+_worker_probe = None
+_worker_images = False
+
+
+def _init_worker(pdf_path, cache, header_footer, tables, memory_settings, layout, probe, images):
+    global _worker_doc, _worker_cache, _worker_header_footer, _worker_tables, _worker_memory, _worker_layout, _worker_probe
+    global _worker_images
+    _worker_layout = layout
+    _worker_probe = probe
+    _worker_images = images
+    _worker_doc = fitz.open(pdf_path)
+    _worker_cache = cache
+    _worker_header_footer = header_footer
+    _worker_tables = tables
+    _worker_memory = MemoryGuard(*memory_settings)
+
+
+def build_header_footer(doc, cache=None, prefetched=None, text_only=False, layout=DEFAULT_LAYOUT):
+    """
+    HeaderFooterModel from an even sample of the document's pages, leaving
+    out the lines that may be headings (heading_line_mask()). The sampled
+    pages' packed spans are put into prefetched (a dict) if given, so the
+    classification pass doesn't extract them again.
+    """
+    pages = []
+    for page_num in sample_pages(doc.page_count):
+        packed = page_packed(doc, page_num, cache, text_only)
+        if prefetched is not None:
+            prefetched[page_num] = packed
+        page_spans = PageSpans(*packed)
+        lines = [line for line, heading in zip(page_lines(page_spans), heading_line_mask(page_spans, layout)) if not heading]
+        pages.append((doc.load_page(page_num).rect.height, lines))
+    return HeaderFooterModel.build(pages)
+
+
+def with_tables(records, tables):
+    """Block records plus one {"block_index", "table"} record per matrix, after the block it starts in."""
+    if not tables:
+        return records
+    table_records = [{"block_index": table["block_index"], "table": table} for table in tables]
+    return sorted(records + table_records, key=lambda record: (record["block_index"], "table" in record))
+
+
+def with_images(records, placements):
+    """
+    Records plus one {"image": (xref, file name, bbox)} record per placement,
+    before the first text block that starts below the image's top.
+    """
+    if not placements:
+        return records
+    pending = deque(sorted(placements, key=lambda placement: placement[2][1]))
+    merged = []
+    for record in records:
+        boxes = record.get("line_bbox")
+        if boxes:
+            top = min(box[1] for box in boxes)
+            while pending and pending[0][2][1] < top:
+                merged.append({"image": pending.popleft()})
+        merged.append(record)
+    merged += [{"image": placement} for placement in pending]
+    return merged
+
+
+def _image_records(doc, page_num, images):
+    """The records of a page the probe skipped: its images, if they are wanted."""
+    return with_images([], image_placements(doc.load_page(page_num))) if images else []
+
+
+def _read_and_classify(
+    doc, page_num, cache, header_footer=None, packed=None, tables=True, text_only=False, layout=DEFAULT_LAYOUT, images=False,
+):
+    """(records, get_text seconds, classify seconds, tables seconds) for one page; get_text includes finding its images."""
+    start = time.perf_counter()
+    if packed is None:
+        packed = page_packed(doc, page_num, cache, text_only)
+    placements = image_placements(doc.load_page(page_num)) if images else ()
+    loaded = time.perf_counter()
+    page_spans = PageSpans(*packed)
+    records = classify_spans(page_spans, header_footer, layout)
+    classified = time.perf_counter()
+    if tables:
+        records = with_tables(records, extract_matrices(page_spans, layout.small_print_size))
+    return with_images(records, placements), loaded - start, classified - loaded, time.perf_counter() - classified
+
+
+def _probe_page(probe, doc, page_num):
+    """(verdict, seconds) of a page_probe.PageProbe, FULL without one."""
+    if probe is None:
+        return FULL, 0.0
+    start = time.perf_counter()
+    verdict = probe.check(doc, page_num)
+    return verdict, time.perf_counter() - start
+
+
+def _book_page(profile, probe, page_num, verdict, probe_seconds, result):
+    """
+    Add one page's timings to the profile and the probe. result is
+    _read_and_classify()'s, or just the records of a page the probe skipped.
+    Returns the records.
+    """
+    profile.add_pages()
+    if verdict != FULL:
+        result = (result, 0.0, 0.0, 0.0)
+    records, get_text_seconds, classify_seconds, tables_seconds = result
+    profile.add_time("get_text", get_text_seconds)
+    profile.add_time("classify", classify_seconds)
+    profile.add_time("tables", tables_seconds)
+    if probe is not None:
+        probe.record(page_num, verdict, probe_seconds, get_text_seconds + classify_seconds + tables_seconds)
+        profile.add_time("probe", probe_seconds)
+        profile.count(f"pages_probe_{verdict}")
+    return records
+
+
+def _classify_page_at(page_num):
+    verdict, probe_seconds = _probe_page(_worker_probe, _worker_doc, page_num)
+    if verdict == FULL:
+        result = _read_and_classify(
+            _worker_doc, page_num, _worker_cache, _worker_header_footer, tables=_worker_tables,
+            text_only=_worker_memory.low_memory, layout=_worker_layout, images=_worker_images,
+        )
     else:
-        current_buffer_data["SectionContent"] += f"\n{bullet_text}"
+        result = _image_records(_worker_doc, page_num, _worker_images)
+    return verdict, probe_seconds, result, _worker_memory.page_done(page_num)
 
-    if final:
-        data_rows.append(current_buffer_data)
-        print(f"✅ Flushed FINAL: {chapter} | {section}" + (f" | {subsection}" if subsection else ""))
-        current_buffer_data = None
 
-# State
-doc = fitz.open(PDF_FILE)
-data_rows = []
+def _bounded_map(pool, function, items, in_flight):
+    """pool.map() that never has more than in_flight calls submitted ahead of the consumer."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(function, item))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
-current_chapter = None
-current_section = None
-current_subsection = None
-current_buffer_data = None
-buffer = ""
 
-# Main loop
-for page_num,page in enumerate(doc):
-    print(f"\n=== Processing Page {page_num} ===")
-    page = doc.load_page(page_num)
-    blocks = page.get_text("dict")["blocks"]
+def iter_page_records(
+    pdf_path, workers=1, cache=None, profile=NULL_PROFILER, page_numbers=None, header_footer=True, tables=True, memory=NULL_GUARD,
+    layout=None, probe=None, images=False,
+):
+    """
+    Yield (page_num, records) in page order, classifying pages in a process
+    pool if workers > 1. page_numbers limits the run to those pages.
+    header_footer is a HeaderFooterModel, True to build one from this
+    document first, or False for the regex header checks only. tables=False
+    skips the decision matrix stage. memory is a memory.MemoryGuard; in its
+    low-memory mode images aren't extracted, the header/footer sample isn't
+    kept for reuse and the pool works on a few pages at a time. layout is a
+    layout_profile.LayoutProfile, by default the one saved next to the PDF.
+    probe is a page_probe.PageProbe; pages it rules out yield [] without
+    being extracted. The pool workers get a copy without the stitcher
+    callback, so there only pages without text are skipped. images=True
+    adds a record per image placement (page_images.image_placements()),
+    skipped pages included.
+    """
+    if layout is None:
+        layout = load_layout(pdf_path)
+    text_only = memory.low_memory
+    prefetched = None if memory.low_memory else {}
+    if workers <= 1:
+        with profile.stage("open"):
+            doc = fitz.open(pdf_path)
+        if header_footer is True:
+            with profile.stage("header_footer"):
+                header_footer = build_header_footer(doc, cache, prefetched, text_only, layout)
+        for page_num in range(doc.page_count) if page_numbers is None else page_numbers:
+            packed = prefetched.pop(page_num, None) if prefetched else None
+            # A page from the header/footer sample is already extracted
+            verdict, probe_seconds = _probe_page(probe if packed is None else None, doc, page_num)
+            if verdict == FULL:
+                result = _read_and_classify(doc, page_num, cache, header_footer, packed, tables, text_only, layout, images)
+            else:
+                result = _image_records(doc, page_num, images)
+            records = _book_page(profile, probe, page_num, verdict, probe_seconds, result)
+            memory.page_done(page_num)
+            yield page_num, records
+        doc.close()
+        return
 
-    for block_index, block in enumerate(blocks):
-        text_lines = []
-        max_font_size = 0
+    with profile.stage("open"):
+        doc = fitz.open(pdf_path)
+        page_numbers = list(range(doc.page_count) if page_numbers is None else page_numbers)
+    if header_footer is True:
+        with profile.stage("header_footer"):
+            header_footer = build_header_footer(doc, cache, text_only=text_only, layout=layout)
+    doc.close()
+    if cache is not None:
+        # Hash once here; the workers get the digest along with their copy of the cache
+        cache.digest(pdf_path)
+    initargs = (pdf_path, cache, header_footer, tables, memory.settings(), layout, probe.stateless() if probe is not None else None, images)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        in_flight = memory.in_flight(workers)
+        if in_flight:
+            results = _bounded_map(pool, _classify_page_at, page_numbers, in_flight)
+        else:
+            results = pool.map(_classify_page_at, page_numbers, chunksize=max(1, len(page_numbers) // (workers * 4)))
+        for page_num, (verdict, probe_seconds, result, rss) in zip(page_numbers, results):
+            records = _book_page(profile, probe, page_num, verdict, probe_seconds, result)
+            memory.record(page_num, rss)
+            yield page_num, records
 
 
-        for line in block.get("lines", []):
-            line_text = " ".join([span["text"] for span in line["spans"]]).strip()
-            text_lines.append(line_text)
-            max_font_size = max(max_font_size, *(span["size"] for span in line["spans"]))
+def open_bullet_sink(directory, pdf_path):
+    """
+    The Parquet file for pdf_path's bullets in the dataset at directory,
+    partitioned by document (the PDF's file name without extension).
+    """
+    document = book_name(pdf_path)
+    return ParquetSink(directory, BULLET_COLUMNS, BULLET_TYPES, {"document": document})
 
-        filtered_lines = [line for line in text_lines if not is_header_or_footer(line, page_num, current_chapter)]
-        if not filtered_lines:
-            continue
 
-        full_text = "\n".join(filtered_lines).strip()
-        if not full_text:
-            continue
+def section_probe(layout, tables=True, stitcher=None):
+    """PageProbe for DDx pages; with a stitcher it also skips text pages while no section is open."""
+    return PageProbe(KNOWN_SECTIONS, SUBSUB_HEADINGS, layout.chapter_min_size, tables, stitcher.collecting if stitcher else None)
 
-        # ➤ Detect new chapter
-        if is_possible_chapter(full_text, max_font_size) and full_text not in KNOWN_SECTIONS + SUBSUB_HEADINGS:
-            if current_chapter != full_text:
-                flush(current_chapter, current_section, current_subsection, buffer, page_num, final=True)
-                if current_buffer_data:
-                    data_rows.append(current_buffer_data)
-                    current_buffer_data = None
-                print(f"📘 New chapter detected: {full_text} (page {page_num})")
-                current_chapter = full_text
-                current_section = None
-                current_subsection = None
-                buffer = ""
-            continue
 
-        # ➤ Skip noise or repeated headers
-        if is_noise_block(text_lines) or is_header_or_footer(text_lines, page_num, current_chapter):
-            continue
-        
-       
-        # ➤ Detect new section
-        if is_section(full_text):
-            if current_section != full_text:  # Only flush if it's a real new section
-                flush(current_chapter, current_section, current_subsection, buffer, page_num, final=True)
-                if current_buffer_data:
-                    data_rows.append(current_buffer_data)
-                    current_buffer_data = None
-                print(f"--- Section detected: {full_text}")
-                current_section = full_text
-                current_subsection = None
-                buffer = ""
-            continue
+def calibrate_probe(pdf_path, probe, cache=None, tables=True, layout=DEFAULT_LAYOUT):
+    """Extract a sample of the pages the probe skipped, so its report can estimate the time saved."""
+    with fitz.open(pdf_path) as doc:
+        for verdict, page_nums in probe.sample().items():
+            seconds = []
+            for page_num in page_nums:
+                _, *timings = _read_and_classify(doc, page_num, cache, tables=tables, layout=layout)
+                seconds.append(sum(timings))
+            probe.calibrate(verdict, seconds)
+
+
+def log_probe(probe, wall_seconds=None):
+    report = probe.report(wall_seconds)
+    log.info(
+        "⚡ Page probe: %d of %d pages skipped get_text(\"dict\") (%d without text, %d outside any section), %.2fs probing",
+        report["empty"] + report["plain"], report["pages"], report["empty"], report["plain"], report["probe_seconds"],
+    )
+    if "overall_speedup" in report:
+        log.info(
+            "⚡ Skipped pages would have taken ~%.2fs: page extraction ~%.2fx, whole run ~%.2fx faster",
+            report["estimated_seconds_avoided"], report["extraction_speedup"] or 1.0, report["overall_speedup"],
+        )
+    return report
+
+
+def _checkpoint_key(pdf_path, sinks, image_store, header_footer, layout):
+    """What a checkpoint's rows and state depend on: the PDF and the options that change the output."""
+    return (
+        file_digest(pdf_path),
+        tuple(tuple(sink.columns) if sink is not None else None for sink in sinks),
+        image_store.directory if image_store is not None else None,
+        header_footer if isinstance(header_footer, bool) else header_footer.as_tuple(),
+        layout.thresholds(),
+    )
+
 
-        # ➤ Detect sub-subsection
-        spans = block["lines"][0]["spans"] if block.get("lines") and block["lines"][0].get("spans") else []
-        if is_subsub(text_lines, spans):
-            if current_subsection != text_lines[0].strip():  # Only flush on real change
-                flush(current_chapter, current_section, current_subsection, buffer, page_num, final=True)
-                if current_buffer_data:
-                    data_rows.append(current_buffer_data)
-                    current_buffer_data = None
-                current_subsection = text_lines[0].strip()
-                print(f"--- Sub-subsection detected: {current_subsection}")
-                buffer = ""
-                for line in text_lines[1:]:
-                    buffer += line + "\n"
+def _save_checkpoint(checkpoint, stitcher, recorders, image_store, page_num, saved_refs):
+    """
+    Append the stitch state after page_num and the rows emitted since the
+    last checkpoint, plus the image refs past the first saved_refs; returns
+    the number of refs saved so far.
+    """
+    chunk = {
+        "page": page_num,
+        "state": stitcher.snapshot(),
+        "rows": [recorder.rows if recorder is not None else [] for recorder in recorders],
+    }
+    if image_store is not None:
+        chunk["image_refs"] = list(image_store.refs.items())[saved_refs:]
+        chunk["placements"] = image_store.placements
+        saved_refs = len(image_store.refs)
+    checkpoint.save(chunk)
+    for recorder in recorders:
+        if recorder is not None:
+            recorder.rows = []
+    return saved_refs
+
+
+def _resume_from(chunks, stitcher, sinks, image_store):
+    """Write the checkpointed rows to sinks again and restore the stitcher; returns the last page done."""
+    for chunk in chunks:
+        for sink, rows in zip(sinks, chunk["rows"]):
+            if sink is not None:
+                sink.write_many(rows)
+        if image_store is not None:
+            image_store.resume(chunk["image_refs"], chunk["placements"])
+    page_num = chunks[-1]["page"]
+    stitcher.restore(chunks[-1]["state"], page_num)
+    return page_num
+
+
+def extract_to_sink(
+    pdf_path, sink, workers=1, cache=None, profile=NULL_PROFILER, table_sink=None, header_footer=True, memory=NULL_GUARD, layout=None,
+    bullet_sink=None, probe=True, image_store=None, image_sink=None, checkpoint=None, resume=False,
+):
+    """
+    Classify and stitch every page into sink. With probe, pages that can't
+    change the output (see page_probe.py) are not extracted at all; when
+    profiling, a sample of them is extracted after the run to estimate the
+    speedup, which goes to the log and the profile's "probe" counters. With
+    image_store or image_sink the pages' images are placed too, see
+    SectionStitcher; sink then needs an "Images" column.
+
+    checkpoint (a checkpoint.Checkpoint) gets the stitch state and the rows
+    emitted so far every checkpoint.every pages. With resume, the rows of
+    the last run's checkpoints are written to the sinks again and the run
+    carries on after the last page they cover, so the output is the same as
+    an uninterrupted run's; the probe and profile counters only cover the
+    pages done this time. The caller removes the checkpoint once the sinks
+    are closed.
+    """
+    if layout is None:
+        layout = load_layout(pdf_path)
+    page_numbers = None
+    if checkpoint is None:
+        stitcher = SectionStitcher(sink, profile, table_sink, bullet_sink, image_store, image_sink)
+    else:
+        sinks = (sink, table_sink, bullet_sink, image_sink)
+        recorders = [_RowRecorder(target) if target is not None else None for target in sinks]
+        stitcher = SectionStitcher(recorders[0], profile, *recorders[1:3], image_store, recorders[3])
+        saved_refs = 0
+        with profile.stage("checkpoint"):
+            chunks = checkpoint.start(_checkpoint_key(pdf_path, sinks, image_store, header_footer, layout), resume)
+            if chunks:
+                last_page = _resume_from(chunks, stitcher, sinks, image_store)
+                saved_refs = len(image_store.refs) if image_store is not None else 0
+                with fitz.open(pdf_path) as doc:
+                    page_numbers = range(last_page + 1, doc.page_count)
+                log.info("⏯️ Resuming after page %d from %s", last_page + 1, checkpoint.path)
+    page_probe = section_probe(layout, table_sink is not None, stitcher) if probe else None
+    records_by_page = iter_page_records(
+        pdf_path, workers, cache, profile, page_numbers, header_footer, tables=table_sink is not None, memory=memory, layout=layout,
+        probe=page_probe, images=image_store is not None or image_sink is not None,
+    )
+    for page_num, records in records_by_page:
+        stitcher.feed_page(page_num, records)
+        if checkpoint is not None and checkpoint.tick():
+            with profile.stage("checkpoint"):
+                saved_refs = _save_checkpoint(checkpoint, stitcher, recorders, image_store, page_num, saved_refs)
+    stitcher.finish()
+    if checkpoint is not None:
+        checkpoint.close()
+        profile.count("checkpoints", checkpoint.saved)
+    if page_probe is not None:
+        wall_seconds = None
+        if profile.enabled and page_probe.skipped():
+            wall_seconds = time.perf_counter() - profile.started
+            with profile.stage("probe_calibration"):
+                calibrate_probe(pdf_path, page_probe, cache, table_sink is not None, layout)
+        report = log_probe(page_probe, wall_seconds)
+        for name in ("estimated_seconds_avoided", "extraction_speedup", "overall_speedup"):
+            if name in report:
+                profile.count(f"probe_{name}", report[name])
+    return sink
+
+
+class _RowRecorder(RowSink):
+    """Passes rows on to a sink and remembers the ones emitted since the last reset."""
+
+    def __init__(self, sink):
+        super().__init__(sink.columns if sink is not None else ())
+        self.sink = sink
+        self.rows = []
+
+    def write(self, row):
+        if self.sink is not None:
+            self.sink.write(row)
+        self.rows.append(row)
+        self.row_count += 1
+
+
+class _IndexedSink(RowSink):
+    """Passes rows on to a sink and adds each one to a text_index.IndexUpdate as it is written."""
+
+    def __init__(self, sink, update):
+        super().__init__(sink.columns)
+        self.sink = sink
+        self.update = update
+
+    def write(self, row):
+        self.sink.write(row)
+        self.update.add_sections((row,))
+        self.row_count += 1
+
+
+def extract_incremental(
+    pdf_path, sink, manifest_file, workers=1, cache=None, profile=NULL_PROFILER, table_sink=None, header_footer=True, memory=NULL_GUARD,
+    layout=None, bullet_sink=None, probe=True, image_store=None, image_sink=None,
+):
+    """
+    extract_to_sink() that reuses the previous run's manifest (page_manifest.py).
+
+    Pages whose fingerprint changed, or which are new, are classified again;
+    the others reuse their stored records. Stitching is replayed from the
+    first page whose incoming state differs from last time. A page with an
+    unchanged fingerprint and an unchanged incoming state is skipped
+    altogether: its rows and outgoing state are copied from the manifest.
+    So an edit re-stitches the changed pages plus however many following
+    pages it takes for the chapter/section state to match the old run
+    again. The output is rewritten from reused and new rows, and the new
+    manifest is saved to manifest_file. If the header/footer model or the
+    layout profile differs from the stored one, or images are placed in
+    one run and not the other, every page is classified again. The images
+    of reused pages still go through image_store, which only writes files
+    that are missing. The manifest keeps every page's records for later replays, so
+    probe only skips pages without text here. Returns a report dict.
+    """
+    if layout is None:
+        layout = load_layout(pdf_path)
+    with fitz.open(pdf_path) as doc:
+        with profile.stage("fingerprint"):
+            fingerprints = document_fingerprints(doc)
+        if header_footer is True:
+            with profile.stage("header_footer"):
+                header_footer = build_header_footer(doc, cache, text_only=memory.low_memory, layout=layout)
+    header_footer_key = header_footer.as_tuple() if header_footer else None
+    images = image_store is not None or image_sink is not None
+    old = PageManifest.load(manifest_file) or PageManifest()
+    if old.header_footer != header_footer_key or old.layout != layout.thresholds() or old.with_images != images:
+        old = PageManifest()
+    page_count = len(fingerprints)
+    changed = [
+        page_num for page_num in range(page_count)
+        if page_num >= old.page_count or old.fingerprints[page_num] != fingerprints[page_num]
+    ]
+    changed_set = set(changed)
+
+    records = {page_num: old.records[page_num] for page_num in range(page_count) if page_num not in changed_set}
+    page_probe = section_probe(layout) if probe else None
+    records_by_page = iter_page_records(
+        pdf_path, workers, cache, profile, changed, header_footer, memory=memory, layout=layout, probe=page_probe, images=images
+    )
+    for page_num, page_records in records_by_page:
+        records[page_num] = page_records
+
+    recorder = _RowRecorder(sink)
+    table_recorder = _RowRecorder(table_sink)
+    bullet_recorder = _RowRecorder(bullet_sink)
+    image_recorder = _RowRecorder(image_sink)
+    stitcher = SectionStitcher(recorder, profile, table_recorder, bullet_recorder, image_store, image_recorder)
+    manifest = PageManifest(
+        fingerprints, [records[page_num] for page_num in range(page_count)], header_footer=header_footer_key, layout=layout.thresholds(),
+        with_images=images,
+    )
+    report = {"pages": page_count, "reextracted": len(changed), "restitched": 0, "reused": 0, "rows_reused": 0}
+    for page_num in range(page_count):
+        state = stitcher.snapshot()
+        manifest.states.append(state)
+        if page_num not in changed_set and old.states[page_num] == state:
+            # Same content, same incoming state: same rows and outgoing state as last time
+            rows = old.rows[page_num]
+            with profile.stage("write"):
+                sink.write_many(rows)
+                if table_sink is not None:
+                    table_sink.write_many(old.tables[page_num])
+                if bullet_sink is not None:
+                    bullet_sink.write_many(old.bullets[page_num])
+                if image_sink is not None:
+                    image_sink.write_many(old.images[page_num])
+            if image_store is not None:
+                for record in records[page_num]:
+                    if "image" in record:
+                        image_store.add(*record["image"][:2])
+            profile.count("rows", len(rows))
+            stitcher.restore(old.states[page_num + 1], page_num)
+            manifest.rows.append(rows)
+            manifest.tables.append(old.tables[page_num])
+            manifest.bullets.append(old.bullets[page_num])
+            manifest.images.append(old.images[page_num])
+            report["reused"] += 1
+            report["rows_reused"] += len(rows)
             continue
+        recorder.rows = []
+        table_recorder.rows = []
+        bullet_recorder.rows = []
+        image_recorder.rows = []
+        stitcher.feed_page(page_num, records[page_num])
+        manifest.rows.append(recorder.rows)
+        manifest.tables.append(table_recorder.rows)
+        manifest.bullets.append(bullet_recorder.rows)
+        manifest.images.append(image_recorder.rows)
+        report["restitched"] += 1
+
+    manifest.states.append(stitcher.snapshot())
+    recorder.rows = []
+    bullet_recorder.rows = []
+    stitcher.finish()
+    manifest.rows.append(recorder.rows)
+    manifest.tables.append([])
+    manifest.bullets.append(bullet_recorder.rows)
+    manifest.images.append([])
+    with profile.stage("write"):
+        manifest.save(manifest_file)
+
+    report["rows"] = recorder.row_count + report["rows_reused"]
+    for name in ("reextracted", "restitched", "reused"):
+        profile.count(f"pages_{name}", report[name])
+    return report
+
+
+def extract_sections(pdf_path, pages=None, workers=1, cache=None, profile=NULL_PROFILER, layout=None, probe=True):
+    """
+    Yield {"Chapter", "SectionContent"} rows as the sections are closed.
+
+    pages limits the run to those page indexes (in order); chapter and
+    section state carries over the skipped pages as if they weren't there.
+    layout defaults to the profile saved next to the PDF, see layout_profile.
+    probe skips pages that can't change the rows, as in extract_to_sink().
+    """
+    if layout is None:
+        layout = load_layout(pdf_path)
+    sink = ListSink(OUTPUT_COLUMNS)
+    stitcher = SectionStitcher(sink, profile)
+    page_probe = section_probe(layout, False, stitcher) if probe else None
+    for page_num, records in iter_page_records(pdf_path, workers, cache, profile, pages, tables=False, layout=layout, probe=page_probe):
+        stitcher.feed_page(page_num, records)
+        if sink.rows:
+            yield from sink.rows
+            sink.rows.clear()
+    stitcher.finish()
+    yield from sink.rows
+
+
+def extract_rows(pdf_path, workers=1, cache=None):
+    return extract_to_sink(pdf_path, ListSink(OUTPUT_COLUMNS), workers, cache).rows
+
 
-        # ➤ Accumulate content if under section/subsection
-        if current_section or current_subsection:
-            print(f"[Block {block_index}] Adding content under Section: '{current_section}', Subsection: '{current_subsection}'")
-            for line in filtered_lines:
+def measure_scaling(pdf_path, worker_counts=(1, 2, 4, 8)):
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+    results = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        rows = extract_rows(pdf_path, workers)
+        elapsed = time.perf_counter() - start
+        results.append((workers, elapsed, len(rows)))
 
-                is_bullet_line = is_bullet(line)
-                has_7_5_size = any(
-                    abs(span.get("size", 0) - 7.5) < 0.2 and span.get("text", "").strip() in line
-                    for l in block.get("lines", [])
-                    for span in l.get("spans", [])
+    baseline = results[0][1]
+    print(f"\n⏱️ Scaling on {pdf_path} ({page_count} pages)")
+    print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8} {'rows':>6}")
+    for workers, elapsed, row_count in results:
+        print(f"{workers:>8} {elapsed:>9.2f} {page_count / elapsed:>9.1f} {baseline / elapsed:>7.2f}x {row_count:>6}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract DDx chapters, sections and sub-sections into Excel.")
+    parser.add_argument("pdf", nargs="?", default=PDF_FILE)
+    parser.add_argument("-o", "--output", default=OUTPUT_EXCEL, help="output file, .xlsx, .csv, .jsonl or .parquet")
+    parser.add_argument("--workers", type=int, default=1, help="processes used to classify pages (default: 1)")
+    parser.add_argument("--scaling", action="store_true", help="time the run at 1, 2, 4 and 8 workers instead of writing output")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="span cache directory (default: %(default)s)")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="span cache size cap")
+    parser.add_argument("--no-cache", action="store_true", help="always call get_text(\"dict\"), don't read or write the span cache")
+    parser.add_argument("--incremental", action="store_true", help="reuse unchanged pages recorded in <output>.pages by the last run")
+    parser.add_argument("--no-header-model", action="store_true", help="detect running headers/footers with the per-line regexes only")
+    parser.add_argument("--no-probe", action="store_true", help="extract every page with get_text(\"dict\"), without the page probe")
+    parser.add_argument("--no-tables", action="store_true", help="don't write the ja/nein decision matrices to the Tables sheet")
+    parser.add_argument("--layout", metavar="JSON", help="layout profile written by image.py (default: <pdf>.layout.json if present)")
+    parser.add_argument("--bullets", metavar="DIR", help="also write one row per bullet to a Parquet dataset partitioned by document")
+    parser.add_argument(
+        "--images", metavar="DIR",
+        help="write each embedded image once to DIR/<pdf name>/, every placement to an Images sheet and an Images column",
+    )
+    parser.add_argument("--index", metavar="FILE", help="add the sections to a full-text index (text_index.py), replacing this PDF's")
+    add_checkpoint_arguments(parser, "the stitching state and the rows so far")
+    add_memory_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    if args.resume and args.incremental:
+        parser.error("--incremental reuses the pages recorded in <output>.pages; --resume is for plain runs")
+    configure_logging(args.verbose, args.quiet)
+
+    if args.scaling:
+        measure_scaling(args.pdf)
+        return
+
+    # Rows are written as each section is closed
+    profile = make_profiler(args.profile)
+    cache = None if args.no_cache else SpanCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    memory = guard_from_args(args)
+    try:
+        layout = load_layout(args.pdf, args.layout)
+    except (OSError, ValueError, KeyError) as exc:
+        parser.error(f"can't read the layout profile: {exc}")
+    columns = OUTPUT_COLUMNS + ["Images"] if args.images else OUTPUT_COLUMNS
+    checkpoint = None
+    checkpoint_every = checkpoint_every_from_args(args)
+    if not args.incremental and checkpoint_every:
+        checkpoint = Checkpoint(checkpoint_path(args.output), checkpoint_every)
+    with open_sink(args.output, columns) as sink, \
+            (nullcontext() if args.no_tables else sink.add_sheet("Tables", TABLE_COLUMNS)) as table_sink, \
+            (open_bullet_sink(args.bullets, args.pdf) if args.bullets else nullcontext()) as bullet_sink, \
+            (sink.add_sheet("Images", IMAGE_COLUMNS) if args.images else nullcontext()) as image_sink, \
+            (ImageStore(args.images, args.pdf, args.workers) if args.images else nullcontext()) as image_store:
+        # Section rows go into the index as they are written, not kept for it until the end
+        index_update = IndexUpdate(args.index, book_name(args.pdf)) if args.index else None
+        rows = _IndexedSink(sink, index_update) if index_update else sink
+        try:
+            if args.incremental:
+                report = extract_incremental(
+                    args.pdf, rows, manifest_path(args.output), args.workers, cache, profile, table_sink,
+                    not args.no_header_model, memory, layout, bullet_sink, not args.no_probe, image_store, image_sink,
+                )
+                log.info(
+                    "♻️ %d pages: %d reused, %d re-stitched, %d re-extracted; %d of %d rows reused",
+                    report["pages"], report["reused"], report["restitched"], report["reextracted"],
+                    report["rows_reused"], report["rows"],
+                )
+            else:
+                extract_to_sink(
+                    args.pdf, rows, args.workers, cache, profile, table_sink, not args.no_header_model, memory, layout, bullet_sink,
+                    not args.no_probe, image_store, image_sink, checkpoint, args.resume,
                 )
-                print(f"  Line: {line} | Bullet: {is_bullet_line} | Font size 7.5: {has_7_5_size}")
-                SPECIAL_WORDS = {"häufig", "gelegentlich", "selten", "wichtige hinweise", "alarmsignale", "untersuchungen", "ursachen"}
-                if not is_bullet_line and has_7_5_size:
-                    lower_line = line.lower().strip()
-                    if not any(word in lower_line for word in SPECIAL_WORDS):
-                        print(f"⚠️ Skipping non-bullet line with font size 7.5 (no special keywords): {line}")
-                        continue
-                if is_bullet(line):
-                    print(f"  Bullet found: {line}")
-                    buffer += line + "\n"
-                else:
-                    buffer += line + "\n\n"
-
-# ❗️Only flush once, after loop ends — to save final accumulated content
-flush(current_chapter, current_section, current_subsection, buffer, page_num, final=True)
-if current_buffer_data:
-    data_rows.append(current_buffer_data)
-
-
-# Export to Excel
-df = pd.DataFrame(data_rows)
-df.to_excel(OUTPUT_EXCEL, index=False)
-print(f"\n✅ Extraction complete.")
-print(f"📄 Text saved to: {OUTPUT_EXCEL}")
+        except MemoryLimitExceeded as exc:
+            log.error("❌ %s", exc)
+            raise SystemExit(1)
+        if table_sink is not None:
+            log.info("📊 %d decision matrix cells written to the Tables sheet", table_sink.row_count)
+        if bullet_sink is not None:
+            log.info("🔹 %d bullets written to: %s", bullet_sink.row_count, bullet_sink.file_path)
+        if image_store is not None:
+            with profile.stage("images"):
+                images = image_store.close()
+            log.info(
+                "🖼️ %d image placements of %d distinct images (%.1fx dedup); %d new files, %.1f MB, %.0f images/s, in: %s",
+                images["placements"], images["images"], images["dedup_ratio"] or 1.0, images["files_written"],
+                images["bytes_written"] / 1e6, images["images_per_second"] or 0, image_store.directory,
+            )
+            for name, value in images.items():
+                profile.count(f"images_{name}", value or 0)
+    if checkpoint is not None:
+        checkpoint.remove()
+    if index_update is not None:
+        with profile.stage("index"):
+            index_update.finish()
+    memory.log_peak()
+    if cache is not None and args.workers <= 1:
+        log.info("🗃️ Span cache: %s", cache.report())
+    log.info("\n✅ Extraction complete.")
+    log.info("📄 Text saved to: %s", args.output)
+    if args.profile:
+        profile.write(args.profile, script="pdf_extractor", pdf=args.pdf, workers=args.workers, memory=memory.report())
+        log.info("⏱️ Profile written to: %s", args.profile)
+
+
+if __name__ == "__main__":
+    main()
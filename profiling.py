@@ -0,0 +1,123 @@
+"""
+Opt-in per-stage profiling for the extraction scripts.
+
+StageProfiler accumulates wall time per stage and counters for classification
+decisions and writes them as a JSON report. Stage times timed in pool workers
+(add_time(), merge()) are added up over the workers, so with more than one a
+stage can take longer than the whole run. When profiling is off the scripts
+use NULL_PROFILER, whose methods do nothing.
+"""
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+
+def configure_logging(verbosity=0, quiet=False):
+    """-q: warnings only, default: progress (INFO), -v: every block and line (DEBUG)."""
+    level = logging.WARNING if quiet else logging.DEBUG if verbosity > 0 else logging.INFO
+    logging.basicConfig(level=level, format="%(message)s")
+
+
+def add_logging_arguments(parser):
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="log every block, line and span decision")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only log warnings")
+    parser.add_argument("--profile", metavar="JSON", help="write per-stage timings and classification counters to this file")
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.stages[self.name] += time.perf_counter() - self.start
+
+
+class StageProfiler:
+    enabled = True
+
+    def __init__(self):
+        self.stages = defaultdict(float)
+        self.counters = Counter()
+        self.pages = 0
+        self.started = time.perf_counter()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add_time(self, name, seconds):
+        self.stages[name] += seconds
+
+    def add_pages(self, count=1):
+        self.pages += count
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def merge(self, data):
+        """Fold in as_dict() output from a worker process."""
+        for name, seconds in data["stages"].items():
+            self.stages[name] += seconds
+        self.counters.update(data["counters"])
+        self.pages += data["pages"]
+
+    def as_dict(self):
+        return {"stages": dict(self.stages), "counters": dict(self.counters), "pages": self.pages}
+
+    def report(self, **extra):
+        wall = time.perf_counter() - self.started
+        report = dict(extra)
+        report.update({
+            "pages": self.pages,
+            "wall_seconds": round(wall, 4),
+            "pages_per_second": round(self.pages / wall, 2) if wall else None,
+            "stages": {name: round(seconds, 4) for name, seconds in sorted(self.stages.items())},
+            "counters": dict(sorted(self.counters.items())),
+        })
+        return report
+
+    def write(self, path, **extra):
+        report = self.report(**extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return report
+
+
+_NULL_STAGE = nullcontext()
+
+
+class _NullProfiler:
+    enabled = False
+    pages = 0
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def add_time(self, name, seconds):
+        pass
+
+    def add_pages(self, count=1):
+        pass
+
+    def count(self, name, amount=1):
+        pass
+
+    def merge(self, data):
+        pass
+
+    def as_dict(self):
+        return None
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def make_profiler(enabled):
+    return StageProfiler() if enabled else NULL_PROFILER
@@ -0,0 +1,54 @@
+import re
+from collections import namedtuple
+
+QUESTION_START = "QUESTION_START"
+CONTINUATION = "CONTINUATION"
+OPTION = "OPTION"
+FOOTER = "FOOTER"
+JUNK = "JUNK"
+BODY = "BODY"
+
+ROMAN_PATTERN = r"(?:XII|XI|X|IX|VIII|VII|VI|V|IV|III|II|I)"
+
+# One anchored pass per line: question id (optionally "(Continued)"), or option letter
+_HEADER_RE = re.compile(
+    rf"(?P<qid>{ROMAN_PATTERN}-\d+)\.(?P<cont> \((?i:continued)\))?"
+    r"|(?P<letter>[A-Ha-h])\.(?: +(?P<option>.+))?"
+)
+_LEADING_NUMBER_RE = re.compile(r"\d+[\s\-]")
+_FOOTER_WORDS = ("copyright", "click here for terms", "mcgra", "hill")
+
+# kind: one of the constants above
+# qid: "IV-12" for QUESTION_START/CONTINUATION, option letter (upper case) for OPTION
+# text: the line with its question/option header removed
+# line: the stripped source line
+# option_prefix: the line starts with "A." .. "h.", whatever its kind
+Token = namedtuple("Token", ["kind", "qid", "text", "line", "option_prefix"])
+
+
+def lex_line(line):
+    line = line.strip()
+    match = _HEADER_RE.match(line)
+    letter = None
+    if match:
+        qid = match.group("qid")
+        if qid:
+            text = line[match.end():].strip()
+            if match.group("cont"):
+                return Token(CONTINUATION, qid, text, line, False)
+            return Token(QUESTION_START, qid, text, line, False)
+        letter = match.group("letter")
+
+    option_prefix = letter is not None
+    lower = line.lower()
+    if any(word in lower for word in _FOOTER_WORDS) or (line[:1].isdigit() and _LEADING_NUMBER_RE.match(line)):
+        return Token(FOOTER, None, line, line, option_prefix)
+    if line.isupper() and len(line.split()) <= 4:
+        return Token(JUNK, None, line, line, option_prefix)
+    if option_prefix and match.group("option") is not None:
+        return Token(OPTION, letter.upper(), match.group("option").strip(), line, True)
+    return Token(BODY, None, line, line, option_prefix)
+
+
+def lex_lines(lines):
+    return [lex_line(line) for line in lines]
@@ -0,0 +1,228 @@
+"""
+Row sinks: rows are written as soon as the extractor emits them instead of
+being collected for one DataFrame at the end.
+
+CSV and JSONL are flushed after every row, so a killed run leaves everything
+emitted so far on disk. The xlsx sink uses XlsxWriter's constant_memory mode
+(one row in memory at a time), but the workbook is only a valid file once the
+sink is closed. Parquet rows are written in row groups of PARQUET_BATCH_ROWS,
+and the file is likewise only complete once closed.
+
+add_sheet() opens a second table next to a sink: another worksheet of the
+same workbook for .xlsx, a sibling file <name>_<sheet><ext> otherwise.
+"""
+import csv
+import json
+import os
+from urllib.parse import quote
+
+PARQUET_BATCH_ROWS = 8192
+
+
+class RowSink:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.row_count = 0
+
+    def write(self, row):
+        self._write([row.get(column) for column in self.columns])
+        self.row_count += 1
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def _write(self, values):
+        raise NotImplementedError
+
+    def add_sheet(self, name, columns):
+        root, extension = os.path.splitext(self.path)
+        return open_sink(f"{root}_{name.lower()}{extension}", columns)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ListSink(RowSink):
+    """Keeps rows in memory, for callers that want a list back."""
+
+    def __init__(self, columns=()):
+        super().__init__(columns)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        self.row_count += 1
+
+    def add_sheet(self, name, columns):
+        return ListSink(columns)
+
+
+class XlsxSink(RowSink):
+    def __init__(self, path, columns, sheet_name="Sheet1", workbook=None):
+        super().__init__(columns)
+        self.path = path
+        # Sheets added with add_sheet() share the workbook, the first sink closes it
+        self.owns_workbook = workbook is None
+        if workbook is None:
+            import xlsxwriter
+
+            workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.workbook = workbook
+        self.worksheet = self.workbook.add_worksheet(sheet_name)
+        header_format = self.workbook.add_format({"bold": True, "border": 1, "align": "center"})
+        self.worksheet.write_row(0, 0, self.columns, header_format)
+
+    def _write(self, values):
+        row_index = self.row_count + 1
+        for col_index, value in enumerate(values):
+            if value is not None:
+                self.worksheet.write(row_index, col_index, value)
+
+    def add_sheet(self, name, columns):
+        return XlsxSink(self.path, columns, name, self.workbook)
+
+    def close(self):
+        if self.workbook is not None:
+            if self.owns_workbook:
+                self.workbook.close()
+            self.workbook = None
+
+
+class CsvSink(RowSink):
+    def __init__(self, path, columns):
+        super().__init__(columns)
+        self.path = path
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+        self.file.flush()
+
+    def _write(self, values):
+        self.writer.writerow(["" if value is None else value for value in values])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlSink(RowSink):
+    def __init__(self, path, columns):
+        super().__init__(columns)
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+
+    def _write(self, values):
+        self.file.write(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def _arrow_type(name):
+    import pyarrow as pa
+
+    if name == "dictionary":
+        return pa.dictionary(pa.int32(), pa.string())
+    return getattr(pa, name)()
+
+
+class ParquetSink(RowSink):
+    """
+    Parquet via pyarrow. types maps columns to "dictionary" (dictionary
+    encoded strings), "string", "int32", "float32", ... ; the other columns
+    get the type pyarrow infers from the first row group (string if it only
+    holds None). With partition ({"document": name}) the sink writes one
+    file of a hive-partitioned dataset: <path>/document=<name>/part-0.parquet,
+    which pyarrow.dataset reads back with a document column to filter on.
+    """
+
+    def __init__(self, path, columns, types=None, partition=None):
+        super().__init__(columns)
+        self.path = path
+        self.types = dict(types or {})
+        self.partition = partition
+        self.file_path = path
+        if partition:
+            segments = [f"{key}={quote(str(value), safe=' ')}" for key, value in partition.items()]
+            self.file_path = os.path.join(path, *segments, "part-0.parquet")
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        self.batch = [[] for _ in self.columns]
+        self.schema = None
+        self.writer = None
+
+    def _write(self, values):
+        for column_values, value in zip(self.batch, values):
+            column_values.append(value)
+        if len(self.batch[0]) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _make_schema(self):
+        import pyarrow as pa
+
+        fields = []
+        for name, values in zip(self.columns, self.batch):
+            if name in self.types:
+                arrow_type = _arrow_type(self.types[name])
+            else:
+                arrow_type = pa.array(values).type
+                if pa.types.is_null(arrow_type):
+                    arrow_type = pa.string()
+            fields.append(pa.field(name, arrow_type))
+        return pa.schema(fields)
+
+    def _flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.schema is None:
+            self.schema = self._make_schema()
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.file_path, self.schema, compression="zstd")
+        table = pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(self.batch, self.schema)], schema=self.schema
+        )
+        self.writer.write_table(table)
+        self.batch = [[] for _ in self.columns]
+
+    def add_sheet(self, name, columns):
+        root, extension = os.path.splitext(self.path)
+        return ParquetSink(f"{root}_{name.lower()}{extension}", columns, partition=self.partition)
+
+    def close(self):
+        if self.batch is None:
+            return
+        # Also run for an empty sink, so the file exists with its schema
+        if self.batch[0] or self.writer is None:
+            self._flush()
+        self.writer.close()
+        self.batch = None
+
+
+SINKS = {
+    ".xlsx": XlsxSink,
+    ".csv": CsvSink,
+    ".jsonl": JsonlSink,
+    ".parquet": ParquetSink,
+}
+
+
+def open_sink(path, columns, types=None):
+    """
+    Pick the sink from the file extension (.xlsx, .csv, .jsonl or .parquet).
+    types are column types for Parquet, see ParquetSink; the text formats
+    don't need them.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format '{extension}', expected one of {', '.join(SINKS)}")
+    if extension == ".parquet":
+        return ParquetSink(path, columns, types)
+    return SINKS[extension](path, columns)
@@ -0,0 +1,208 @@
+"""
+On-disk cache of per-page span data (text, size, flags, font, bbox).
+
+Entries are keyed by the SHA-256 of the PDF, the page index and
+EXTRACTOR_VERSION, so re-running with tweaked heuristics skips
+page.get_text("dict") entirely. Pages come back in the same dict shape as
+get_text("dict")["blocks"] (image blocks without their payload).
+text_only=True extracts with TEXT_ONLY_FLAGS, so images aren't decoded at
+all and their blocks are missing; the classifiers skip image blocks, so
+either kind of entry gives the same records.
+
+Each page is one small file: marshal-encoded tuples with a per-page font
+table, zlib-compressed. Reads refresh the file's mtime and the oldest files
+are evicted once the cache grows past max_bytes.
+"""
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+import fitz  # PyMuPDF
+
+# Bump when the stored fields or their meaning change
+EXTRACTOR_VERSION = 1
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PDF_SPAN_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pdf-extraction", "spans")
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# get_text("dict") without TEXT_PRESERVE_IMAGES: no image blocks, no decoded image data
+TEXT_ONLY_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_FORMAT_TAG = f"v{EXTRACTOR_VERSION}m{marshal.version}py{sys.version_info[0]}{sys.version_info[1]}"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pack_blocks(blocks):
+    """
+    get_text("dict")["blocks"] as nested tuples with a font table:
+    (fonts, ((number, type, bbox, ((line_bbox, ((text, size, flags, font_id, bbox), ...)), ...)), ...))
+    """
+    fonts = {}
+    packed = []
+    for block in blocks:
+        lines = []
+        for line in block.get("lines", []):
+            spans = tuple(
+                (span["text"], span["size"], span["flags"], fonts.setdefault(span["font"], len(fonts)), tuple(span["bbox"]))
+                for span in line["spans"]
+            )
+            lines.append((tuple(line["bbox"]), spans))
+        packed.append((block.get("number", 0), block.get("type", 0), tuple(block["bbox"]), tuple(lines)))
+    return tuple(fonts), tuple(packed)
+
+
+def unpack_blocks(fonts, packed):
+    blocks = []
+    for number, block_type, bbox, lines in packed:
+        block = {"number": number, "type": block_type, "bbox": bbox}
+        if block_type == 0:
+            block["lines"] = [
+                {
+                    "bbox": line_bbox,
+                    "spans": [
+                        {"text": text, "size": size, "flags": flags, "font": fonts[font], "bbox": span_bbox}
+                        for text, size, flags, font, span_bbox in spans
+                    ],
+                }
+                for line_bbox, spans in lines
+            ]
+        blocks.append(block)
+    return blocks
+
+
+def encode_blocks(blocks):
+    return zlib.compress(marshal.dumps(pack_blocks(blocks)), 1)
+
+
+def decode_blocks(data):
+    return unpack_blocks(*marshal.loads(zlib.decompress(data)))
+
+
+def extract_blocks(page, text_only=False):
+    if text_only:
+        return page.get_text("dict", flags=TEXT_ONLY_FLAGS)["blocks"]
+    return page.get_text("dict")["blocks"]
+
+
+class SpanCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = 0.0
+        self.extract_seconds = 0.0
+        self._digests = {}
+        self._total_bytes = None
+        os.makedirs(directory, exist_ok=True)
+
+    def digest(self, pdf_path):
+        if pdf_path not in self._digests:
+            self._digests[pdf_path] = file_digest(pdf_path)
+        return self._digests[pdf_path]
+
+    def _entry_path(self, digest, page_num):
+        return os.path.join(self.directory, digest[:2], f"{digest}-{_FORMAT_TAG}-{page_num}.bin")
+
+    def page_packed(self, doc, page_num, text_only=False):
+        """pack_blocks() of a page, from the cache when possible."""
+        path = self._entry_path(self.digest(doc.name), page_num)
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                fonts, packed = marshal.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            packed = None
+        if packed is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            self.load_seconds += time.perf_counter() - start
+            return fonts, packed
+
+        start = time.perf_counter()
+        fonts, packed = pack_blocks(extract_blocks(doc.load_page(page_num), text_only))
+        self.extract_seconds += time.perf_counter() - start
+        self.misses += 1
+        self._store(path, zlib.compress(marshal.dumps((fonts, packed)), 1))
+        return fonts, packed
+
+    def page_blocks(self, doc, page_num):
+        """get_text("dict")["blocks"] of a page, from the cache when possible."""
+        return unpack_blocks(*self.page_packed(doc, page_num))
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent workers never read a half-written entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def evict(self, target_ratio=0.9):
+        """Drop least recently used entries until the cache is under target_ratio * max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * target_ratio
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+    def report(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "load_seconds": round(self.load_seconds, 4),
+            "extract_seconds": round(self.extract_seconds, 4),
+        }
+
+
+def page_blocks(doc, page_num, cache=None):
+    if cache is None:
+        return doc.load_page(page_num).get_text("dict")["blocks"]
+    return cache.page_blocks(doc, page_num)
+
+
+def page_packed(doc, page_num, cache=None, text_only=False):
+    if cache is None:
+        return pack_blocks(extract_blocks(doc.load_page(page_num), text_only))
+    return cache.page_packed(doc, page_num, text_only)
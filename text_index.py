@@ -0,0 +1,391 @@
+"""
+Persistent full-text index over extracted questions and DDx sections.
+
+Both scripts can add a book to an index file with --index: every question
+(keyed by its id, e.g. IV-12) or DDx section row (keyed by its row number)
+becomes a document. Tokens are folded the way the German headings are
+written both ways: case-folded, ä/ö/ü to ae/oe/ue and ß to ss, so
+"Übelkeit", "übelkeit" and "Uebelkeit" are one token. A book that is added
+again replaces its previous documents, so one file can hold a corpus.
+
+Each document also gets a MinHash signature (NUM_PERMUTATIONS hashes of its
+SHINGLE_WORDS-word shingles). near_duplicates() buckets the signatures by
+LSH bands and only compares documents that share a bucket, so repeated
+sections and questions across books are found without comparing every
+pair. Question ids that came out of extraction more than once (their
+pieces are joined into one question) are checked the same way:
+repeated_ids() says whether the pieces are near-duplicates or different
+text under one id.
+
+Stored like the page manifest: marshal-encoded, zlib-compressed, written
+atomically.
+
+    python text_index.py corpus.index search "Übelkeit Erbrech*" [--book DDx] [--kind section]
+    python text_index.py corpus.index duplicates [--threshold 0.8]
+"""
+import argparse
+import bisect
+import logging
+import marshal
+import os
+import re
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from profiling import add_logging_arguments, configure_logging
+from question_lexer import ROMAN_PATTERN
+
+log = logging.getLogger("text_index")
+
+INDEX_VERSION = 1
+NUM_PERMUTATIONS = 64
+BANDS = 16
+SHINGLE_WORDS = 3
+# Documents with fewer shingles are too short to call near-duplicates
+MIN_SHINGLES = 4
+DUPLICATE_THRESHOLD = 0.8
+
+_FORMAT_TAG = f"index-v{INDEX_VERSION}-m{marshal.version}-py{sys.version_info[0]}{sys.version_info[1]}"
+
+# Largest prime below 2**32; a and b below 2**29 so a * crc32 + b stays inside uint64
+_PRIME = 4294967291
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 1 << 29, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 29, NUM_PERMUTATIONS, dtype=np.uint64)
+
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_QUESTION_ID_RE = re.compile(rf"({ROMAN_PATTERN}-\d+)\.")
+
+# kind: "question" or "section"; key: question id or row number; label: section (questions) or chapter
+Hit = namedtuple("Hit", ["book", "kind", "key", "label", "text"])
+
+
+def normalize(text):
+    """Case-folded, with ä/ö/ü as ae/oe/ue (casefold() already turns ß into ss)."""
+    return text.casefold().translate(_FOLD)
+
+
+def tokenize(text):
+    """Normalized word tokens; single letters are dropped, single digits kept."""
+    return [token for token in _TOKEN_RE.findall(normalize(text)) if len(token) > 1 or token.isdigit()]
+
+
+def minhash(tokens):
+    """MinHash signature (uint32 per permutation) of the token shingles, None if there are too few."""
+    shingles = {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(max(len(tokens) - SHINGLE_WORDS + 1, 0))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), np.uint64, len(shingles))
+    values = (hashes[:, None] * _A + _B) % _PRIME
+    return values.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two minhash() signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def question_parts(text):
+    """
+    (question id, [pieces]) of a question as pandas_table writes it. A
+    repeated id's pieces are joined with a space and each starts with the id
+    again, everywhere else join_question_lines() strips it.
+    """
+    match = _QUESTION_ID_RE.match(text)
+    if match is None:
+        return None, [text]
+    question_id = match.group(1)
+    return question_id, re.split(rf" (?={re.escape(question_id)}\.)", text)
+
+
+class TextIndex:
+    def __init__(self, docs=(), postings=None, signatures=(), repeats=None):
+        # [book, kind, key, label, text] per document id
+        self.docs = [list(doc) for doc in docs]
+        # token -> ascending document ids
+        self.postings = postings if postings is not None else {}
+        # minhash() bytes per document id, b"" for short documents
+        self.signatures = list(signatures)
+        # (book, question id) -> (pieces, lowest similarity between them)
+        self.repeats = repeats if repeats is not None else {}
+        self._vocabulary = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def books(self):
+        return sorted({doc[0] for doc in self.docs})
+
+    @classmethod
+    def load(cls, path):
+        """The index at path, or None if it is missing, unreadable or from another version."""
+        try:
+            with open(path, "rb") as f:
+                data = marshal.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+        if not isinstance(data, dict) or data.get("format") != _FORMAT_TAG:
+            return None
+        return cls(data["docs"], data["postings"], data["signatures"], data["repeats"])
+
+    def save(self, path):
+        data = {
+            "format": _FORMAT_TAG,
+            "docs": [tuple(doc) for doc in self.docs],
+            "postings": self.postings,
+            "signatures": self.signatures,
+            "repeats": self.repeats,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(marshal.dumps(data), 1))
+        os.replace(tmp_path, path)
+
+    def remove_book(self, book):
+        kept = [doc_id for doc_id, doc in enumerate(self.docs) if doc[0] != book]
+        if len(kept) == len(self.docs):
+            return
+        new_ids = {doc_id: new_id for new_id, doc_id in enumerate(kept)}
+        postings = {}
+        for token, doc_ids in self.postings.items():
+            remaining = [new_ids[doc_id] for doc_id in doc_ids if doc_id in new_ids]
+            if remaining:
+                postings[token] = remaining
+        self.postings = postings
+        self.docs = [self.docs[doc_id] for doc_id in kept]
+        self.signatures = [self.signatures[doc_id] for doc_id in kept]
+        self.repeats = {key: value for key, value in self.repeats.items() if key[0] != book}
+        self._vocabulary = None
+
+    def add(self, book, kind, key, label, text):
+        doc_id = len(self.docs)
+        tokens = tokenize(text)
+        # The label (chapter or section) is searchable too, but not part of the near-duplicate signature
+        for token in set(tokens).union(tokenize(label)):
+            self.postings.setdefault(token, []).append(doc_id)
+        signature = minhash(tokens)
+        self.docs.append([book, kind, key, label, text])
+        self.signatures.append(b"" if signature is None else signature.tobytes())
+        self._vocabulary = None
+        return doc_id
+
+    def add_questions(self, book, section, questions):
+        """pandas_table questions of one section; repeated ids are recorded in self.repeats."""
+        for text in questions:
+            question_id, parts = question_parts(text)
+            if len(parts) > 1:
+                signatures = [minhash(tokenize(part)) for part in parts]
+                scores = [
+                    similarity(a, b) if a is not None and b is not None else float(normalize(parts[i]) == normalize(parts[j]))
+                    for i, a in enumerate(signatures) for j, b in enumerate(signatures) if i < j
+                ]
+                self.repeats[book, question_id] = (len(parts), min(scores))
+            self.add(book, "question", question_id or "", section, text)
+
+    def add_sections(self, book, rows, first=1):
+        """pdf_extractor {"Chapter", "SectionContent"} rows, keyed by their row number counted from first."""
+        for row_number, row in enumerate(rows, first):
+            self.add(book, "section", str(row_number), row["Chapter"], row["SectionContent"])
+
+    def _matching(self, term, prefix):
+        if not prefix:
+            return self.postings.get(term, ())
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        doc_ids = set()
+        for position in range(bisect.bisect_left(vocabulary, term), len(vocabulary)):
+            if not vocabulary[position].startswith(term):
+                break
+            doc_ids.update(self.postings[vocabulary[position]])
+        return doc_ids
+
+    def search(self, query, book=None, kind=None, limit=None):
+        """
+        Hits holding every word of the query, in index order. A word ending
+        in * matches every token it starts.
+        """
+        terms = []
+        for word in query.split():
+            prefix = word.endswith("*")
+            tokens = tokenize(word)
+            terms += [(token, False) for token in tokens[:-1]]
+            if tokens:
+                terms.append((tokens[-1], prefix))
+        if not terms:
+            return []
+        candidates = sorted((self._matching(term, prefix) for term, prefix in terms), key=len)
+        doc_ids = set(candidates[0])
+        for matching in candidates[1:]:
+            if not doc_ids:
+                break
+            doc_ids.intersection_update(matching)
+        hits = []
+        for doc_id in sorted(doc_ids):
+            doc = self.docs[doc_id]
+            if (book is None or doc[0] == book) and (kind is None or doc[1] == kind):
+                hits.append(Hit(*doc))
+                if limit is not None and len(hits) >= limit:
+                    break
+        return hits
+
+    def near_duplicates(self, threshold=DUPLICATE_THRESHOLD, kind=None):
+        """[(similarity, Hit, Hit)] of documents whose estimated Jaccard similarity is at least threshold."""
+        doc_ids = [
+            doc_id for doc_id, signature in enumerate(self.signatures)
+            if signature and (kind is None or self.docs[doc_id][1] == kind)
+        ]
+        if not doc_ids:
+            return []
+        signatures = np.frombuffer(b"".join(self.signatures[doc_id] for doc_id in doc_ids), np.uint32)
+        signatures = signatures.reshape(len(doc_ids), NUM_PERMUTATIONS)
+        rows = NUM_PERMUTATIONS // BANDS
+        candidates = set()
+        for band in range(BANDS):
+            buckets = {}
+            band_values = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            for position, key in enumerate(band_values):
+                buckets.setdefault(key.tobytes(), []).append(position)
+            for members in buckets.values():
+                for i, first in enumerate(members):
+                    for second in members[i + 1:]:
+                        candidates.add((first, second))
+        pairs = []
+        for first, second in candidates:
+            score = similarity(signatures[first], signatures[second])
+            if score >= threshold:
+                pairs.append((score, Hit(*self.docs[doc_ids[first]]), Hit(*self.docs[doc_ids[second]])))
+        pairs.sort(key=lambda pair: (-pair[0], pair[1][:3], pair[2][:3]))
+        return pairs
+
+    def repeated_ids(self, threshold=DUPLICATE_THRESHOLD):
+        """[(book, question id, pieces, similarity, "duplicate" or "split")] for ids extracted more than once."""
+        return [
+            (book, question_id, pieces, score, "duplicate" if score >= threshold else "split")
+            for (book, question_id), (pieces, score) in sorted(self.repeats.items())
+        ]
+
+
+def open_index(path):
+    """The index at path, or a new empty one."""
+    return TextIndex.load(path) or TextIndex()
+
+
+class IndexUpdate:
+    """
+    Replaces book's documents in the index at path while the extraction
+    runs: questions and section rows are added as they are written, so the
+    caller doesn't keep them until the end. finish() saves the index and
+    logs what it found.
+    """
+
+    def __init__(self, path, book):
+        self.path = path
+        self.book = book
+        self.seconds = 0.0
+        self.section_rows = 0
+        start = time.perf_counter()
+        self.index = open_index(path)
+        self.index.remove_book(book)
+        self.before = len(self.index)
+        self.seconds += time.perf_counter() - start
+
+    def add_questions(self, section, questions):
+        start = time.perf_counter()
+        self.index.add_questions(self.book, section, questions)
+        self.seconds += time.perf_counter() - start
+
+    def add_sections(self, rows):
+        start = time.perf_counter()
+        rows = list(rows)
+        self.index.add_sections(self.book, rows, self.section_rows + 1)
+        self.section_rows += len(rows)
+        self.seconds += time.perf_counter() - start
+
+    def finish(self):
+        start = time.perf_counter()
+        index, book = self.index, self.book
+        index.save(self.path)
+        repeated = [entry for entry in index.repeated_ids() if entry[0] == book]
+        duplicates = sum(entry[4] == "duplicate" for entry in repeated)
+        log.info(
+            "🔎 Indexed %d documents of %s in %.2fs (%d books, %d documents in %s)",
+            len(index) - self.before, book, self.seconds + time.perf_counter() - start, len(index.books()), len(index), self.path,
+        )
+        if repeated:
+            log.warning(
+                "⚠️ %d question ids were extracted more than once and joined: %d near-duplicates, %d split questions",
+                len(repeated), duplicates, len(repeated) - duplicates,
+            )
+            for _, question_id, pieces, score, verdict in repeated:
+                log.debug("   %s: %d pieces, similarity %.2f, %s", question_id, pieces, score, verdict)
+        return index
+
+
+def update_index(path, book, questions=(), sections=()):
+    """
+    Replace book's documents in the index at path with questions
+    ([(section, [questions])]) and DDx section rows, save it and log what
+    it found.
+    """
+    update = IndexUpdate(path, book)
+    for section, section_questions in questions:
+        update.add_questions(section, section_questions)
+    update.add_sections(sections)
+    return update.finish()
+
+
+def book_name(pdf_path):
+    return os.path.splitext(os.path.basename(pdf_path))[0]
+
+
+def _snippet(text, width=100):
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("index", help="index file written with --index by pdf_extractor.py or pandas_table.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="documents holding every word of the query (word* for a prefix)")
+    search.add_argument("query")
+    search.add_argument("--book", help="only this book (the PDF's file name without extension)")
+    search.add_argument("--kind", choices=("question", "section"))
+    search.add_argument("--limit", type=int, default=20, help="hits to print (default: %(default)s)")
+    duplicates = commands.add_parser("duplicates", help="near-duplicate documents and repeated question ids")
+    duplicates.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD, help="estimated Jaccard similarity (default: %(default)s)")
+    duplicates.add_argument("--kind", choices=("question", "section"))
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging(args.verbose, args.quiet)
+
+    index = TextIndex.load(args.index)
+    if index is None:
+        parser.error(f"no index at {args.index}")
+    if args.command == "search":
+        start = time.perf_counter()
+        hits = index.search(args.query, args.book, args.kind)
+        elapsed = time.perf_counter() - start
+        for hit in hits[:args.limit]:
+            print(f"{hit.book}  {hit.kind} {hit.key}  [{hit.label}]  {_snippet(hit.text)}")
+        log.info("🔎 %d hits in %.2f ms", len(hits), elapsed * 1000)
+        return
+
+    start = time.perf_counter()
+    pairs = index.near_duplicates(args.threshold, args.kind)
+    elapsed = time.perf_counter() - start
+    for score, first, second in pairs:
+        print(f"{score:.2f}  {first.book} {first.kind} {first.key}  ~  {second.book} {second.kind} {second.key}  {_snippet(first.text, 60)}")
+    for book, question_id, pieces, score, verdict in index.repeated_ids(args.threshold):
+        print(f"repeated id  {book} {question_id}: {pieces} pieces, similarity {score:.2f}, {verdict}")
+    log.info("🧬 %d near-duplicate pairs among %d documents in %.2f s", len(pairs), len(index), elapsed)
+
+
+if __name__ == "__main__":
+    main()